@@ -0,0 +1,225 @@
+"""
+LifeGuard AI - Durable Alert Outbox
+Alerts are persisted as PENDING rows and drained by a background worker, so
+fan-out survives restarts and never holds a web request.
+"""
+
+import threading
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import insert, update, select, func, or_, and_, bindparam
+from models import db, Alert
+from config import get_config
+import logging
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'PENDING'
+SENDING = 'SENDING'
+SENT = 'SENT'
+FAILED = 'FAILED'
+
+# Status updates are flushed every this many send results
+STATUS_FLUSH_SIZE = 100
+
+
+class AlertOutbox:
+    """Outbox queue backed by the alerts table"""
+
+    def __init__(self, app, sms, batch_size=None, lease_seconds=None, poll_seconds=None, workers=None,
+                 max_attempts=None):
+        config = get_config()
+        self.app = app
+        self.sms = sms
+        self.batch_size = batch_size or config.ALERT_OUTBOX_BATCH_SIZE
+        self.lease_seconds = lease_seconds if lease_seconds is not None else config.ALERT_OUTBOX_LEASE_SECONDS
+        self.max_attempts = max_attempts or config.ALERT_OUTBOX_MAX_ATTEMPTS
+        self.poll_seconds = poll_seconds if poll_seconds is not None else config.ALERT_OUTBOX_POLL_SECONDS
+        self.workers = workers
+        self._stop = threading.Event()
+        self._thread = None
+
+    def enqueue(self, alerts):
+        """
+        Persist alerts as PENDING rows in a single bulk INSERT.
+
+        Each alert is a dict with `phone_number` and `message`, plus optional
+        `user_id`, `language`, `alert_type` and `prediction_id`.
+        Returns the generated alert ids.
+        """
+        now = datetime.utcnow()
+        rows = []
+        for a in alerts:
+            rows.append({
+                'alert_id': f"ALERT-{uuid.uuid4().hex}",
+                'user_id': a.get('user_id'),
+                'phone_number': a['phone_number'],
+                'message': a['message'],
+                'language': a.get('language', 'en'),
+                'alert_type': a.get('alert_type', 'DISASTER'),
+                'prediction_id': a.get('prediction_id'),
+                'status': PENDING,
+                'attempts': 0,
+                'timestamp': now
+            })
+        if rows:
+            db.session.execute(insert(Alert), rows)
+            db.session.commit()
+        return [r['alert_id'] for r in rows]
+
+    def claim_batch(self, limit=None):
+        """
+        Lease up to `limit` PENDING (or lease-expired SENDING) alerts that
+        have been claimed fewer than `max_attempts` times; lease-expired rows
+        that used up their attempts are marked FAILED instead.
+
+        The claim is a single UPDATE so concurrent workers never receive the
+        same row. Returns (lease_token, [(id, phone_number, message, language)]).
+        """
+        now = datetime.utcnow()
+        token = uuid.uuid4().hex
+        attempts = func.coalesce(Alert.attempts, 0)
+        db.session.execute(
+            update(Alert)
+            .where(Alert.status == SENDING, Alert.lease_expires_at < now, attempts >= self.max_attempts)
+            .values(status=FAILED, lease_owner=None)
+            .execution_options(synchronize_session=False)
+        )
+        claimable = select(Alert.id).where(or_(
+            Alert.status == PENDING,
+            and_(Alert.status == SENDING, Alert.lease_expires_at < now)
+        ), attempts < self.max_attempts).order_by(Alert.id).limit(limit or self.batch_size)
+
+        db.session.execute(
+            update(Alert)
+            .where(Alert.id.in_(claimable))
+            .values(status=SENDING, lease_owner=token,
+                    lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                    attempts=attempts + 1)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+        rows = db.session.execute(
+            select(Alert.id, Alert.phone_number, Alert.message, Alert.language)
+            .where(Alert.lease_owner == token, Alert.status == SENDING)
+            .order_by(Alert.id)
+        ).all()
+        return token, rows
+
+    def process_batch(self):
+        """
+        Claim one batch, send it through the SMS service and record the outcome.
+        Returns the number of alerts processed.
+        """
+        token, rows = self.claim_batch()
+        if not rows:
+            return 0
+
+        by_language = {}
+        for row in rows:
+            by_language.setdefault(row.language or 'en', []).append(row)
+
+        results = []
+        for language, group in by_language.items():
+            recipients = ((r.phone_number, r.message, r.id) for r in group)
+            for result in self.sms.send_bulk(recipients, language=language, workers=self.workers):
+                results.append(result)
+                if len(results) >= STATUS_FLUSH_SIZE:
+                    self._record_results(token, results)
+                    results = []
+        self._record_results(token, results)
+        return len(rows)
+
+    def _record_results(self, token, results):
+        """
+        Write SENT/FAILED statuses for a chunk of results with batched
+        UPDATEs, and renew the lease on the rest of the batch so a slow batch
+        is not reclaimed by another worker while it is still being sent
+        """
+        if not results:
+            return
+        now = datetime.utcnow()
+        table = Alert.__table__
+        sent = [{'b_id': r['ref'], 'b_sid': r.get('sid')} for r in results if r['success']]
+        failed = [r['ref'] for r in results if not r['success']]
+
+        if sent:
+            db.session.execute(
+                table.update()
+                .where(table.c.id == bindparam('b_id'), table.c.lease_owner == token)
+                .values(status=SENT, sent_at=now, provider_sid=bindparam('b_sid'), lease_owner=None),
+                sent
+            )
+        if failed:
+            db.session.execute(
+                update(Alert)
+                .where(Alert.id.in_(failed), Alert.lease_owner == token)
+                .values(status=FAILED, lease_owner=None)
+                .execution_options(synchronize_session=False)
+            )
+        db.session.execute(
+            update(Alert)
+            .where(Alert.lease_owner == token, Alert.status == SENDING)
+            .values(lease_expires_at=now + timedelta(seconds=self.lease_seconds))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+    def drain(self):
+        """
+        Process batches until the queue is empty. Returns the number processed.
+        """
+        total = 0
+        while True:
+            processed = self.process_batch()
+            if not processed:
+                return total
+            total += processed
+
+    def stats(self, window_seconds=60):
+        """
+        Queue depth per status and the recent drain rate
+        """
+        counts = dict(db.session.execute(
+            select(Alert.status, func.count(Alert.id)).group_by(Alert.status)
+        ).all())
+        since = datetime.utcnow() - timedelta(seconds=window_seconds)
+        recently_sent = db.session.execute(
+            select(func.count(Alert.id)).where(Alert.status == SENT, Alert.sent_at >= since)
+        ).scalar()
+        return {
+            'pending': counts.get(PENDING, 0),
+            'in_flight': counts.get(SENDING, 0),
+            'sent': counts.get(SENT, 0),
+            'failed': counts.get(FAILED, 0),
+            'drain_rate_per_min': round(recently_sent * 60.0 / window_seconds, 1)
+        }
+
+    def run(self):
+        """Worker loop: drain batches, sleeping when the queue is empty"""
+        logger.info("Alert outbox worker started")
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    processed = self.process_batch()
+            except Exception as e:
+                logger.error(f"Alert outbox worker error: {e}")
+                processed = 0
+            if not processed:
+                self._stop.wait(self.poll_seconds)
+        logger.info("Alert outbox worker stopped")
+
+    def start(self):
+        """Start the background worker thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name='alert-outbox', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Signal the worker to stop and wait for the current batch to finish"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
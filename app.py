@@ -3,37 +3,131 @@ LifeGuard AI - Main Flask Application
 """
 
 import os
+import json
+import hashlib
+import math
 import random
-from datetime import datetime, timedelta
-from flask import Flask, render_template, jsonify, request
+import time
+import signal
+import threading
+import uuid
+import click
+import socketio
+from datetime import date, datetime, timedelta
+from flask import Flask, Response, render_template, jsonify, request, stream_with_context, url_for
 from flask_cors import CORS
+from sqlalchemy import inspect
 from config import get_config
 from models import db, User, Prediction, Alert, BloodForecast, RiskZone, Hospital, Resource, Deployment
-from service import get_hospital_readiness
+from service import get_hospital_readiness, get_region_readiness, iter_predictions
+from sms_service import sms_service
+from alert_outbox import AlertOutbox
+from dashboard_cache import SnapshotCache, MemoryStore, FileStore, invalidate_on_commit
+from realtime import sio, DeltaBroadcaster, broadcast
+from geo import hospitals_near_prediction
+from forecasting import ForecastWorker, refresh_blood_forecasts, get_blood_shortages
+from ingest import ingest_predictions, open_text, FORMATS, CHUNK_SIZE
+from risk_snapshot import SnapshotStore, SnapshotPublisher
+from zones import rebuild_risk_zones, zone_polygons, LOD_TOLERANCES_KM
+from tiles import build_tile, valid_tile
+from inference import ModelCache, national_grid, run_inference, train_baseline_models
+from weather import WeatherFetcher
+from simulation import ShortfallSimulator, SimulationJobs, load_inputs
+from archive import ArchiveWorker, archive_expired, daily_summary, KINDS
+from deployments import DeploymentScheduler, in_flight_totals
+from metrics import registry, instrument_app
+from database import init_engines, replica_reads
+from reference_data import INDIA_REGIONS, DISASTER_TYPES, SEED_RESOURCES
+from compact import build_compact_dashboard, diff_compact, encode, CompactHistory, negotiate_encoding, compress
 
 app = Flask(__name__)
 config_obj = get_config()
 app.config.from_object(config_obj)
 CORS(app)
 
-# Initialize Database
+# Initialize Database (SQLite pragmas, optional read replica bind)
 db.init_app(app)
+init_engines(app, db)
 
-# Initial Data (if DB is empty)
-INDIA_REGIONS = {
-    "Maharashtra": {"lat": 19.7515, "lng": 75.7139, "population": 112374333, "hospitals": 4823},
-    "Tamil Nadu": {"lat": 11.1271, "lng": 78.6569, "population": 72147030, "hospitals": 3456},
-    "Gujarat": {"lat": 22.2587, "lng": 71.1924, "population": 60439692, "hospitals": 2890},
-    "Kerala": {"lat": 10.8505, "lng": 76.2711, "population": 33406061, "hospitals": 2134},
-    "West Bengal": {"lat": 22.9868, "lng": 87.8550, "population": 91276115, "hospitals": 3678}
-}
-
-DISASTER_TYPES = {
-    "cyclone": {"icon": "🌀", "color": "#6366f1", "severity_range": (3, 5)},
-    "flood": {"icon": "🌊", "color": "#0ea5e9", "severity_range": (2, 5)},
-    "earthquake": {"icon": "🌍", "color": "#ef4444", "severity_range": (3, 5)},
-    "heatwave": {"icon": "🔥", "color": "#f97316", "severity_range": (2, 4)}
-}
+# Route latency and per-request SQL usage, scraped from /metrics
+profiler = instrument_app(app, config_obj.PROFILE_SAMPLE_RATE, config_obj.PROFILE_SLOW_REQUEST_MS)
+
+# Alert fan-out runs from the outbox worker, never inside a request
+alert_outbox = AlertOutbox(app, sms_service)
+
+# Dashboard snapshots are rebuilt only after relevant writes (or TTL expiry)
+dashboard_cache = SnapshotCache(
+    FileStore(config_obj.DASHBOARD_CACHE_DIR) if config_obj.DASHBOARD_CACHE_DIR else MemoryStore(),
+    ttl=config_obj.DASHBOARD_CACHE_TTL_SECONDS
+)
+invalidate_on_commit(dashboard_cache, [Prediction, Resource, Deployment, Alert, Hospital])
+compact_history = CompactHistory()
+
+# Map layers (risk zones, cluster tiles) only depend on predictions and the
+# zones rebuilt from them, so they get their own cache that other writes
+# don't invalidate
+map_cache = SnapshotCache(
+    FileStore(os.path.join(config_obj.DASHBOARD_CACHE_DIR, 'map')) if config_obj.DASHBOARD_CACHE_DIR else MemoryStore(),
+    ttl=config_obj.DASHBOARD_CACHE_TTL_SECONDS
+)
+invalidate_on_commit(map_cache, [Prediction, RiskZone])
+
+# Binary risk map for mmap readers and offline browsers, re-materialized periodically
+risk_snapshots = SnapshotStore(config_obj.RISK_SNAPSHOT_PATH or os.path.join(app.instance_path, 'risk_snapshot.bin'))
+snapshot_publisher = SnapshotPublisher(app, risk_snapshots.path, config_obj.RISK_SNAPSHOT_INTERVAL_SECONDS,
+                                       before_publish=rebuild_risk_zones)
+
+# Versioned scikit-learn models, loaded once per process
+model_cache = ModelCache(config_obj.MODEL_DIR or os.path.join(app.instance_path, 'models'),
+                         capacity=config_obj.MODEL_CACHE_SIZE)
+
+# Live conditions for inference; a no-op until WEATHER_API_KEY is set
+weather_fetcher = WeatherFetcher(config_obj.WEATHER_API_URL, config_obj.WEATHER_API_KEY,
+                                 workers=config_obj.WEATHER_FETCH_WORKERS,
+                                 ttl=config_obj.WEATHER_CACHE_TTL_SECONDS,
+                                 cell_degrees=config_obj.WEATHER_CACHE_CELL_DEGREES,
+                                 timeout=config_obj.WEATHER_TIMEOUT_SECONDS)
+
+# Monte Carlo shortfall simulation; the process pool starts on first use
+shortfall_simulator = ShortfallSimulator(config_obj.SIMULATION_WORKERS or None, config_obj.SIMULATION_BATCH_SIZE or None,
+                                         config_obj.SIMULATION_MEMORY_MB_PER_WORKER)
+simulation_jobs = SimulationJobs(
+    shortfall_simulator,
+    FileStore(os.path.join(config_obj.DASHBOARD_CACHE_DIR, 'simulations')) if config_obj.DASHBOARD_CACHE_DIR else MemoryStore(),
+    ttl=config_obj.SIMULATION_RESULT_TTL_SECONDS
+)
+
+# Expired predictions, delivered alerts and old deployments move to monthly archives
+archive_worker = ArchiveWorker(app, config_obj.ARCHIVE_INTERVAL_SECONDS)
+
+# Blood forecasts are refreshed here, only for regions whose inputs changed
+forecast_worker = ForecastWorker(app, config_obj.BLOOD_FORECAST_INTERVAL_SECONDS)
+
+# Advances active deployments and returns finished ones to stock
+deployment_scheduler = DeploymentScheduler(app, config_obj.DEPLOYMENT_TICK_SECONDS)
+
+# Alert fan-out, snapshot publishing, archival, blood forecasts and deployment
+# ticks. They run in `flask run-workers` (or in `python app.py`);
+# request-serving processes only enqueue work for them
+BACKGROUND_WORKERS = (alert_outbox, snapshot_publisher, archive_worker, forecast_worker, deployment_scheduler)
+
+def start_workers():
+    for worker in BACKGROUND_WORKERS:
+        worker.start()
+
+def stop_workers(timeout=10):
+    for worker in BACKGROUND_WORKERS:
+        worker.stop(timeout)
+
+# Push committed changes to connected dashboards (registered after cache
+# invalidation so a client resync never reads a stale snapshot)
+delta_broadcaster = DeltaBroadcaster(broadcast)
+app.wsgi_app = socketio.WSGIApp(sio, app.wsgi_app)
+
+PREDICTIONS_PAGE_SIZE = 1000
+PREDICTIONS_MAX_PAGE_SIZE = 10000
+HOSPITALS_PAGE_SIZE = 100
+HOSPITALS_MAX_PAGE_SIZE = 1000
 
 def seed_data():
     """Seed initial data if tables are empty"""
@@ -41,16 +135,7 @@ def seed_data():
         return
 
     # Seed resources
-    resources = [
-        Resource(resource_type="ambulances", total_quantity=15000, available_quantity=12500),
-        Resource(resource_type="hospital_beds", total_quantity=1850000, available_quantity=980000),
-        Resource(resource_type="icu_beds", total_quantity=95000, available_quantity=45000),
-        Resource(resource_type="ventilators", total_quantity=48000, available_quantity=28000),
-        Resource(resource_type="blood_units", total_quantity=500000, available_quantity=420000),
-        Resource(resource_type="medical_teams", total_quantity=5000, available_quantity=3500),
-        Resource(resource_type="relief_kits", total_quantity=2000000, available_quantity=1500000),
-        Resource(resource_type="oxygen_cylinders", total_quantity=250000, available_quantity=180000)
-    ]
+    resources = [Resource(**r) for r in SEED_RESOURCES]
     db.session.add_all(resources)
 
     # Seed some hospitals
@@ -68,11 +153,12 @@ def seed_data():
     for region, data in INDIA_REGIONS.items():
         disaster_type = random.choice(list(DISASTER_TYPES.keys()))
         pred = Prediction(
-            prediction_id=f"PRED-{random.randint(10000, 99999)}",
+            prediction_id=f"PRED-{uuid.uuid4().hex}",
             disaster_type=disaster_type,
             confidence=random.uniform(0.75, 0.98),
             latitude=data["lat"],
             longitude=data["lng"],
+            region=region,
             radius_km=50,
             predicted_onset=datetime.utcnow() + timedelta(hours=random.randint(6, 72)),
             severity=random.randint(2, 5),
@@ -82,65 +168,447 @@ def seed_data():
         db.session.add(pred)
 
     db.session.commit()
+    refresh_blood_forecasts()
 
 def init_db():
     with app.app_context():
         db.create_all()
         seed_data()
 
+@app.cli.command('init-db')
+def init_db_command():
+    """Create the schema and seed initial data into an empty database"""
+    init_db()
+    click.echo(f"Initialized {db.engine.url.render_as_string(hide_password=True)}")
+
 @app.route('/')
 def index():
     """Main dashboard"""
-    return render_template('index.html')
+    return render_template('index.html', low_bandwidth=app.config['LOW_BANDWIDTH_MODE'])
+
+def cached_json_response(key, builder, cache=dashboard_cache):
+    """Serve the cached JSON snapshot for `key`, building it on a miss"""
+    return serve_snapshot(key, cache.get(key, builder), cache)
+
+def serve_snapshot(key, snapshot, cache=dashboard_cache):
+    """
+    Serve a JSON snapshot, compressed when the client accepts it and
+    answered with 304 when the client already has it
+    """
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding'))
+    if encoding:
+        # Keyed on the body too: an invalidation between the two gets must not
+        # file the previous body's compression under the new generation
+        body = snapshot.body
+        snapshot = cache.get(f"{key}:{encoding}:{snapshot.etag}", lambda: compress(body, encoding))
+
+    if request.if_none_match.contains(snapshot.etag):
+        response = Response(status=304)
+    else:
+        response = Response(snapshot.body, mimetype='application/json')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(snapshot.etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.add('Accept-Encoding')
+    return response
 
 @app.route('/api/dashboard')
 def get_dashboard_data():
-    """Get comprehensive dashboard data from DB"""
+    """
+    Get comprehensive dashboard data (served from the snapshot cache).
+    format=compact (the default in LOW_BANDWIDTH_MODE) returns the columnar
+    wire format; add since=<version> to receive only what changed.
+    """
+    default_format = 'compact' if app.config['LOW_BANDWIDTH_MODE'] else 'full'
+    if request.args.get('format', default_format) != 'compact':
+        return cached_json_response('dashboard', build_dashboard_body)
+
+    # Clients pass back X-Dashboard-Version (the uncompressed body's ETag) as `since`
+    current = dashboard_cache.get('dashboard-compact', build_compact_body)
+    since = request.args.get('since')
+    base = compact_history.get(since) if since else None
+    if base is not None:
+        response = cached_json_response(
+            f"dashboard-compact-since:{since}",
+            lambda: encode(diff_compact(base, compact_payload(current), since, current.etag))
+        )
+    else:
+        response = serve_snapshot('dashboard-compact', current)
+    response.headers['X-Dashboard-Version'] = current.etag
+    return response
+
+@replica_reads()
+def build_compact_body():
+    """Build the compact dashboard and remember it for later deltas"""
+    payload = build_compact_dashboard()
+    body = encode(payload)
+    compact_history.remember(hashlib.sha1(body).hexdigest(), payload)
+    return body
+
+def compact_payload(snapshot):
+    """The decoded payload for a compact snapshot (built by this or another worker)"""
+    payload = compact_history.get(snapshot.etag)
+    if payload is None:
+        payload = json.loads(snapshot.body)
+        compact_history.remember(snapshot.etag, payload)
+    return payload
+
+@replica_reads()
+def build_dashboard_body():
+    """Get comprehensive dashboard data from DB as serialized JSON"""
     predictions = Prediction.query.order_by(Prediction.predicted_onset).all()
     resources = Resource.query.all()
     deployments = Deployment.query.order_by(Deployment.timestamp.desc()).limit(10).all()
     alerts = Alert.query.order_by(Alert.timestamp.desc()).limit(10).all()
 
-    prediction_list = []
-    for p in predictions:
-        prediction_list.append({
-            "id": p.prediction_id,
-            "disaster_type": p.disaster_type,
-            "severity": p.severity,
-            "confidence": round(p.confidence * 100, 1),
-            "lat": p.latitude,
-            "lng": p.longitude,
-            "affected_population": p.affected_population,
-            "predicted_time": p.predicted_onset.strftime("%Y-%m-%d %H:%M")
-        })
-
-    resource_dict = {r.resource_type: {"total": r.total_quantity, "available": r.available_quantity} for r in resources}
-
-    return jsonify({
+    prediction_list = [p.to_dict() for p in predictions]
+
+    resource_dict = {r.resource_type: r.to_dict() for r in resources}
+
+    return app.json.dumps({
         "predictions": prediction_list,
         "resources": resource_dict,
-        "deployments": [
-            {"id": d.deployment_id, "resource": d.resource_type, "quantity": d.quantity, "status": d.status} for d in deployments
-        ],
+        "deployments": [d.to_dict() for d in deployments],
         "statistics": {
             "total_predictions": len(predictions),
             "critical_predictions": len([p for p in predictions if p.severity >= 4]),
             "hospital_readiness": get_hospital_readiness()
         }
-    })
+    }).encode('utf-8')
+
+@app.route('/api/risk-zones')
+def get_risk_zones():
+    """
+    Get merged risk-zone polygons at a level of detail (0 = full, higher is
+    coarser), as last rebuilt by the snapshot publisher before it publishes.
+    """
+    lod = request.args.get('lod', 0, type=int)
+    if lod not in LOD_TOLERANCES_KM:
+        return jsonify({"error": f"lod must be one of {sorted(LOD_TOLERANCES_KM)}"}), 400
+
+    return cached_json_response(
+        f"risk_zones:{lod}", lambda: app.json.dumps(zone_polygons(lod)).encode('utf-8'), map_cache)
+
+@app.route('/api/tiles/<int:z>/<int:x>/<int:y>')
+@replica_reads()
+def get_prediction_tile(z, x, y):
+    """Get prediction clusters (count, max severity, affected population) for one map tile"""
+    if not valid_tile(z, x, y):
+        return jsonify({"error": "Tile out of range"}), 404
+    return cached_json_response(
+        f"tile:{z}/{x}/{y}", lambda: app.json.dumps(build_tile(z, x, y)).encode('utf-8'), map_cache)
+
+@app.route('/api/snapshot')
+def get_risk_snapshot():
+    """
+    Get the binary risk map snapshot (see risk_snapshot.py). Clients detect
+    staleness with If-None-Match; X-Snapshot-Version carries the version.
+    """
+    reader = risk_snapshots.get()
+    if request.if_none_match.contains(reader.version):
+        response = Response(status=304)
+    else:
+        response = Response(reader.buffer[:], mimetype='application/octet-stream')
+    response.set_etag(reader.version)
+    response.headers['X-Snapshot-Version'] = reader.version
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/api/alerts/queue')
+def get_alert_queue_stats():
+    """Get alert outbox depth and drain rate"""
+    return jsonify(alert_outbox.stats())
+
+@app.route('/api/predictions/<prediction_id>/hospitals')
+def get_hospitals_near_prediction(prediction_id):
+    """Get hospitals within radius_km (default BLOOD_BANK_SEARCH_RADIUS_KM) of a prediction"""
+    radius_km = request.args.get('radius_km', type=float)
+    if 'radius_km' in request.args and not (radius_km is not None and 0 < radius_km < math.inf):
+        return jsonify({"error": "radius_km must be a positive number"}), 400
+    try:
+        hospitals = hospitals_near_prediction(prediction_id, radius_km)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if hospitals is None:
+        return jsonify({"error": "Prediction not found"}), 404
+    return jsonify(hospitals)
+
+@app.route('/api/hospitals/readiness')
+@replica_reads()
+def get_hospitals_readiness():
+    """Get paginated hospital readiness, optionally most critical first"""
+    limit = request.args.get('limit', HOSPITALS_PAGE_SIZE, type=int)
+    offset = request.args.get('offset', 0, type=int)
+    # SQLite reads a negative LIMIT or OFFSET as none at all
+    if limit < 1 or offset < 0:
+        return jsonify({"error": "limit must be at least 1 and offset not negative"}), 400
+    return jsonify(get_hospital_readiness(
+        region=request.args.get('region'),
+        limit=min(limit, HOSPITALS_MAX_PAGE_SIZE),
+        offset=offset,
+        critical_first=request.args.get('critical_first', 'false').lower() in ('1', 'true')
+    ))
+
+@app.route('/api/hospitals/readiness/regions')
+@replica_reads()
+def get_hospitals_region_readiness():
+    """Get readiness rollups per region"""
+    return jsonify(get_region_readiness())
+
+@app.route('/api/predictions/ingest', methods=['POST'])
+def ingest_prediction_batch():
+    """Upsert a CSV or NDJSON batch of predictions streamed in the request body"""
+    fmt = request.args.get('format') or ('csv' if request.mimetype == 'text/csv' else 'ndjson')
+    if fmt not in FORMATS:
+        return jsonify({"error": f"Unsupported format, expected one of {', '.join(FORMATS)}"}), 400
+    return jsonify(ingest_predictions(open_text(request.stream), fmt))
+
+@app.route('/api/blood/shortages')
+def get_blood_shortage_forecasts():
+    """Get regions forecast to run short of blood, as of the last forecast refresh"""
+    return jsonify(get_blood_shortages())
 
 @app.route('/api/predictions')
+@replica_reads()
 def get_predictions():
-    """Get AI predictions from DB"""
-    predictions = Prediction.query.all()
-    return jsonify([{
-        "id": p.prediction_id,
-        "disaster_type": p.disaster_type,
-        "severity": p.severity,
-        "lat": p.latitude,
-        "lng": p.longitude
-    } for p in predictions])
+    """
+    Get AI predictions from DB, newest first.
+
+    Query parameters: limit, cursor (from the X-Next-Cursor header),
+    disaster_type, min_severity, bbox=min_lat,min_lng,max_lat,max_lng,
+    fields=id,severity,... and format=ndjson to stream every matching row.
+    """
+    stream = request.args.get('format') == 'ndjson'
+    limit = request.args.get('limit', type=int)
+    # SQLite reads a negative LIMIT as no limit at all
+    if limit is not None and limit < 1:
+        return jsonify({"error": "limit must be at least 1"}), 400
+    if not stream:
+        limit = min(limit or PREDICTIONS_PAGE_SIZE, PREDICTIONS_MAX_PAGE_SIZE)
+    fields = request.args.get('fields')
+    bbox = request.args.get('bbox')
+
+    try:
+        if bbox:
+            bbox = [float(v) for v in bbox.split(',')]
+            if len(bbox) != 4:
+                raise ValueError("bbox must be min_lat,min_lng,max_lat,max_lng")
+            min_lat, min_lng, max_lat, max_lng = bbox
+            # Chained comparisons are False for NaN, so this also rejects it
+            if not (-90.0 <= min_lat <= max_lat <= 90.0 and -180.0 <= min_lng <= max_lng <= 180.0):
+                raise ValueError("bbox must be ordered min <= max within -90..90 and -180..180")
+        rows = iter_predictions(
+            fields=fields.split(',') if fields else None,
+            disaster_type=request.args.get('disaster_type'),
+            min_severity=request.args.get('min_severity', type=int),
+            bbox=bbox,
+            cursor=request.args.get('cursor'),
+            limit=limit
+        )
+        # Run the query now so bad parameters still produce a 400
+        first = next(rows, None)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if stream:
+        def generate():
+            if first is None:
+                return
+            yield app.json.dumps(first[0]) + '\n'
+            for item, _ in rows:
+                yield app.json.dumps(item) + '\n'
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    items = []
+    next_cursor = None
+    if first is not None:
+        item, next_cursor = first
+        items.append(item)
+        for item, next_cursor in rows:
+            items.append(item)
+    response = jsonify(items)
+    if len(items) == limit:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+@app.route('/api/analytics/daily')
+@replica_reads()
+def get_daily_analytics():
+    """
+    Per-day counts by region and type over the full history (archived and live).
+    Query parameters: kind (prediction, alert, deployment), since, until
+    (YYYY-MM-DD) and region.
+    """
+    kind = request.args.get('kind', 'prediction')
+    if kind not in KINDS:
+        return jsonify({"error": f"kind must be one of {', '.join(KINDS)}"}), 400
+    try:
+        since, until = (date.fromisoformat(request.args[p]) if request.args.get(p) else None
+                        for p in ('since', 'until'))
+    except ValueError:
+        return jsonify({"error": "since and until must be YYYY-MM-DD"}), 400
+    return jsonify(daily_summary(kind, since, until, request.args.get('region')))
+
+@app.route('/api/deployments/in-flight')
+def get_in_flight_deployments():
+    """
+    Quantities not yet deployed per region and resource type, as the
+    deployment scheduler last published them. Query parameter: region.
+    """
+    regions, by_status = in_flight_totals(request.args.get('region'))
+    return jsonify({'regions': regions, 'by_status': by_status})
+
+@app.route('/api/simulation/shortfall', methods=['POST'])
+def start_shortfall_simulation():
+    """
+    Start estimating the probability that current stock falls short, per
+    resource and region, over the active predictions. Query parameters:
+    scenarios, horizon_hours and seed. Returns 202 with the job id; poll
+    the Location URL for the result.
+    """
+    try:
+        scenarios = int(request.args.get('scenarios', config_obj.SIMULATION_SCENARIOS))
+        horizon = int(request.args.get('horizon_hours', config_obj.SIMULATION_HORIZON_HOURS))
+        seed = int(request.args['seed']) if request.args.get('seed') else None
+    except ValueError:
+        return jsonify({"error": "scenarios, horizon_hours and seed must be integers"}), 400
+    if not 0 < scenarios <= config_obj.SIMULATION_MAX_SCENARIOS or horizon <= 0:
+        return jsonify({"error": f"scenarios must be 1-{config_obj.SIMULATION_MAX_SCENARIOS} "
+                                 f"and horizon_hours positive"}), 400
+    with replica_reads():
+        inputs, regions, stock = load_inputs(horizon_hours=horizon,
+                                             onset_sigma_hours=config_obj.SIMULATION_ONSET_SIGMA_HOURS)
+    job_id = simulation_jobs.submit(inputs, regions, stock, scenarios, horizon,
+                                    config_obj.SIMULATION_ONSET_SIGMA_HOURS, seed)
+    location = url_for('get_shortfall_simulation', job_id=job_id)
+    return jsonify({'job_id': job_id, 'status': 'pending'}), 202, {'Location': location}
+
+@app.route('/api/simulation/shortfall/<job_id>')
+def get_shortfall_simulation(job_id):
+    """A simulation job's status, with its result once done"""
+    job = simulation_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired simulation job"}), 404
+    return jsonify(job)
+
+@app.route('/metrics')
+def get_metrics():
+    """Prometheus scrape endpoint"""
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/metrics/profiles')
+def get_profiles():
+    """Stack profiles of recent slow sampled requests"""
+    if profiler is None:
+        return jsonify({"error": "Profiling disabled, set PROFILE_SAMPLE_RATE"}), 404
+    return jsonify(list(profiler.profiles))
+
+@app.cli.command('run-workers')
+def run_workers_command():
+    """Run the background workers until interrupted (alongside any WSGI server)"""
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    start_workers()
+    click.echo(f"Running {len(BACKGROUND_WORKERS)} background workers; Ctrl+C to stop")
+    try:
+        while not stopping.wait(1.0):
+            pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_workers()
+
+@app.cli.command('ingest-predictions')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(FORMATS), help="Defaults to csv for *.csv, else ndjson")
+@click.option('--chunk-size', default=CHUNK_SIZE, show_default=True)
+def ingest_predictions_command(path, fmt, chunk_size):
+    """Upsert predictions from a CSV or NDJSON file"""
+    fmt = fmt or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+    start = time.perf_counter()
+    with open(path, encoding='utf-8', newline='') as f:
+        stats = ingest_predictions(f, fmt, chunk_size)
+    elapsed = time.perf_counter() - start
+    for error in stats['errors']:
+        click.echo(f"line {error['line']}: {error['error']}", err=True)
+    click.echo(f"{stats['upserted']} upserted, {stats['rejected']} rejected in {elapsed:.1f}s "
+               f"({stats['received'] / max(elapsed, 1e-9):.0f} rows/s)")
+
+@app.cli.command('archive')
+def archive_command():
+    """Move rows past their retention window into the monthly archive tables"""
+    counts = archive_expired()
+    click.echo(", ".join(f"{n} {kind}s" for kind, n in counts.items()) + " archived")
+
+@app.cli.command('refresh-forecasts')
+@click.option('--force', is_flag=True, help="Recompute every region, changed or not")
+def refresh_forecasts_command(force):
+    """Recompute blood demand forecasts for regions whose inputs changed"""
+    counts = refresh_blood_forecasts(force=force)
+    click.echo(f"{counts['updated']} updated, {counts['removed']} removed, {counts['unchanged']} unchanged")
+
+@app.cli.command('train-models')
+@click.option('--version', 'version', default=lambda: datetime.utcnow().strftime('%Y.%m.%d'),
+              help="Defaults to today's date")
+@click.option('--samples', default=50000, show_default=True)
+def train_models_command(version, samples):
+    """Train baseline disaster and severity models into the model directory"""
+    train_baseline_models(model_cache.directory, version, samples)
+    click.echo(f"Saved models {version} to {model_cache.directory}")
+
+@app.cli.command('simulate-shortfall')
+@click.option('--scenarios', type=int, default=lambda: config_obj.SIMULATION_SCENARIOS)
+@click.option('--horizon', 'horizon', type=int, default=lambda: config_obj.SIMULATION_HORIZON_HOURS,
+              help="Hours ahead to cover")
+@click.option('--workers', type=int, help="Worker processes (default: SIMULATION_WORKERS)")
+@click.option('--seed', type=int)
+def simulate_shortfall_command(scenarios, horizon, workers, seed):
+    """Estimate resource shortfall probabilities for the active predictions"""
+    inputs, regions, stock = load_inputs(horizon_hours=horizon,
+                                         onset_sigma_hours=config_obj.SIMULATION_ONSET_SIGMA_HOURS)
+    simulator = (ShortfallSimulator(workers, config_obj.SIMULATION_BATCH_SIZE or None,
+                                    config_obj.SIMULATION_MEMORY_MB_PER_WORKER)
+                 if workers else shortfall_simulator)
+    try:
+        result = simulator.run(inputs, regions, stock, scenarios, horizon,
+                               config_obj.SIMULATION_ONSET_SIGMA_HOURS, seed)
+    finally:
+        simulator.shutdown()
+    click.echo(f"{result['scenarios']} scenarios, {result['predictions']} predictions, "
+               f"{horizon}h horizon, {result['seconds']}s")
+    for resource, r in result['resources'].items():
+        click.echo(f"  {resource:<18} available {r['available']:>9}  demand p95 {r['demand_p95']:>9.0f}  "
+                   f"P(shortfall) {r['shortfall_probability']:.1%}")
+    for region, probabilities in result['regions'].items():
+        worst = max(probabilities, key=probabilities.get)
+        if probabilities[worst]:
+            click.echo(f"  {region}: {worst} unmet in {probabilities[worst]:.1%} of scenarios")
+
+@app.cli.command('run-inference')
+@click.option('--resolution', type=float, help="Grid resolution in degrees")
+@click.option('--version', 'version', help="Model version (default: newest)")
+def run_inference_command(resolution, version):
+    """Score the national grid and upsert flagged cells as predictions"""
+    lat, lng = national_grid(resolution or config_obj.INFERENCE_GRID_RESOLUTION)
+    weather = None
+    if weather_fetcher.enabled:
+        weather = weather_fetcher.fetch_grid(lat, lng)
+        fetched = weather_fetcher.stats()
+        click.echo(f"Weather: {fetched['cells']} cells, {fetched['fetched']} fetched, "
+                   f"{fetched['errors']} failed, {fetched['points_per_second']} points/s")
+    stats = run_inference(model_cache, lat=lat, lng=lng, weather=weather, version=version)
+    click.echo(f"{stats['model_version']}: {stats['cells']} cells at {stats['cells_per_second']} cells/s, "
+               f"{stats['flagged']} flagged, {stats['removed']} cleared")
 
 if __name__ == '__main__':
-    init_db()
-    app.run(debug=True, port=5000)
+    # Schema creation and seeding are explicit (`flask --app app init-db`) so
+    # workers and CLI commands don't pay for them on every start
+    with app.app_context():
+        if not inspect(db.engine).has_table(Resource.__tablename__):
+            app.logger.warning("Database has no schema yet; run `flask --app app init-db` first")
+    # The reloader (debug only) re-runs this file in a child process that
+    # serves requests; the watching parent must not start workers too
+    if not app.debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_workers()
+    app.run(debug=app.config['DEBUG'], port=5000, threaded=True)
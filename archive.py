@@ -0,0 +1,256 @@
+"""
+LifeGuard AI - Archival and Daily Rollups
+Moves expired predictions, delivered alerts and completed deployments out
+of the hot tables into monthly archive tables (predictions_archive_202401,
+alerts_archive_202401, ...), adding each row to a per-day rollup as it
+leaves. The dashboard and API only scan the hot tables, so their cost
+tracks active rows however long the history grows.
+
+Every chunk is copied, rolled up and deleted in one transaction, so an
+interrupted run never loses or double-counts a row.
+"""
+
+import threading
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from sqlalchemy import (Column, DateTime, Index, MetaData, Table, and_, case, delete, exists, func, insert,
+                        literal, or_, select, true, update)
+from models import db, Prediction, Alert, Deployment, BloodForecast, DailyRollup
+from alert_outbox import SENT, FAILED
+from config import get_config
+from database import upsert_insert
+import logging
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_CHUNK_SIZE = 2000
+KINDS = ('prediction', 'alert', 'deployment')
+
+# Archive tables live outside db.metadata so create_all() never touches them
+archive_metadata = MetaData()
+_archive_tables = {}
+# Lookup column indexed in each archive table
+ARCHIVE_KEYS = {'predictions': 'prediction_id', 'alerts': 'alert_id', 'deployments': 'deployment_id'}
+
+
+def archive_table(model, month):
+    """The archive table for `model` rows of `month` (YYYYMM), created on first use"""
+    name = f"{model.__tablename__}_archive_{month}"
+    table = _archive_tables.get(name)
+    if table is None:
+        # Same columns without keys or constraints; `id` is the hot table's id
+        columns = [Column(c.name, c.type) for c in model.__table__.columns]
+        key = ARCHIVE_KEYS[model.__tablename__]
+        table = _archive_tables[name] = Table(
+            name, archive_metadata, *columns, Column('archived_at', DateTime),
+            Index(f"ix_{name}_{key}", key)
+        )
+    table.create(db.session.connection(), checkfirst=True)
+    return table
+
+
+def _source(kind):
+    """
+    (model, day expression, region, category, total, max severity, join)
+    for the rollup of one kind
+    """
+    if kind == 'prediction':
+        return (Prediction, func.coalesce(Prediction.predicted_onset, Prediction.timestamp), Prediction.region,
+                Prediction.disaster_type, Prediction.affected_population, Prediction.severity, None)
+    if kind == 'alert':
+        # Alerts carry no region; take it from their prediction, which stays hot while they do
+        return (Alert, Alert.timestamp, Prediction.region, Alert.alert_type,
+                case((Alert.status == SENT, 1), else_=0), None,
+                (Prediction, Alert.prediction_id == Prediction.prediction_id))
+    if kind == 'deployment':
+        return (Deployment, Deployment.timestamp, Deployment.target_region, Deployment.resource_type,
+                Deployment.quantity, None, None)
+    raise ValueError(f"Unknown kind {kind!r}, expected one of {KINDS}")
+
+
+def _expired(kind, now):
+    config = get_config()
+    if kind == 'prediction':
+        cutoff = now - timedelta(days=config.PREDICTION_ARCHIVE_AFTER_DAYS)
+        return and_(
+            or_(Prediction.predicted_onset < cutoff,
+                and_(Prediction.predicted_onset.is_(None), Prediction.timestamp < cutoff)),
+            # Keep predictions that hot alerts or forecasts still point at
+            ~exists().where(Alert.prediction_id == Prediction.prediction_id),
+            ~exists().where(BloodForecast.prediction_id == Prediction.prediction_id)
+        )
+    if kind == 'alert':
+        cutoff = now - timedelta(days=config.ALERT_ARCHIVE_AFTER_DAYS)
+        return and_(Alert.status.in_([SENT, FAILED]), Alert.timestamp < cutoff)
+    cutoff = now - timedelta(days=config.DEPLOYMENT_ARCHIVE_AFTER_DAYS)
+    return and_(Deployment.status == 'deployed', Deployment.timestamp < cutoff)
+
+
+def _aggregate(kind, where):
+    model, day, region, category, total, severity, join = _source(kind)
+    day = func.date(day)
+    region = func.coalesce(region, '')
+    category = func.coalesce(category, '')
+    stmt = select(day, region, category, func.count(), func.coalesce(func.sum(total), 0),
+                  func.max(severity) if severity is not None else literal(None))
+    stmt = stmt.select_from(model)
+    if join is not None:
+        stmt = stmt.outerjoin(*join)
+    return stmt.where(where).group_by(day, region, category)
+
+
+def _as_date(value):
+    # SQLite's date() returns text
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def _add_rollups(kind, rows):
+    if not rows:
+        return
+    values = [{'kind': kind, 'day': _as_date(r[0]), 'region': r[1], 'category': r[2], 'count': r[3],
+               'total': int(r[4] or 0), 'max_severity': r[5]} for r in rows]
+    table = DailyRollup.__table__
+    stmt = upsert_insert(table, db.session.get_bind().dialect.name)
+    if stmt is not None:
+        old, new = table.c.max_severity, stmt.excluded.max_severity
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=['kind', 'day', 'region', 'category'],
+            set_={
+                'count': table.c.count + stmt.excluded.count,
+                'total': table.c.total + stmt.excluded.total,
+                'max_severity': case((func.coalesce(new, -1) > func.coalesce(old, -1), new), else_=old)
+            }
+        ), values)
+        return
+    for v in values:
+        key = and_(table.c.kind == kind, table.c.day == v['day'], table.c.region == v['region'],
+                   table.c.category == v['category'])
+        existing = db.session.execute(select(table.c.max_severity).where(key)).first()
+        if existing is None:
+            db.session.execute(insert(table), [v])
+            continue
+        severities = [s for s in (existing[0], v['max_severity']) if s is not None]
+        db.session.execute(update(table).where(key).values(
+            count=table.c.count + v['count'], total=table.c.total + v['total'],
+            max_severity=max(severities) if severities else None))
+
+
+def _archive_chunk(kind, now):
+    model, day, *_ = _source(kind)
+    rows = db.session.execute(
+        select(model.id, day).where(_expired(kind, now)).order_by(model.id).limit(ARCHIVE_CHUNK_SIZE)
+    ).all()
+    if not rows:
+        return 0
+    by_month = defaultdict(list)
+    for row_id, when in rows:
+        by_month[f"{when:%Y%m}"].append(row_id)
+    ids = [r[0] for r in rows]
+
+    hot = model.__table__
+    try:
+        _add_rollups(kind, db.session.execute(_aggregate(kind, model.id.in_(ids))).all())
+        for month, month_ids in by_month.items():
+            table = archive_table(model, month)
+            columns = [c.name for c in hot.columns]
+            db.session.execute(insert(table).from_select(
+                columns + ['archived_at'],
+                select(*hot.columns, literal(now, DateTime)).where(hot.c.id.in_(month_ids))
+            ))
+        db.session.execute(delete(hot).where(hot.c.id.in_(ids)))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(ids)
+
+
+def archive_expired(now=None):
+    """
+    Archive everything past its retention window. Alerts go first, since a
+    prediction stays hot while any alert still references it. Returns the
+    number of rows archived per kind.
+    """
+    now = now or datetime.utcnow()
+    counts = {}
+    for kind in ('alert', 'prediction', 'deployment'):
+        counts[kind] = 0
+        while True:
+            moved = _archive_chunk(kind, now)
+            counts[kind] += moved
+            if moved < ARCHIVE_CHUNK_SIZE:
+                break
+    logger.info(f"Archived {counts['prediction']} predictions, {counts['alert']} alerts, "
+                f"{counts['deployment']} deployments")
+    return counts
+
+
+def daily_summary(kind, since=None, until=None, region=None):
+    """
+    Per-day totals by region and category over the full history: archived
+    rows come from DailyRollup, rows still hot are aggregated live.
+    """
+    model, day, region_column, *_ = _source(kind)
+    rollups = select(DailyRollup.day, DailyRollup.region, DailyRollup.category, DailyRollup.count,
+                     DailyRollup.total, DailyRollup.max_severity).where(DailyRollup.kind == kind)
+    live = []
+    if since is not None:
+        rollups = rollups.where(DailyRollup.day >= since)
+        live.append(day >= datetime.combine(since, datetime.min.time()))
+    if until is not None:
+        rollups = rollups.where(DailyRollup.day <= until)
+        live.append(day < datetime.combine(until + timedelta(days=1), datetime.min.time()))
+    if region is not None:
+        rollups = rollups.where(DailyRollup.region == region)
+        live.append(region_column == region)
+
+    totals = {}
+    for row in list(db.session.execute(rollups)) + list(db.session.execute(_aggregate(kind, and_(*live) if live else true()))):
+        key = (_as_date(row[0]), row[1], row[2])
+        entry = totals.setdefault(key, {'count': 0, 'total': 0, 'max_severity': None})
+        entry['count'] += row[3]
+        entry['total'] += int(row[4] or 0)
+        if row[5] is not None and (entry['max_severity'] is None or row[5] > entry['max_severity']):
+            entry['max_severity'] = row[5]
+
+    results = []
+    for (day_value, region_value, category), entry in sorted(totals.items()):
+        result = {'day': day_value.isoformat(), 'region': region_value, 'category': category,
+                  'count': entry['count'], 'total': entry['total']}
+        if kind == 'prediction':
+            result['max_severity'] = entry['max_severity']
+        results.append(result)
+    return results
+
+
+class ArchiveWorker:
+    """Background thread that runs archive_expired() every `interval` seconds"""
+
+    def __init__(self, app, interval=3600.0):
+        self.app = app
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run(self):
+        logger.info("Archive worker started")
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    archive_expired()
+            except Exception as e:
+                logger.error(f"Archive run failed: {e}")
+            self._stop.wait(self.interval)
+        logger.info("Archive worker stopped")
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name='archive', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
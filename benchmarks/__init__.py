@@ -0,0 +1,3 @@
+"""
+LifeGuard AI - Benchmarks and local fakes for performance testing
+"""
@@ -0,0 +1,76 @@
+"""
+LifeGuard AI - Resource allocation throughput benchmark
+Measures predictions/sec for allocate_resources_batch at several batch sizes
+and with concurrent allocator threads.
+
+Usage: python -m benchmarks.bench_allocation [--predictions 5000] [--threads 4]
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--predictions', type=int, default=5000)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 50, 500])
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='lifeguard-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir, 'alloc.db')}"
+
+    from sqlalchemy import insert, update, create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app import app, db
+    from models import Prediction, Resource, Deployment
+    from service import allocate_resources_batch
+    from benchmarks.datagen import make_predictions, make_resources
+
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(Resource), make_resources())
+        db.session.execute(insert(Prediction), make_predictions(args.predictions))
+        db.session.commit()
+        ids = [f"PRED-{i:08d}" for i in range(args.predictions)]
+
+        def reset():
+            db.session.execute(Deployment.__table__.delete())
+            for r in make_resources():
+                db.session.execute(update(Resource).where(Resource.resource_type == r['resource_type'])
+                                   .values(available_quantity=r['total_quantity'] * 1000))
+            db.session.commit()
+
+        for size in args.batch_sizes:
+            reset()
+            start = time.perf_counter()
+            for i in range(0, len(ids), size):
+                allocate_resources_batch(ids[i:i + size])
+            elapsed = time.perf_counter() - start
+            print(f"batch={size:>5}: {len(ids) / elapsed:10.0f} predictions/s")
+
+        reset()
+
+    engine = create_engine(os.environ['DATABASE_URL'], connect_args={'timeout': 60})
+    Session = sessionmaker(engine)
+
+    def worker(chunk):
+        with Session() as session:
+            for i in range(0, len(chunk), 50):
+                allocate_resources_batch(chunk[i:i + 50], session=session)
+
+    threads = [threading.Thread(target=worker, args=(ids[n::args.threads],)) for n in range(args.threads)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    print(f"{args.threads} threads, batch=50: {len(ids) / elapsed:10.0f} predictions/s")
+
+
+if __name__ == '__main__':
+    main()
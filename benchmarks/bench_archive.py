@@ -0,0 +1,72 @@
+"""
+LifeGuard AI - Archival benchmark
+Loads a year of expired predictions next to a small active set, then times
+the uncached dashboard build before and after archiving, and the archive
+run itself.
+
+Usage: python -m benchmarks.bench_archive [--history 200000] [--active 2000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--history', type=int, default=200000)
+    parser.add_argument('--active', type=int, default=2000)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='lifeguard-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir, 'archive.db')}"
+
+    from app import app, db, build_dashboard_body
+    from models import Prediction
+    from archive import archive_expired, daily_summary
+    from benchmarks.datagen import make_predictions, insert_chunked
+
+    now = datetime.utcnow()
+
+    def predictions(n, start):
+        rows = make_predictions(n, seed=start)
+        for i, row in enumerate(rows, start):
+            row['prediction_id'] = f"PRED-{i:08d}"
+            if i >= args.active:
+                # Spread history over the past year
+                row['predicted_onset'] = now - timedelta(days=8 + (i * 7) % 358, hours=i % 24)
+            else:
+                row['predicted_onset'] = now + timedelta(hours=1 + i % 72)
+        return rows
+
+    def dashboard_ms(repeat=3):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            build_dashboard_body()
+            best = min(best, time.perf_counter() - start)
+        return best * 1000
+
+    with app.app_context():
+        db.create_all()
+        insert_chunked(Prediction, predictions, args.history + args.active)
+        print(f"hot predictions: {Prediction.query.count()}")
+        print(f"dashboard build before archiving: {dashboard_ms():.0f} ms")
+
+        start = time.perf_counter()
+        counts = archive_expired()
+        elapsed = time.perf_counter() - start
+        print(f"archive_expired: {counts['prediction']} predictions in {elapsed:.1f}s "
+              f"({counts['prediction'] / elapsed:.0f} rows/s)")
+        print(f"hot predictions: {Prediction.query.count()}")
+        print(f"dashboard build after archiving: {dashboard_ms():.0f} ms")
+
+        start = time.perf_counter()
+        days = daily_summary('prediction')
+        print(f"daily_summary over full history: {len(days)} rows in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+LifeGuard AI - Compact dashboard wire format measurement
+Reports body size and build+encode time of the compact format (raw, gzip,
+brotli if installed, and a 1% delta) against the current JSON dashboard.
+
+Usage: python -m benchmarks.bench_compact [--predictions 100 1000 10000] [--hospitals 300]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+
+def timed(fn, repeat=3):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--predictions', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--hospitals', type=int, default=300)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='lifeguard-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir, 'compact.db')}"
+
+    from sqlalchemy import insert, update
+    from app import app, db, build_dashboard_body
+    from models import Prediction, Hospital, Resource
+    from compact import build_compact_dashboard, encode, diff_compact, compress, brotli
+    from benchmarks.datagen import make_predictions, make_hospitals, make_resources
+
+    encodings = ['gzip'] + (['br'] if brotli is not None else [])
+    print(f"{'rows':>7} {'json B':>11} {'json ms':>8} {'compact B':>10} {'ms':>7} {'saved':>6} "
+          + ''.join(f"{e + ' B':>10} {'saved':>6} " for e in encodings) + f"{'delta B':>9}")
+
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(Resource), make_resources())
+        db.session.execute(insert(Hospital), make_hospitals(args.hospitals))
+        db.session.commit()
+
+        for n in args.predictions:
+            db.session.execute(Prediction.__table__.delete())
+            db.session.execute(insert(Prediction), make_predictions(n))
+            db.session.commit()
+
+            full, full_ms = timed(build_dashboard_body)
+            base_payload = build_compact_dashboard()
+            compact, compact_ms = timed(lambda: encode(build_compact_dashboard()))
+
+            line = (f"{n:>7} {len(full):>11,} {full_ms:>8.1f} {len(compact):>10,} {compact_ms:>7.1f} "
+                    f"{1 - len(compact) / len(full):>6.0%} ")
+            for e in encodings:
+                size = len(compress(compact, e))
+                line += f"{size:>10,} {1 - size / len(full):>6.0%} "
+
+            # Change 1% of predictions and measure the delta payload
+            db.session.execute(update(Prediction).where(Prediction.id % 100 == 0).values(severity=Prediction.severity % 5 + 1))
+            db.session.commit()
+            delta = encode(diff_compact(base_payload, build_compact_dashboard(), 'old', 'new'))
+            print(line + f"{len(delta):>9,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+LifeGuard AI - /api/dashboard load benchmark
+Compares requests/sec through the Flask test client with the snapshot cache
+disabled, enabled, and with If-None-Match revalidation (304).
+
+Usage: python -m benchmarks.bench_dashboard [--predictions 2000] [--hospitals 500]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+
+def measure(client, requests, headers=None):
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.get('/api/dashboard', headers=headers or {})
+        assert response.status_code in (200, 304)
+    elapsed = time.perf_counter() - start
+    return requests / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--predictions', type=int, default=2000)
+    parser.add_argument('--hospitals', type=int, default=500)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='lifeguard-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir, 'dashboard.db')}"
+
+    from sqlalchemy import insert
+    from app import app, db, dashboard_cache
+    from models import Prediction, Hospital, Resource
+    from benchmarks.datagen import make_predictions, make_hospitals, make_resources
+
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(Resource), make_resources())
+        db.session.execute(insert(Hospital), make_hospitals(args.hospitals))
+        db.session.execute(insert(Prediction), make_predictions(args.predictions))
+        db.session.commit()
+
+    client = app.test_client()
+    ttl = dashboard_cache.ttl
+
+    dashboard_cache.ttl = 0
+    uncached = measure(client, max(args.requests // 10, 10))
+
+    dashboard_cache.ttl = ttl
+    cached = measure(client, args.requests)
+
+    etag = client.get('/api/dashboard').headers['ETag']
+    revalidated = measure(client, args.requests, {'If-None-Match': etag})
+
+    print(f"predictions={args.predictions} hospitals={args.hospitals}")
+    print(f"uncached:        {uncached:10.1f} req/s")
+    print(f"cached:          {cached:10.1f} req/s ({cached / uncached:.1f}x)")
+    print(f"304 revalidated: {revalidated:10.1f} req/s ({revalidated / uncached:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+LifeGuard AI - Deployment scheduler benchmark
+Seeds historical (deployed) and active deployments, then measures the
+scheduler's initial load, a catch-up tick, steady-state ticks, in-flight
+totals from its counters and from the tables it publishes versus a GROUP
+BY over the deployments table, and a naive tick that re-reads every active
+row to find the due ones.
+
+Usage: python -m benchmarks.bench_deployments [--historical 1000000] [--active 50000]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def _deployments(n, start, active, now):
+    from benchmarks.datagen import make_deployments
+    rows = make_deployments(n, start=start)
+    rng = random.Random(start)
+    for row in rows:
+        if active:
+            row['status'] = rng.choice(('dispatched', 'in_transit', 'arrived'))
+            row['timestamp'] = now - timedelta(minutes=rng.randint(0, 48 * 60))
+        else:
+            row['status'] = 'deployed'
+            row['timestamp'] = now - timedelta(days=rng.randint(3, 365))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--historical', type=int, default=1000000)
+    parser.add_argument('--active', type=int, default=50000)
+    parser.add_argument('--ticks', type=int, default=20, help="Steady-state ticks, 30 s apart")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='lifeguard-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir, 'deployments.db')}"
+    import logging
+    logging.disable(logging.INFO)
+
+    from sqlalchemy import func, insert, select
+    from app import app, db
+    from benchmarks.datagen import insert_chunked, make_resources
+    from deployments import DeploymentScheduler, ACTIVE_STATUSES, in_flight_totals, status_at
+    from models import Deployment, Resource
+
+    now = datetime.utcnow()
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(Resource), make_resources())
+        db.session.commit()
+        start = time.perf_counter()
+        insert_chunked(Deployment, lambda n, s: _deployments(n, s, False, now), args.historical)
+        insert_chunked(Deployment, lambda n, s: _deployments(n, s + args.historical, True, now), args.active)
+        print(f"seeded {args.historical} historical and {args.active} active deployments "
+              f"in {time.perf_counter() - start:.1f}s")
+
+        scheduler = DeploymentScheduler(app)
+        start = time.perf_counter()
+        scheduler.sync()
+        print(f"initial load: {scheduler.stats()['active']} active in {time.perf_counter() - start:.2f}s")
+
+        tick = scheduler.tick(now)
+        print(f"catch-up tick: {tick['advanced']} advanced, {tick['completed']} completed in {tick['seconds']:.2f}s")
+
+        seconds, advanced = [], 0
+        for i in range(1, args.ticks + 1):
+            tick = scheduler.tick(now + timedelta(seconds=30 * i))
+            seconds.append(tick['seconds'])
+            advanced += tick['advanced']
+        seconds.sort()
+        print(f"steady ticks: p50 {seconds[len(seconds) // 2] * 1000:.1f} ms, max {seconds[-1] * 1000:.1f} ms, "
+              f"{advanced / args.ticks:.1f} advanced per tick")
+
+        start = time.perf_counter()
+        for _ in range(100):
+            scheduler.in_flight()
+        counters = (time.perf_counter() - start) / 100
+        start = time.perf_counter()
+        for _ in range(100):
+            in_flight_totals()
+        published = (time.perf_counter() - start) / 100
+        grouped = (select(Deployment.target_region, Deployment.resource_type, func.sum(Deployment.quantity))
+                   .where(Deployment.status.in_(ACTIVE_STATUSES))
+                   .group_by(Deployment.target_region, Deployment.resource_type))
+        start = time.perf_counter()
+        for _ in range(5):
+            db.session.execute(grouped).all()
+        aggregate = (time.perf_counter() - start) / 5
+        print(f"in-flight totals: counters {counters * 1e6:.0f} us, published tables {published * 1000:.2f} ms, "
+              f"GROUP BY {aggregate * 1000:.1f} ms")
+
+        start = time.perf_counter()
+        for _ in range(3):
+            rows = db.session.execute(select(Deployment.id, Deployment.status, Deployment.timestamp,
+                                             Deployment.eta_hours)
+                                      .where(Deployment.status.in_(ACTIVE_STATUSES))).all()
+            later = now + timedelta(seconds=30 * (args.ticks + 1))
+            [r.id for r in rows if status_at(r.timestamp, r.eta_hours, r.status, later) != r.status]
+        naive = (time.perf_counter() - start) / 3
+        print(f"naive due scan: {naive * 1000:.1f} ms per tick over {len(rows)} active rows")
+
+        latest = select(Deployment).order_by(Deployment.timestamp.desc()).limit(10)
+        start = time.perf_counter()
+        for _ in range(100):
+            db.session.execute(latest).all()
+        print(f"dashboard latest 10: {(time.perf_counter() - start) * 10:.2f} ms (ix_deployments_timestamp)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+LifeGuard AI - Geospatial query benchmark
+Compares grid-indexed, NumPy-filtered queries against full scans with
+per-row Python haversine / point-in-polygon.
+
+Usage: python -m benchmarks.bench_geo [--hospitals 100000] [--users 1000000]
+"""
+
+import argparse
+import math
+import os
+import tempfile
+import time
+
+
+def timed(fn, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+
+def naive_haversine(lat1, lng1, lat2, lng2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2
+    return 2 * 6371.0 * math.asin(math.sqrt(a))
+
+
+def naive_in_polygon(lat, lng, polygon):
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        y1, x1 = polygon[i]
+        y2, x2 = polygon[j]
+        if (y1 > lat) != (y2 > lat) and lng < (x2 - x1) * (lat - y1) / (y2 - y1) + x1:
+            inside = not inside
+        j = i
+    return inside
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hospitals', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=1000000)
+    parser.add_argument('--radius-km', type=float, default=50.0)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='lifeguard-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir, 'geo.db')}"
+
+    import json
+    from app import app, db
+    from models import Hospital, User, RiskZone
+    from geo import hospitals_near, users_in_zone, backfill_cells
+    from benchmarks.datagen import make_hospitals, make_users, insert_chunked
+
+    with app.app_context():
+        db.create_all()
+        start = time.perf_counter()
+        insert_chunked(Hospital, lambda n, s: make_hospitals(n, seed=s), args.hospitals)
+        insert_chunked(User, lambda n, s: make_users(n, start=s), args.users)
+        backfill_cells()
+        print(f"loaded {args.hospitals} hospitals, {args.users} users in {time.perf_counter() - start:.1f}s")
+
+        lat, lng = 19.7515, 75.7139
+        indexed, indexed_ms = timed(lambda: hospitals_near(lat, lng, args.radius_km))
+
+        def naive_near():
+            return [h for h in Hospital.query.all()
+                    if naive_haversine(lat, lng, h.latitude, h.longitude) <= args.radius_km]
+        naive, naive_ms = timed(naive_near, repeat=1)
+        assert len(indexed) == len(naive)
+        print(f"hospitals within {args.radius_km}km: {len(indexed)} | indexed {indexed_ms:.1f}ms vs scan {naive_ms:.1f}ms")
+
+        polygon = [[19.0, 75.0], [20.5, 75.2], [20.2, 76.6], [19.2, 76.3]]
+        db.session.add(RiskZone(zone_id='BENCH', coordinates_json=json.dumps(polygon)))
+        db.session.commit()
+        indexed, indexed_ms = timed(lambda: list(users_in_zone('BENCH')), repeat=3)
+
+        def naive_zone():
+            return [(u.user_id, u.phone_number) for u in User.query.yield_per(50000)
+                    if naive_in_polygon(u.latitude, u.longitude, polygon)]
+        naive, naive_ms = timed(naive_zone, repeat=1)
+        assert len(indexed) == len(naive)
+        print(f"users in zone: {len(indexed)} | indexed {indexed_ms:.1f}ms vs scan {naive_ms:.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
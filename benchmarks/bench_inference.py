@@ -0,0 +1,76 @@
+"""
+LifeGuard AI - Model inference benchmark
+Trains baseline models, then compares cold (disk, with and without mmap)
+and warm (cached) model loads, and grid cells scored per second by one
+vectorized call versus scoring location by location.
+
+Usage: python -m benchmarks.bench_inference [--resolution 0.1] [--samples 50000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--resolution', type=float, default=0.1)
+    parser.add_argument('--samples', type=int, default=50000)
+    parser.add_argument('--per-location', type=int, default=200, help="Cells scored one at a time")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='lifeguard-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir, 'inference.db')}"
+
+    import numpy as np
+    from app import app, db
+    from inference import ModelCache, train_baseline_models, national_grid, feature_matrix, score, run_inference
+
+    model_dir = os.path.join(tmpdir, 'models')
+    start = time.perf_counter()
+    train_baseline_models(model_dir, '1.0', args.samples)
+    print(f"trained baseline models on {args.samples} samples in {time.perf_counter() - start:.1f}s")
+
+    for mmap in (False, True):
+        cache = ModelCache(model_dir, mmap=mmap)
+        start = time.perf_counter()
+        cache.get('disaster')
+        cache.get('severity')
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        cache.get('disaster')
+        cache.get('severity')
+        warm = time.perf_counter() - start
+        print(f"load {'mmap' if mmap else 'copy'}: cold {cold * 1000:.0f} ms, warm {warm * 1e6:.0f} us")
+
+    disaster, _ = cache.get('disaster')
+    severity, _ = cache.get('severity')
+    lat, lng = national_grid(args.resolution)
+    rng = np.random.default_rng(0)
+    weather = {'rainfall_mm': rng.gamma(0.6, 40.0, len(lat)), 'wind_kph': rng.gamma(2.0, 12.0, len(lat))}
+    X = feature_matrix(lat, lng, datetime.utcnow(), weather)
+
+    start = time.perf_counter()
+    score(X, disaster, severity)
+    elapsed = time.perf_counter() - start
+    print(f"vectorized: {len(X)} cells at {args.resolution} deg in {elapsed:.2f}s ({len(X) / elapsed:,.0f} cells/s)")
+
+    start = time.perf_counter()
+    for i in range(args.per_location):
+        score(X[i:i + 1], disaster, severity)
+    elapsed = time.perf_counter() - start
+    print(f"per location: {args.per_location / elapsed:,.0f} cells/s "
+          f"(national grid would take {len(X) / (args.per_location / elapsed):.0f}s)")
+
+    with app.app_context():
+        db.create_all()
+        start = time.perf_counter()
+        stats = run_inference(cache, lat=lat, lng=lng, weather=weather)
+        print(f"run_inference end to end: {stats['flagged']} predictions upserted in "
+              f"{time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+LifeGuard AI - Prediction ingestion benchmark
+Writes a synthetic NDJSON or CSV batch, then times a cold load and an
+idempotent re-load through ingest.ingest_predictions. Reports rows/sec and
+peak memory; the ORM baseline adds one object per row and commits once.
+
+Usage: python -m benchmarks.bench_ingest [--rows 1000000] [--format ndjson] [--orm-rows 50000]
+"""
+
+import argparse
+import csv
+import json
+import os
+import resource
+import tempfile
+import time
+
+
+def write_batch(path, fmt, n):
+    from benchmarks.datagen import make_predictions
+    fields = None
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        for start in range(0, n, 50000):
+            rows = make_predictions(min(50000, n - start), seed=start)
+            for i, row in enumerate(rows, start):
+                row['prediction_id'] = f"PRED-{i:09d}"
+                row['timestamp'] = row['timestamp'].isoformat()
+                row['predicted_onset'] = row['predicted_onset'].isoformat()
+            if fmt == 'ndjson':
+                f.writelines(json.dumps(row) + '\n' for row in rows)
+            else:
+                if fields is None:
+                    fields = list(rows[0])
+                    writer = csv.DictWriter(f, fieldnames=fields)
+                    writer.writeheader()
+                writer.writerows(rows)
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--format', choices=['ndjson', 'csv'], default='ndjson')
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--orm-rows', type=int, default=50000)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='lifeguard-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir, 'ingest.db')}"
+
+    from app import app, db
+    from models import Prediction
+    from ingest import ingest_predictions, validate
+
+    path = os.path.join(tmpdir, f"batch.{args.format}")
+    start = time.perf_counter()
+    write_batch(path, args.format, args.rows)
+    print(f"wrote {args.rows} rows ({os.path.getsize(path) / 1e6:.0f} MB) in {time.perf_counter() - start:.1f}s")
+
+    with app.app_context():
+        db.create_all()
+        for label in ('cold load', 're-load'):
+            start = time.perf_counter()
+            with open(path, encoding='utf-8', newline='') as f:
+                stats = ingest_predictions(f, args.format, args.chunk_size)
+            elapsed = time.perf_counter() - start
+            print(f"{label}: {stats['upserted']} upserted in {elapsed:.1f}s "
+                  f"({stats['received'] / elapsed:.0f} rows/s), peak RSS {peak_rss_mb():.0f} MB")
+        assert Prediction.query.count() == args.rows
+
+        # ORM unit-of-work baseline on a fresh table
+        db.drop_all()
+        db.create_all()
+        start = time.perf_counter()
+        with open(path, encoding='utf-8', newline='') as f:
+            reader = (json.loads(line) for line in f) if args.format == 'ndjson' else csv.DictReader(f)
+            for i, record in enumerate(reader):
+                if i >= args.orm_rows:
+                    break
+                db.session.add(Prediction(**validate(record)))
+        db.session.commit()
+        elapsed = time.perf_counter() - start
+        print(f"ORM baseline: {args.orm_rows} rows in {elapsed:.1f}s ({args.orm_rows / elapsed:.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+LifeGuard AI - Instrumentation overhead benchmark
+Measures the cost of one histogram observation from several threads at
+once and the per-request overhead of the metrics hooks on a cheap route.
+
+Usage: python -m benchmarks.bench_metrics [--threads 8] [--observations 200000] [--requests 1000]
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--observations', type=int, default=200000)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='lifeguard-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir, 'metrics.db')}"
+
+    from app import app, db
+    from metrics import Registry, _request
+
+    histogram = Registry().histogram('bench_seconds', 'benchmark', ('route',))
+
+    def observe():
+        for i in range(args.observations):
+            histogram.observe(i * 1e-6, '/api/bench')
+
+    threads = [threading.Thread(target=observe) for _ in range(args.threads)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    total = args.threads * args.observations
+    assert histogram.count('/api/bench') == total
+    print(f"observe: {total} from {args.threads} threads, {elapsed / total * 1e9:.0f} ns each")
+
+    with app.app_context():
+        db.create_all()
+        client = app.test_client()
+        client.get('/api/blood/shortages')
+
+        def timed():
+            start = time.perf_counter()
+            for _ in range(args.requests):
+                client.get('/api/blood/shortages')
+            return (time.perf_counter() - start) / args.requests
+
+        # Alternate instrumented and bare rounds (metrics hooks removed) and
+        # keep the best of each, so warm-up and noise don't skew the difference
+        registries = (app.before_request_funcs[None], app.after_request_funcs[None], app.teardown_request_funcs[None])
+        hooks = [[f for f in funcs if f.__module__ == 'metrics'] for funcs in registries]
+        instrumented, bare = [], []
+        for _ in range(args.rounds):
+            instrumented.append(timed())
+            for funcs, ours in zip(registries, hooks):
+                for f in ours:
+                    funcs.remove(f)
+            _request.active = False
+            bare.append(timed())
+            for funcs, ours in zip(registries, hooks):
+                funcs.extend(ours)
+        print(f"request: {min(instrumented) * 1e6:.0f} us instrumented vs {min(bare) * 1e6:.0f} us bare "
+              f"({(min(instrumented) - min(bare)) * 1e6:+.0f} us)")
+
+if __name__ == '__main__':
+    main()
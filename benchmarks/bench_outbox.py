@@ -0,0 +1,55 @@
+"""
+LifeGuard AI - Alert outbox benchmark
+Measures bulk enqueue throughput and worker drain rate on a file-backed SQLite DB.
+
+Usage: python -m benchmarks.bench_outbox [--alerts 10000] [--workers 8]
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--alerts', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='lifeguard-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir, 'outbox.db')}"
+
+    from app import app, db
+    from alert_outbox import AlertOutbox
+    from sms_service import SMSService
+    from benchmarks.fake_twilio import FakeTwilioClient
+    logging.getLogger('sms_service').setLevel(logging.CRITICAL)
+
+    client = FakeTwilioClient(latency=args.latency_ms / 1000.0)
+    sms = SMSService(client=client, backoff_seconds=0)
+    sms.rate_limit = 0
+    outbox = AlertOutbox(app, sms, batch_size=args.batch_size, workers=args.workers)
+
+    with app.app_context():
+        db.create_all()
+        alerts = [{'phone_number': f"98{i:08d}", 'message': 'Cyclone warning'} for i in range(args.alerts)]
+
+        start = time.perf_counter()
+        outbox.enqueue(alerts)
+        enqueue_secs = time.perf_counter() - start
+        print(f"enqueue: {args.alerts} alerts in {enqueue_secs:.3f}s ({args.alerts / enqueue_secs:,.0f}/s)")
+        print(f"queue depth: {outbox.stats()}")
+
+        start = time.perf_counter()
+        drained = outbox.drain()
+        drain_secs = time.perf_counter() - start
+        print(f"drain: {drained} alerts in {drain_secs:.3f}s ({drained * 60 / drain_secs:,.0f}/min)")
+        print(f"final: {outbox.stats()}")
+
+
+if __name__ == '__main__':
+    main()
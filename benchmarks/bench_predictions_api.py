@@ -0,0 +1,87 @@
+"""
+LifeGuard AI - /api/predictions memory and latency benchmark
+Loads N prediction rows, then measures time-to-first-byte, total time and
+peak RSS for the legacy all-rows list, a keyset page and the NDJSON stream.
+Each mode runs in its own subprocess so peak RSS is not shared.
+
+Usage: python -m benchmarks.bench_predictions_api [--rows 1000000]
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = ['legacy', 'page', 'ndjson']
+
+
+def load(rows):
+    from app import app, db
+    from models import Prediction
+    from benchmarks.datagen import make_predictions, insert_chunked
+    from geo import backfill_cells
+    with app.app_context():
+        db.create_all()
+        insert_chunked(Prediction, lambda n, s: [
+            dict(r, prediction_id=f"PRED-{s + i:09d}") for i, r in enumerate(make_predictions(n, seed=s))
+        ], rows)
+        backfill_cells()
+
+
+def run_mode(mode):
+    from flask import jsonify
+    from app import app
+    from models import Prediction
+
+    client = app.test_client()
+    start = time.perf_counter()
+    if mode == 'legacy':
+        with app.test_request_context():
+            predictions = Prediction.query.all()
+            body = jsonify([{
+                "id": p.prediction_id, "disaster_type": p.disaster_type, "severity": p.severity,
+                "lat": p.latitude, "lng": p.longitude
+            } for p in predictions]).get_data()
+        ttfb = time.perf_counter() - start
+        total_bytes = len(body)
+    else:
+        url = '/api/predictions?limit=1000' if mode == 'page' else '/api/predictions?format=ndjson'
+        response = client.get(url, buffered=False)
+        chunks = iter(response.response)
+        first = next(chunks)
+        ttfb = time.perf_counter() - start
+        total_bytes = len(first) + sum(len(c) for c in chunks)
+        response.close()
+    total = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{mode:>8}: ttfb {ttfb * 1000:9.1f} ms  total {total:7.2f} s  "
+          f"bytes {total_bytes:>12,}  peak RSS {peak_mb:8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--mode', choices=MODES)
+    parser.add_argument('--db')
+    args = parser.parse_args()
+
+    if args.mode:
+        os.environ['DATABASE_URL'] = f"sqlite:///{args.db}"
+        run_mode(args.mode)
+        return
+
+    path = os.path.join(tempfile.mkdtemp(prefix='lifeguard-bench-'), 'predictions.db')
+    os.environ['DATABASE_URL'] = f"sqlite:///{path}"
+    start = time.perf_counter()
+    load(args.rows)
+    print(f"loaded {args.rows:,} predictions in {time.perf_counter() - start:.1f}s")
+    for mode in MODES:
+        subprocess.run([sys.executable, '-m', 'benchmarks.bench_predictions_api', '--mode', mode, '--db', path],
+                       check=True, stderr=subprocess.DEVNULL)
+
+
+if __name__ == '__main__':
+    main()
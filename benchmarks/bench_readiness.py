@@ -0,0 +1,71 @@
+"""
+LifeGuard AI - Hospital readiness benchmark
+Compares the set-based readiness queries against the original per-object loop.
+
+Usage: python -m benchmarks.bench_readiness [--hospitals 50000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+
+def legacy_readiness(Hospital):
+    """The original implementation: hydrate every Hospital and loop in Python"""
+    results = []
+    for h in Hospital.query.all():
+        readiness = (h.available_beds / h.total_beds) * 0.7 + (h.available_icu / h.total_icu) * 0.3 if h.total_beds > 0 and h.total_icu > 0 else 0
+        results.append({
+            'name': h.name,
+            'region': h.region,
+            'available_beds': h.available_beds,
+            'available_icu': h.available_icu,
+            'readiness_score': round(readiness * 100, 1),
+            'status': 'Ready' if readiness > 0.6 else 'Busy' if readiness > 0.2 else 'Critical'
+        })
+    return results
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hospitals', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='lifeguard-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir, 'readiness.db')}"
+
+    from app import app, db
+    from models import Hospital
+    from service import get_hospital_readiness, get_region_readiness
+    from benchmarks.datagen import make_hospitals, insert_chunked
+
+    with app.app_context():
+        db.create_all()
+        insert_chunked(Hospital, lambda n, s: make_hospitals(n, seed=s), args.hospitals)
+
+        legacy, legacy_ms = timed(lambda: legacy_readiness(Hospital), args.repeat)
+        full, full_ms = timed(get_hospital_readiness, args.repeat)
+        assert legacy == full
+        _, page_ms = timed(lambda: get_hospital_readiness(limit=100, offset=1000), args.repeat)
+        _, topk_ms = timed(lambda: get_hospital_readiness(critical_first=True, limit=50), args.repeat)
+        _, rollup_ms = timed(get_region_readiness, args.repeat)
+
+    print(f"hospitals={args.hospitals}")
+    print(f"legacy per-object loop: {legacy_ms:9.1f} ms")
+    print(f"set-based full list:    {full_ms:9.1f} ms ({legacy_ms / full_ms:.1f}x)")
+    print(f"page of 100:            {page_ms:9.1f} ms")
+    print(f"top-50 critical:        {topk_ms:9.1f} ms")
+    print(f"region rollups:         {rollup_ms:9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
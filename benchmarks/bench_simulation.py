@@ -0,0 +1,81 @@
+"""
+LifeGuard AI - Shortfall simulation benchmark
+Seeds predictions and resources, then measures scenarios per second for
+a pure-Python loop over scenarios running the allocation policy, the
+vectorized policy in one process, and the process pool at increasing
+worker counts (including pool start-up on the first run).
+
+Usage: python -m benchmarks.bench_simulation [--predictions 2000] [--scenarios 20000] [--workers 1,2,4,8]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+
+def _python_scenario(rng, rows, stock, threshold):
+    # One scenario of the allocate_resources_batch() policy, for comparison
+    from service import CRITICAL_RESOURCES, RELIEF_RESOURCES
+    sampled = []
+    for confidence, severity, severity_confidence, need, onset, region in rows:
+        if rng.random() >= confidence or onset + rng.normal(0, 12.0) > 72:
+            continue
+        if rng.random() >= severity_confidence:
+            severity = min(5, max(1, severity + rng.choice((-1, 1))))
+        sampled.append((severity, need))
+    sampled.sort(key=lambda p: (-p[0], -p[1]))
+    left = dict(zip(CRITICAL_RESOURCES + RELIEF_RESOURCES, stock))
+    for severity, need in sampled:
+        for resource in CRITICAL_RESOURCES if severity >= threshold else RELIEF_RESOURCES:
+            left[resource] -= min(left[resource], need)
+    return left
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--predictions', type=int, default=2000)
+    parser.add_argument('--scenarios', type=int, default=20000)
+    parser.add_argument('--python-scenarios', type=int, default=50)
+    parser.add_argument('--workers', default='1,2,4,8')
+    parser.add_argument('--batch-size', type=int, help="Scenarios per task (default: from --memory-mb)")
+    parser.add_argument('--memory-mb', type=int, default=256, help="Per-worker memory budget")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='lifeguard-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir, 'simulation.db')}"
+
+    import numpy as np
+    from app import app, db
+    from benchmarks.datagen import seed_dataset
+    from simulation import ShortfallSimulator, load_inputs
+
+    with app.app_context():
+        db.create_all()
+        seed_dataset(predictions=args.predictions)
+        inputs, regions, stock = load_inputs()
+    print(f"{len(inputs)} active predictions in {len(regions)} regions, {os.cpu_count()} CPUs")
+
+    rng = np.random.default_rng(0)
+    rows = inputs.tolist()
+    start = time.perf_counter()
+    for _ in range(args.python_scenarios):
+        _python_scenario(rng, rows, stock.tolist(), app.config['CRITICAL_SEVERITY_THRESHOLD'])
+    rate = args.python_scenarios / (time.perf_counter() - start)
+    print(f"python loop: {rate:,.0f} scenarios/s")
+
+    baseline = None
+    for workers in [int(w) for w in args.workers.split(',')]:
+        simulator = ShortfallSimulator(workers, args.batch_size, args.memory_mb)
+        try:
+            first = simulator.run(inputs, regions, stock, args.scenarios, seed=1)['seconds']
+            elapsed = simulator.run(inputs, regions, stock, args.scenarios, seed=1)['seconds']
+        finally:
+            simulator.shutdown()
+        baseline = baseline or elapsed
+        print(f"{workers} worker{'s' if workers > 1 else ''}: {args.scenarios / elapsed:,.0f} scenarios/s "
+              f"(speedup {baseline / elapsed:.2f}x, first run with pool start {first:.2f}s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+LifeGuard AI - Bulk SMS dispatch benchmark
+Measures messages/sec of SMSService.send_bulk against a fake Twilio client.
+
+Usage: python -m benchmarks.bench_sms [--messages 2000] [--latency-ms 10]
+"""
+
+import argparse
+import logging
+import time
+from benchmarks.fake_twilio import FakeTwilioClient
+from sms_service import SMSService
+
+
+def run(messages, workers, latency, failure_rate):
+    client = FakeTwilioClient(latency=latency, failure_rate=failure_rate)
+    service = SMSService(client=client, backoff_seconds=0)
+    recipients = (f"98{i:08d}" for i in range(messages))
+
+    start = time.perf_counter()
+    sent = failed = 0
+    for result in service.send_bulk(recipients, "Benchmark alert", workers=workers, rate_limit=0):
+        if result['success']:
+            sent += 1
+        else:
+            failed += 1
+    elapsed = time.perf_counter() - start
+    return {
+        'workers': workers,
+        'messages': messages,
+        'sent': sent,
+        'failed': failed,
+        'api_calls': client.messages.calls,
+        'seconds': round(elapsed, 3),
+        'messages_per_sec': round(messages / elapsed, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--latency-ms', type=float, default=10.0)
+    parser.add_argument('--failure-rate', type=float, default=0.05)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 8, 64])
+    args = parser.parse_args()
+    logging.getLogger('sms_service').setLevel(logging.CRITICAL)
+
+    print(f"{'workers':>8} {'sent':>8} {'failed':>7} {'calls':>8} {'seconds':>9} {'msg/s':>10}")
+    for workers in args.workers:
+        r = run(args.messages, workers, args.latency_ms / 1000.0, args.failure_rate)
+        print(f"{r['workers']:>8} {r['sent']:>8} {r['failed']:>7} {r['api_calls']:>8} {r['seconds']:>9} {r['messages_per_sec']:>10}")
+
+
+if __name__ == '__main__':
+    main()
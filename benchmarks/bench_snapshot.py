@@ -0,0 +1,77 @@
+"""
+LifeGuard AI - Binary risk snapshot benchmark
+Compares a cold start that loads every prediction through the ORM with
+mapping the materialized snapshot, and times version checks and slicing.
+
+Usage: python -m benchmarks.bench_snapshot [--predictions 200000] [--hospitals 20000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--predictions', type=int, default=200000)
+    parser.add_argument('--hospitals', type=int, default=20000)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='lifeguard-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir, 'snapshot.db')}"
+    path = os.path.join(tmpdir, 'risk_snapshot.bin')
+
+    import numpy as np
+    from app import app, db
+    from models import Prediction, Hospital
+    from risk_snapshot import write_snapshot, read_version, SnapshotReader
+    from benchmarks.datagen import make_predictions, make_hospitals, insert_chunked
+
+    with app.app_context():
+        db.create_all()
+        def predictions(n, start):
+            rows = make_predictions(n, seed=start)
+            for i, row in enumerate(rows, start):
+                row['prediction_id'] = f"PRED-{i:08d}"
+            return rows
+
+        insert_chunked(Prediction, predictions, args.predictions)
+        insert_chunked(Hospital, lambda n, s: make_hospitals(n, seed=s), args.hospitals)
+
+        start = time.perf_counter()
+        version = write_snapshot(path)
+        print(f"materialized {version}: {os.path.getsize(path) / 1e6:.1f} MB in {time.perf_counter() - start:.2f}s")
+        start = time.perf_counter()
+        write_snapshot(path)
+        print(f"unchanged rebuild (file untouched): {time.perf_counter() - start:.2f}s")
+
+        db.session.expunge_all()
+        start = time.perf_counter()
+        orm = [p.to_dict() for p in Prediction.query.all()]
+        critical = sum(1 for p in orm if (p['severity'] or 0) >= 4)
+        print(f"ORM cold load: {len(orm)} predictions, {critical} critical in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    reader = SnapshotReader(path)
+    critical = int(np.count_nonzero(reader.predictions['severity'] >= 4))
+    print(f"mmap cold load: {len(reader.predictions)} predictions, {critical} critical "
+          f"in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        reader.is_stale()
+    print(f"staleness check (stat): {(time.perf_counter() - start):.3f}ms each")
+    start = time.perf_counter()
+    for _ in range(1000):
+        read_version(path)
+    print(f"version read (header): {(time.perf_counter() - start):.3f}ms each")
+
+    start = time.perf_counter()
+    page = reader.prediction_dicts(1000, 2000)
+    print(f"1000-row page as dicts: {(time.perf_counter() - start) * 1000:.1f}ms ({len(page)} rows)")
+    reader.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+LifeGuard AI - Cold start benchmark
+Imports the app in fresh interpreters (as a worker process or CLI command
+would) and reports import latency, peak RSS, and an `-X importtime`
+profile of the slowest modules the app pulls in. Also run by the
+benchmark suite as `startup`, so benchmarks.compare flags regressions.
+
+Usage: python -m benchmarks.bench_startup [--runs 10] [--top 15]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Imported only on first use; loading any of them at startup is a regression.
+# (requests is not listed: python-socketio's client imports it.)
+LAZY_MODULES = ('twilio', 'numpy', 'pandas', 'sklearn', 'joblib', 'sqlalchemy.dialects.postgresql')
+
+# ru_maxrss on Linux survives exec and so includes the parent's peak;
+# VmHWM covers only this process
+_PROBE = """
+import os, resource, sys, time
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+if os.path.exists('/proc/self/status'):
+    with open('/proc/self/status') as f:
+        rss = next(int(line.split()[1]) for line in f if line.startswith('VmHWM:')) / 1024
+else:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024)
+print(elapsed, rss)
+print(','.join(m for m in {lazy!r} if m in sys.modules))
+"""
+
+
+def import_profile(stderr):
+    """{module: cumulative microseconds} from `-X importtime` output, for modules app imports directly"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        # Two spaces of indent per level below the top-level import
+        if len(name) - len(name.lstrip()) == 3:
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def measure_startup(runs, database_url=None):
+    """Import latency and RSS over `runs` fresh interpreters, plus the last run's import profile"""
+    from benchmarks.timing import summarize
+
+    env = dict(os.environ, DATABASE_URL=database_url or os.environ.get('DATABASE_URL') or
+               f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='lifeguard-bench-'), 'startup.db')}")
+    probe = _PROBE.format(lazy=LAZY_MODULES)
+    latencies, rss = [], []
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, '-c', probe], cwd=ROOT, env=env, capture_output=True, text=True,
+                              check=True)
+        timing, loaded = proc.stdout.splitlines()[-2:]
+        seconds, megabytes = timing.split()
+        latencies.append(float(seconds))
+        rss.append(float(megabytes))
+
+    stats = summarize(latencies)
+    stats['rss_mb'] = round(sorted(rss)[len(rss) // 2], 1)
+    stats['eager_lazy_modules'] = [m for m in loaded.split(',') if m]
+    # Profiled separately: -X importtime itself slows every import
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', probe], cwd=ROOT, env=env,
+                          capture_output=True, text=True, check=True)
+    stats['profile'] = import_profile(proc.stderr)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--top', type=int, default=15, help="Slowest direct imports to list")
+    args = parser.parse_args()
+
+    stats = measure_startup(args.runs)
+    print(f"import app: p50 {stats['p50_ms']:.0f} ms, p95 {stats['p95_ms']:.0f} ms, "
+          f"peak RSS {stats['rss_mb']} MB over {args.runs} runs")
+    for module, micros in sorted(stats['profile'].items(), key=lambda m: -m[1])[:args.top]:
+        print(f"  {micros / 1000:8.1f} ms  {module}")
+    if stats['eager_lazy_modules']:
+        print(f"loaded eagerly (should be lazy): {', '.join(stats['eager_lazy_modules'])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+LifeGuard AI - Recipient targeting benchmark
+Compares chunked set-based claiming (one UPDATE ... RETURNING per chunk)
+against loading users into Python, checking the cap and updating row by row.
+
+Usage: python -m benchmarks.bench_targeting [--users 5000000] [--chunk-size 10000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=5000000)
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--region', default='Maharashtra')
+    parser.add_argument('--blood-type', default='O+')
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='lifeguard-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir, 'targeting.db')}"
+
+    from datetime import datetime
+    from app import app, db
+    from models import User
+    from config import get_config
+    from targeting import select_recipients
+    from benchmarks.datagen import make_users, insert_chunked
+
+    with app.app_context():
+        db.create_all()
+        start = time.perf_counter()
+        insert_chunked(User, lambda n, s: make_users(n, start=s), args.users)
+        print(f"loaded {args.users} users in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        claimed = sum(len(chunk) for chunk in select_recipients(
+            region=args.region, blood_types=[args.blood_type], chunk_size=args.chunk_size))
+        sql_s = time.perf_counter() - start
+        print(f"set-based: {claimed} recipients in {sql_s:.2f}s ({claimed / max(sql_s, 1e-9):.0f}/s)")
+
+        # Row-at-a-time baseline on a different blood type so the caps don't interact
+        cap = get_config().DONOR_WEEKLY_NOTIFICATION_CAP
+        start = time.perf_counter()
+        naive = 0
+        for user in User.query.filter_by(region=args.region, blood_type='A+').yield_per(args.chunk_size):
+            if (user.notification_count_this_week or 0) < cap:
+                user.notification_count_this_week = (user.notification_count_this_week or 0) + 1
+                user.last_notification = datetime.utcnow()
+                naive += 1
+        db.session.commit()
+        naive_s = time.perf_counter() - start
+        print(f"row-by-row: {naive} recipients in {naive_s:.2f}s ({naive / max(naive_s, 1e-9):.0f}/s)")
+
+        start = time.perf_counter()
+        again = sum(len(chunk) for chunk in select_recipients(
+            region=args.region, blood_types=[args.blood_type], cap=1, chunk_size=args.chunk_size))
+        print(f"capped re-run: {again} recipients in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
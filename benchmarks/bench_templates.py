@@ -0,0 +1,49 @@
+"""
+LifeGuard AI - SMS template rendering benchmark
+Compares per-recipient rendering (the previous send_disaster_alert path)
+with render_bulk, and prints the dispatch cost estimate.
+
+Usage: python -m benchmarks.bench_templates [--recipients 200000]
+"""
+
+import argparse
+import random
+import time
+from translations import SMS_TEMPLATES, get_sms_template, render_bulk, estimate_dispatch, _format_template
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--recipients', type=int, default=200000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    languages = list(SMS_TEMPLATES) + ['te', 'bn', 'mr', 'gu']  # unsupported ones fall back to English
+    recipients = [(f"9{i:09d}", rng.choice(languages)) for i in range(args.recipients)]
+
+    start = time.perf_counter()
+    for _, language in recipients:
+        _format_template('cyclone', language, {'region': 'Tamil Nadu', 'severity': 5})
+    uncached = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _, language in recipients:
+        get_sms_template('cyclone', language=language, region='Tamil Nadu', severity=5)
+    cached = time.perf_counter() - start
+
+    start = time.perf_counter()
+    variants = render_bulk('cyclone', recipients, region='Tamil Nadu', severity=5)
+    bulk = time.perf_counter() - start
+
+    print(f"recipients={args.recipients}")
+    print(f"per-recipient format:  {uncached * 1000:8.1f} ms")
+    print(f"per-recipient cached:  {cached * 1000:8.1f} ms")
+    print(f"render_bulk:           {bulk * 1000:8.1f} ms ({len(variants)} variants rendered)")
+    estimate = estimate_dispatch(variants)
+    print(f"messages={estimate['messages']} segments={estimate['segments']}")
+    for language, info in sorted(estimate['by_language'].items()):
+        print(f"  {language}: {info['encoding']}, {info['segments_per_message']} segment(s) x {info['recipients']}")
+
+
+if __name__ == '__main__':
+    main()
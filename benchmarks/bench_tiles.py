@@ -0,0 +1,69 @@
+"""
+LifeGuard AI - Map tile cluster benchmark
+Compares what the map downloads for one viewport: the clustered tiles
+covering it (cold and cached) versus every prediction from /api/dashboard.
+
+Usage: python -m benchmarks.bench_tiles [--predictions 50000] [--zoom 5]
+"""
+
+import argparse
+import json
+import math
+import os
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--predictions', type=int, default=50000)
+    parser.add_argument('--zoom', type=int, default=5)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='lifeguard-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir, 'tiles.db')}"
+
+    from app import app, db
+    from models import Prediction
+    from geo import cell_for
+    from tiles import _tile_position
+    from benchmarks.datagen import make_predictions, insert_chunked
+
+    def predictions(n, start):
+        rows = make_predictions(n, seed=start)
+        for i, row in enumerate(rows, start):
+            row['prediction_id'] = f"PRED-{i:08d}"
+            # Core inserts skip the geo.py mapper hooks
+            row['geo_cell'] = int(cell_for(row['latitude'], row['longitude']))
+        return rows
+
+    with app.app_context():
+        db.create_all()
+        insert_chunked(Prediction, predictions, args.predictions)
+        client = app.test_client()
+
+        # Tiles covering India (6-36N, 68-98E) at the requested zoom
+        x0, y0 = (int(math.floor(v)) for v in _tile_position(36.0, 68.0, args.zoom))
+        x1, y1 = (int(math.floor(v)) for v in _tile_position(6.0, 98.0, args.zoom))
+        tiles = [(args.zoom, x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+        for label in ('cold', 'cached'):
+            start = time.perf_counter()
+            size = markers = 0
+            for z, x, y in tiles:
+                response = client.get(f'/api/tiles/{z}/{x}/{y}')
+                size += len(response.data)
+                markers += len(json.loads(response.data))
+            elapsed = time.perf_counter() - start
+            print(f"tiles {label}: {len(tiles)} tiles, {markers} markers, {size / 1e3:.0f} KB "
+                  f"in {elapsed * 1000:.0f} ms")
+
+        start = time.perf_counter()
+        response = client.get('/api/dashboard')
+        elapsed = time.perf_counter() - start
+        count = len(json.loads(response.data).get('predictions', []))
+        print(f"dashboard: {count} markers, {len(response.data) / 1e3:.0f} KB in {elapsed * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
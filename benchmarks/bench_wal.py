@@ -0,0 +1,113 @@
+"""
+LifeGuard AI - Reader throughput during write bursts
+Dashboard-style readers run continuously while a writer commits bursts of
+allocation-style transactions (deployment inserts plus stock updates).
+Compares SQLite's default rollback journal with the WAL pragmas from config.
+
+Usage: python -m benchmarks.bench_wal [--readers 8] [--duration 10] [--predictions 20000]
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+
+def run(url, pragmas, args):
+    from sqlalchemy import create_engine, insert, select, update
+    from sqlalchemy.exc import OperationalError
+    from models import db, Prediction, Deployment, Resource
+    from database import configure_sqlite
+    from benchmarks.datagen import make_predictions, make_resources, make_deployments
+    from benchmarks.timing import summarize
+
+    engine = create_engine(url, pool_size=args.readers + 2)
+    configure_sqlite(engine, pragmas)
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Resource.__table__), make_resources())
+        conn.execute(insert(Prediction.__table__), make_predictions(args.predictions))
+
+    stop = threading.Event()
+    read_latencies = [[] for _ in range(args.readers)]
+    errors = {'read': 0, 'write': 0}
+    writes = []
+
+    def reader(n):
+        # The dashboard's small queries: latest predictions, stock, recent deployments
+        queries = [
+            select(Prediction.__table__).order_by(Prediction.timestamp.desc()).limit(100),
+            select(Resource.__table__),
+            select(Deployment.__table__).order_by(Deployment.id.desc()).limit(10)
+        ]
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    for query in queries:
+                        conn.execute(query).all()
+                read_latencies[n].append(time.perf_counter() - start)
+            except OperationalError:
+                errors['read'] += 1
+
+    def writer():
+        batch = 0
+        while not stop.is_set():
+            # Burst: back-to-back transactions, then a pause
+            burst_end = time.perf_counter() + args.burst_seconds
+            while time.perf_counter() < burst_end and not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    with engine.begin() as conn:
+                        conn.execute(insert(Deployment.__table__),
+                                     make_deployments(args.rows_per_write, start=batch * args.rows_per_write))
+                        conn.execute(update(Resource.__table__).where(Resource.resource_type == 'ambulances')
+                                     .values(available_quantity=Resource.available_quantity - 1))
+                    writes.append(time.perf_counter() - start)
+                except OperationalError:
+                    errors['write'] += 1
+                batch += 1
+            stop.wait(args.pause_seconds)
+
+    threads = [threading.Thread(target=reader, args=(n,)) for n in range(args.readers)]
+    threads.append(threading.Thread(target=writer))
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(args.duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    engine.dispose()
+    reads = summarize([latency for per_reader in read_latencies for latency in per_reader], elapsed)
+    return reads, summarize(writes, elapsed), errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--predictions', type=int, default=20000)
+    parser.add_argument('--rows-per-write', type=int, default=50)
+    parser.add_argument('--burst-seconds', type=float, default=1.0)
+    parser.add_argument('--pause-seconds', type=float, default=0.5)
+    args = parser.parse_args()
+
+    from config import Config
+    tmpdir = tempfile.mkdtemp(prefix='lifeguard-bench-')
+    modes = {
+        'rollback journal': {'busy_timeout': Config.SQLITE_PRAGMAS['busy_timeout']},
+        'WAL + pragmas': Config.SQLITE_PRAGMAS
+    }
+    for name, pragmas in modes.items():
+        url = f"sqlite:///{os.path.join(tmpdir, name.split()[0].lower() + '.db')}"
+        reads, writes, errors = run(url, pragmas, args)
+        print(f"{name:<17} reads {reads['ops_per_sec']:>8.0f}/s (p50 {reads['p50_ms']} ms, p99 {reads['p99_ms']} ms) | "
+              f"writes {writes['ops_per_sec']:>6.0f}/s (p99 {writes['p99_ms']} ms) | "
+              f"locked errors: {errors['read']} read, {errors['write']} write")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+LifeGuard AI - Weather fetcher benchmark
+Fetches conditions for the national inference grid from a local stub API
+with simulated latency: one point at a time without pooling or caching
+(the old per-location path), then the pooled concurrent fetcher cold,
+warm (TTL cache) and after expiry (ETag revalidation).
+
+Usage: python -m benchmarks.bench_weather [--resolution 0.25] [--latency 0.02] [--workers 16]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--resolution', type=float, default=0.25)
+    parser.add_argument('--latency', type=float, default=0.02, help="Simulated API latency in seconds")
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--cell-degrees', type=float, default=0.5, help="Weather cache cell size")
+    parser.add_argument('--sequential', type=int, default=100, help="Points fetched one at a time")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='lifeguard-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir, 'weather.db')}"
+
+    import requests
+    from benchmarks.fake_weather import FakeWeatherServer
+    from inference import national_grid
+    from weather import WeatherFetcher
+
+    lat, lng = national_grid(args.resolution)
+    print(f"{len(lat)} grid points at {args.resolution} deg, {args.latency * 1000:.0f} ms simulated latency")
+
+    with FakeWeatherServer(latency=args.latency) as server:
+        start = time.perf_counter()
+        for i in range(args.sequential):
+            # New connection per call, as requests.get() does
+            requests.get(f"{server.url}/weather", params={'lat': lat[i], 'lon': lng[i], 'appid': 'test-key'},
+                         timeout=10).json()
+        elapsed = time.perf_counter() - start
+        rate = args.sequential / elapsed
+        print(f"sequential: {rate:,.0f} points/s (grid would take {len(lat) / rate:.0f}s)")
+
+        fetcher = WeatherFetcher(server.url, 'test-key', workers=args.workers, cell_degrees=args.cell_degrees)
+        for label in ('cold', 'warm'):
+            before = server.requests
+            start = time.perf_counter()
+            fetcher.fetch_grid(lat, lng)
+            elapsed = time.perf_counter() - start
+            print(f"pooled {label}: {len(lat) / elapsed:,.0f} points/s, {server.requests - before} requests "
+                  f"in {elapsed:.2f}s")
+
+        fetcher.expire()
+        before, not_modified = server.requests, server.not_modified
+        start = time.perf_counter()
+        fetcher.fetch_grid(lat, lng)
+        elapsed = time.perf_counter() - start
+        print(f"pooled revalidate: {len(lat) / elapsed:,.0f} points/s, {server.requests - before} requests "
+              f"({server.not_modified - not_modified} not modified) in {elapsed:.2f}s")
+
+        stats = fetcher.stats()
+        print(f"overall: hit rate {stats['hit_rate']:.0%}, {stats['requests_per_point']:.3f} requests/point, "
+              f"{stats['errors']} errors")
+
+
+if __name__ == '__main__':
+    main()
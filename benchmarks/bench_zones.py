@@ -0,0 +1,65 @@
+"""
+LifeGuard AI - Risk zone builder benchmark
+Times a full zone build, a no-op rebuild and an incremental rebuild after
+touching one prediction, and compares what the map has to draw: merged
+zone polygons per level of detail versus one circle per prediction.
+
+Usage: python -m benchmarks.bench_zones [--predictions 20000]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--predictions', type=int, default=20000)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='lifeguard-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir, 'zones.db')}"
+
+    from app import app, db
+    from models import Prediction
+    from zones import rebuild_risk_zones, zone_polygons, LOD_TOLERANCES_KM
+    from benchmarks.datagen import make_predictions, insert_chunked
+
+    def predictions(n, start):
+        rows = make_predictions(n, seed=start)
+        for i, row in enumerate(rows, start):
+            row['prediction_id'] = f"PRED-{i:08d}"
+            # Mostly small, local predictions so several clusters form per region
+            row['radius_km'] = 5 + (i % 4) * 5
+        return rows
+
+    with app.app_context():
+        db.create_all()
+        insert_chunked(Prediction, predictions, args.predictions)
+
+        start = time.perf_counter()
+        counts = rebuild_risk_zones()
+        print(f"full build: {counts} in {time.perf_counter() - start:.2f}s")
+        start = time.perf_counter()
+        counts = rebuild_risk_zones()
+        print(f"no-op rebuild: {counts} in {time.perf_counter() - start:.2f}s")
+
+        Prediction.query.filter_by(prediction_id='PRED-00000000').one().severity = 5
+        db.session.commit()
+        start = time.perf_counter()
+        counts = rebuild_risk_zones()
+        print(f"one prediction changed: {counts} in {time.perf_counter() - start:.2f}s")
+
+        circles = json.dumps([{'lat': 0.0, 'lng': 0.0, 'radius': 0, 'severity': 0}] * args.predictions)
+        print(f"map before: {args.predictions} circles, ~{len(circles) / 1e3:.0f} KB")
+        for lod in LOD_TOLERANCES_KM:
+            zones = zone_polygons(lod)
+            vertices = sum(len(z['polygon']) for z in zones)
+            print(f"map LOD {lod}: {len(zones)} polygons, {vertices} vertices, "
+                  f"{len(json.dumps(zones)) / 1e3:.0f} KB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+LifeGuard AI - Compare two benchmark suite results
+Prints the change in p50/p95 latency, throughput and memory per benchmark and
+exits non-zero when any benchmark regressed by more than the threshold.
+
+Usage: python -m benchmarks.compare baseline.json candidate.json [--threshold 10]
+"""
+
+import argparse
+import json
+import sys
+
+# metric -> True when higher is better
+METRICS = {'p50_ms': False, 'p95_ms': False, 'ops_per_sec': True, 'rss_mb': False}
+
+
+def compare(baseline, candidate, threshold):
+    """Yield (benchmark, metric, old, new, percent_change, regressed)"""
+    for name, new_stats in candidate['benchmarks'].items():
+        old_stats = baseline['benchmarks'].get(name)
+        if old_stats is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = old_stats.get(metric), new_stats.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            worse = -change if higher_is_better else change
+            yield name, metric, old, new, change, worse > threshold
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=10.0, help="Regression tolerance in percent")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    if baseline.get('scale') != candidate.get('scale'):
+        print(f"warning: comparing scale {baseline.get('scale')} with {candidate.get('scale')}", file=sys.stderr)
+
+    print(f"{baseline.get('commit')} -> {candidate.get('commit')}")
+    regressions = 0
+    for name, metric, old, new, change, regressed in compare(baseline, candidate, args.threshold):
+        regressions += regressed
+        flag = '  REGRESSION' if regressed else ''
+        print(f"{name:<24} {metric:<12} {old:>12.3f} -> {new:>12.3f} ({change:+6.1f}%){flag}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+LifeGuard AI - Synthetic data generators for benchmarks
+Rows are plain dicts ready for bulk INSERT via db.session.execute(insert(Model), rows).
+"""
+
+import random
+from datetime import datetime, timedelta
+from reference_data import INDIA_REGIONS, DISASTER_TYPES, SEED_RESOURCES
+
+
+def _near(rng, region, spread=3.0):
+    lat, lng = INDIA_REGIONS[region]['lat'], INDIA_REGIONS[region]['lng']
+    return lat + rng.uniform(-spread, spread), lng + rng.uniform(-spread, spread)
+
+
+def make_predictions(n, seed=1):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    regions = list(INDIA_REGIONS)
+    rows = []
+    for i in range(n):
+        region = regions[i % len(regions)]
+        lat, lng = _near(rng, region)
+        rows.append({
+            'prediction_id': f"PRED-{i:08d}",
+            'region': region,
+            'timestamp': now - timedelta(minutes=rng.randint(0, 10000)),
+            'disaster_type': rng.choice(list(DISASTER_TYPES)),
+            'confidence': rng.uniform(0.6, 0.99),
+            'latitude': lat,
+            'longitude': lng,
+            'radius_km': rng.choice([25, 50, 100]),
+            'predicted_onset': now + timedelta(hours=rng.randint(-48, 72)),
+            'severity': rng.randint(1, 5),
+            'affected_population': rng.randint(1000, 5000000),
+            'model_version': 'bench'
+        })
+    return rows
+
+
+def make_hospitals(n, seed=2):
+    rng = random.Random(seed)
+    regions = list(INDIA_REGIONS)
+    rows = []
+    for i in range(n):
+        region = regions[i % len(regions)]
+        lat, lng = _near(rng, region)
+        total_beds = rng.randint(20, 2500)
+        total_icu = rng.randint(2, 250)
+        rows.append({
+            'name': f"Hospital {i}",
+            'region': region,
+            'latitude': lat,
+            'longitude': lng,
+            'total_beds': total_beds,
+            'available_beds': rng.randint(0, total_beds),
+            'total_icu': total_icu,
+            'available_icu': rng.randint(0, total_icu),
+            'ventilators_available': rng.randint(0, 50)
+        })
+    return rows
+
+
+def make_resources():
+    return [dict(r) for r in SEED_RESOURCES]
+
+
+BLOOD_TYPES = ["A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-"]
+LANGUAGES = ["en", "hi", "ta", "te", "bn", "mr", "gu"]
+
+
+def make_users(n, seed=3, start=0):
+    rng = random.Random(seed + start)
+    regions = list(INDIA_REGIONS)
+    rows = []
+    for i in range(start, start + n):
+        region = regions[i % len(regions)]
+        lat, lng = _near(rng, region)
+        rows.append({
+            'user_id': f"USER-{i:09d}",
+            'role': 'donor',
+            'phone_number': f"9{i:09d}",
+            'language_preference': rng.choice(LANGUAGES),
+            'region': region,
+            'blood_type': rng.choice(BLOOD_TYPES),
+            'notification_count_this_week': 0,
+            'latitude': lat,
+            'longitude': lng
+        })
+    return rows
+
+
+DEPLOYMENT_STATUSES = ["dispatched", "in_transit", "arrived", "deployed"]
+PRIORITIES = ["critical", "high", "medium"]
+RESOURCE_TYPES = ["ambulances", "medical_teams", "oxygen_cylinders", "relief_kits"]
+
+
+def make_deployments(n, seed=4, start=0):
+    rng = random.Random(seed + start)
+    now = datetime.utcnow()
+    regions = list(INDIA_REGIONS)
+    return [{
+        'deployment_id': f"DEP-{i:09d}",
+        'resource_type': rng.choice(RESOURCE_TYPES),
+        'quantity': rng.randint(1, 200),
+        'target_region': regions[i % len(regions)],
+        'status': rng.choice(DEPLOYMENT_STATUSES),
+        'eta_hours': rng.randint(1, 48),
+        'priority': rng.choice(PRIORITIES),
+        'timestamp': now - timedelta(minutes=rng.randint(0, 10000))
+    } for i in range(start, start + n)]
+
+
+# Row counts per named dataset size
+SCALES = {
+    'small': {'users': 10000, 'hospitals': 500, 'predictions': 2000, 'deployments': 1000},
+    'medium': {'users': 200000, 'hospitals': 5000, 'predictions': 20000, 'deployments': 20000},
+    'large': {'users': 2000000, 'hospitals': 30000, 'predictions': 200000, 'deployments': 200000}
+}
+
+
+def seed_dataset(users=0, hospitals=0, predictions=0, deployments=0):
+    """
+    Bulk insert a full synthetic dataset into the current app's database,
+    including resources and the geo cell index. Returns the prediction ids.
+    """
+    from sqlalchemy import insert
+    from models import db, User, Hospital, Prediction, Deployment, Resource
+    from geo import backfill_cells
+
+    db.session.execute(insert(Resource), make_resources())
+    db.session.commit()
+    insert_chunked(User, lambda n, start: make_users(n, start=start), users)
+    insert_chunked(Hospital, lambda n, start: make_hospitals(n, seed=2 + start), hospitals)
+    insert_chunked(Prediction, _numbered_predictions, predictions)
+    insert_chunked(Deployment, lambda n, start: make_deployments(n, start=start), deployments)
+    backfill_cells()
+    return [f"PRED-{i:08d}" for i in range(predictions)]
+
+
+def _numbered_predictions(n, start):
+    # make_predictions numbers from 0; keep ids unique across chunks
+    rows = make_predictions(n, seed=1 + start)
+    for i, row in enumerate(rows, start):
+        row['prediction_id'] = f"PRED-{i:08d}"
+    return rows
+
+
+def insert_chunked(model, make_rows, total, chunk_size=50000):
+    """Bulk insert `total` generated rows in chunks; make_rows(n, start) returns dicts"""
+    from sqlalchemy import insert
+    from models import db
+    for start in range(0, total, chunk_size):
+        db.session.execute(insert(model), make_rows(min(chunk_size, total - start), start))
+        db.session.commit()
@@ -0,0 +1,48 @@
+"""
+LifeGuard AI - Local fake Twilio client
+Simulates network latency and transient API failures without touching Twilio
+"""
+
+import itertools
+import random
+import threading
+import time
+from twilio.base.exceptions import TwilioRestException
+
+
+class FakeMessage:
+    def __init__(self, sid, to, body):
+        self.sid = sid
+        self.to = to
+        self.body = body
+
+
+class FakeMessages:
+    def __init__(self, latency, failure_rate, seed):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.sent = []
+
+    def create(self, body, from_, to):
+        with self._lock:
+            self.calls += 1
+            fail = self._random.random() < self.failure_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            raise TwilioRestException(503, '/Messages.json', msg='Service unavailable (simulated)', method='POST')
+        message = FakeMessage(f"SMFAKE{next(self._ids):010d}", to, body)
+        with self._lock:
+            self.sent.append(message)
+        return message
+
+
+class FakeTwilioClient:
+    """Drop-in replacement for twilio.rest.Client exposing messages.create"""
+
+    def __init__(self, latency=0.0, failure_rate=0.0, seed=42):
+        self.messages = FakeMessages(latency, failure_rate, seed)
@@ -0,0 +1,86 @@
+"""
+LifeGuard AI - Local stub weather API
+Serves OpenWeatherMap-style /weather responses derived from the requested
+coordinates, with ETags and 304 revalidation, over HTTP/1.1 keep-alive.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path != '/weather' or 'lat' not in query or 'lon' not in query:
+            return self._send(404, b'{}')
+        if query.get('appid') != [server.api_key]:
+            return self._send(401, b'{"message": "Invalid API key"}')
+        if server.latency:
+            time.sleep(server.latency)
+
+        lat, lon = float(query['lat'][0]), float(query['lon'][0])
+        body = json.dumps({
+            'coord': {'lat': lat, 'lon': lon},
+            'main': {'temp': round(25 + (lat % 10), 1), 'pressure': 1000 + int(lon) % 20},
+            'wind': {'speed': round((lat + lon) % 15, 1)},
+            'rain': {'1h': round(lon % 50, 1)}
+        }).encode()
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            with server.lock:
+                server.not_modified += 1
+            return self._send(304, b'', etag)
+        self._send(200, body, etag)
+
+    def _send(self, status, body, etag=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeWeatherServer(ThreadingHTTPServer):
+    """Stub weather API on a free localhost port; use as a context manager"""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, api_key='test-key', latency=0.0):
+        super().__init__(('127.0.0.1', 0), _Handler)
+        self.api_key = api_key
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.not_modified = 0
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, name='fake-weather', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
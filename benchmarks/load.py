@@ -0,0 +1,95 @@
+"""
+LifeGuard AI - Concurrent HTTP load driver
+Runs client threads issuing GET requests against a running server for a
+fixed duration and reports throughput and latency percentiles per path.
+
+Usage: python -m benchmarks.load http://localhost:5000 [--paths /api/dashboard ...]
+                                 [--clients 16] [--duration 10]
+"""
+
+import argparse
+import contextlib
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from benchmarks.timing import summarize
+
+DEFAULT_PATHS = ['/api/dashboard', '/api/hospitals/readiness?limit=100&critical_first=true', '/api/predictions?limit=100']
+
+
+def run_load(base_url, paths=DEFAULT_PATHS, clients=8, duration=10.0, timeout=30):
+    """
+    Hammer `paths` (round-robin, each client starting at a different one)
+    from `clients` threads for `duration` seconds
+    """
+    base_url = base_url.rstrip('/')
+    results = [[] for _ in range(clients)]
+    deadline = time.perf_counter() + duration
+
+    def client(n):
+        samples = results[n]
+        i = n
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(base_url + path, timeout=timeout) as response:
+                    response.read()
+                ok = True
+            except (urllib.error.URLError, OSError):
+                ok = False
+            samples.append((path, time.perf_counter() - start, ok))
+
+    threads = [threading.Thread(target=client, args=(n,), name=f"load-{n}") for n in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    samples = [s for per_client in results for s in per_client]
+    ok = [latency for _, latency, success in samples if success]
+    report = {
+        'clients': clients,
+        'duration_s': round(elapsed, 2),
+        'requests': len(samples),
+        'errors': len(samples) - len(ok),
+        **summarize(ok, elapsed),
+        'paths': {}
+    }
+    for path in paths:
+        report['paths'][path] = summarize([latency for p, latency, success in samples if p == path and success],
+                                          elapsed)
+    return report
+
+
+@contextlib.contextmanager
+def serve(app):
+    """Serve a WSGI app on a free localhost port in a background thread; yields the base URL"""
+    from werkzeug.serving import make_server
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, name='load-server', daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('url')
+    parser.add_argument('--paths', nargs='+', default=DEFAULT_PATHS)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0)
+    args = parser.parse_args()
+    print(json.dumps(run_load(args.url, args.paths, args.clients, args.duration), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""
+LifeGuard AI - Benchmark suite
+Seeds a synthetic dataset at the chosen scale, runs the microbenchmarks
+and a concurrent HTTP load test, and writes the results as JSON tagged
+with the current commit. Compare two runs with benchmarks.compare.
+
+Usage: python -m benchmarks.suite [--scale small|medium|large] [--only dashboard_cached ...]
+                                  [--output benchmarks/results/<commit>-<scale>.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                               check=True, cwd=os.path.dirname(RESULTS_DIR)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_dashboard_uncached(ctx):
+    """/api/dashboard with the snapshot cache invalidated before every request"""
+    def call():
+        ctx['dashboard_cache'].invalidate()
+        assert ctx['client'].get('/api/dashboard').status_code == 200
+    return ctx['time_calls'](call, ctx['calls'] // 10 or 1, warmup=1)
+
+
+def bench_dashboard_cached(ctx):
+    """/api/dashboard served from the snapshot cache"""
+    return ctx['time_calls'](lambda: ctx['client'].get('/api/dashboard'), ctx['calls'])
+
+
+def bench_hospital_readiness(ctx):
+    """get_hospital_readiness() over every hospital"""
+    from service import get_hospital_readiness
+    return ctx['time_calls'](get_hospital_readiness, ctx['calls'] // 10 or 1, warmup=1)
+
+
+def bench_hospital_readiness_page(ctx):
+    """The 100 most critical hospitals"""
+    from service import get_hospital_readiness
+    return ctx['time_calls'](lambda: get_hospital_readiness(limit=100, critical_first=True), ctx['calls'])
+
+
+def bench_allocation(ctx):
+    """allocate_resources_for_prediction for random predictions"""
+    from sqlalchemy import update
+    from models import db, Resource
+    from service import allocate_resources_for_prediction
+    # Enough stock that no allocation comes back short
+    db.session.execute(update(Resource).values(available_quantity=Resource.total_quantity * 1000))
+    db.session.commit()
+    rng = random.Random(7)
+    ids = ctx['prediction_ids']
+    return ctx['time_calls'](lambda: allocate_resources_for_prediction(rng.choice(ids)), ctx['calls'])
+
+
+def bench_sms_send(ctx):
+    """SMSService.send_sms against a zero-latency fake Twilio client"""
+    from sms_service import SMSService
+    from benchmarks.fake_twilio import FakeTwilioClient
+    service = SMSService(client=FakeTwilioClient(), backoff_seconds=0)
+    return ctx['time_calls'](lambda: service.send_sms('9800000001', 'Cyclone alert for Kerala'), ctx['calls'] * 10)
+
+
+def bench_sms_fanout(ctx):
+    """send_bulk to 2000 recipients with 5 ms simulated Twilio latency"""
+    from sms_service import SMSService
+    from benchmarks.fake_twilio import FakeTwilioClient
+    service = SMSService(client=FakeTwilioClient(latency=0.005), backoff_seconds=0)
+    recipients = [f"98{i:08d}" for i in range(2000)]
+    start = time.perf_counter()
+    results = list(service.send_bulk(recipients, 'Cyclone alert', rate_limit=0))
+    elapsed = time.perf_counter() - start
+    return {'count': len(results), 'seconds': round(elapsed, 3), 'ops_per_sec': round(len(results) / elapsed, 1)}
+
+
+def bench_http_load(ctx):
+    """Concurrent clients against a real threaded HTTP server"""
+    from benchmarks.load import run_load, serve
+    with serve(ctx['app']) as url:
+        return run_load(url, clients=ctx['clients'], duration=ctx['duration'])
+
+
+def bench_startup(ctx):
+    """Importing the app in a fresh interpreter: latency and peak RSS"""
+    from benchmarks.bench_startup import measure_startup
+    stats = measure_startup(10)
+    stats.pop('profile')
+    return stats
+
+
+BENCHMARKS = {
+    'dashboard_uncached': bench_dashboard_uncached,
+    'dashboard_cached': bench_dashboard_cached,
+    'hospital_readiness': bench_hospital_readiness,
+    'hospital_readiness_page': bench_hospital_readiness_page,
+    'allocation': bench_allocation,
+    'sms_send': bench_sms_send,
+    'sms_fanout': bench_sms_fanout,
+    'http_load': bench_http_load,
+    'startup': bench_startup
+}
+
+
+def main():
+    from benchmarks.datagen import SCALES
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS, help="Run a subset")
+    parser.add_argument('--calls', type=int, default=200, help="Iterations per microbenchmark")
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0, help="HTTP load seconds")
+    parser.add_argument('--output')
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='lifeguard-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir, 'suite.db')}"
+    # Keep per-message and per-request log lines out of the timings
+    import logging
+    logging.disable(logging.INFO)
+    from app import app, db, dashboard_cache
+    from benchmarks.datagen import seed_dataset
+    from benchmarks.timing import time_calls
+
+    commit = git_commit()
+    results = {
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scale': args.scale,
+        'dataset': SCALES[args.scale],
+        'benchmarks': {}
+    }
+
+    with app.app_context():
+        db.create_all()
+        start = time.perf_counter()
+        prediction_ids = seed_dataset(**SCALES[args.scale])
+        results['seed_seconds'] = round(time.perf_counter() - start, 2)
+        print(f"seeded {args.scale} dataset in {results['seed_seconds']}s", file=sys.stderr)
+
+        ctx = {
+            'app': app, 'client': app.test_client(), 'dashboard_cache': dashboard_cache,
+            'prediction_ids': prediction_ids, 'time_calls': time_calls,
+            'calls': args.calls, 'clients': args.clients, 'duration': args.duration
+        }
+        for name, bench in BENCHMARKS.items():
+            if args.only and name not in args.only:
+                continue
+            stats = bench(ctx)
+            results['benchmarks'][name] = stats
+            summary = f"p50 {stats['p50_ms']} ms, " if 'p50_ms' in stats else ''
+            print(f"{name:<24} {summary}{stats.get('ops_per_sec', 0)} ops/s", file=sys.stderr)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit or 'unknown'}-{args.scale}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
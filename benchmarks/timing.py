@@ -0,0 +1,41 @@
+"""
+LifeGuard AI - Timing helpers shared by the benchmark suite and load driver
+"""
+
+import time
+
+
+def percentile(ordered, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(q / 100.0 * (len(ordered) - 1))))]
+
+
+def summarize(latencies, elapsed=None):
+    """Latency statistics in milliseconds; throughput when `elapsed` is given"""
+    ordered = sorted(latencies)
+    stats = {
+        'count': len(ordered),
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+        'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3) if ordered else 0.0
+    }
+    if elapsed:
+        stats['ops_per_sec'] = round(len(ordered) / elapsed, 1)
+    return stats
+
+
+def time_calls(fn, calls, warmup=3):
+    """Call fn() `calls` times after a warm-up and summarize the latencies"""
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(calls):
+        t = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t)
+    return summarize(latencies, time.perf_counter() - start)
@@ -0,0 +1,171 @@
+"""
+LifeGuard AI - Compact Dashboard Wire Format
+Columnar, quantized dashboard payloads for low-bandwidth clients, with
+gzip/brotli negotiation and deltas against a client-supplied version.
+
+The version of a full payload is its ETag; deltas carry it explicitly.
+
+Payload keys:
+    v   new version (deltas only)      b   base version (deltas only)
+    dt  disaster type dictionary       q   coordinate scale (lat/lng * q)
+    p   predictions: id, t (dt index), s severity, c confidence %,
+        la/ln quantized lat/lng, ap affected population, pt onset epoch-minute
+    pr  removed prediction ids (deltas only)
+    r   resources: k type, t total, a available
+    d   deployments: id, k resource, q quantity, st status
+    h   hospitals: n name, a free beds, i free ICU, rs readiness x10
+    s   [total predictions, critical predictions]
+"""
+
+import calendar
+import gzip
+import json
+import threading
+from collections import OrderedDict
+from sqlalchemy import select
+from models import db, Prediction, Resource, Deployment
+from service import get_hospital_readiness
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COORD_SCALE = 1000  # ~110 m resolution
+HISTORY_SIZE = 32
+PREDICTION_COLUMNS = ['id', 't', 's', 'c', 'la', 'ln', 'ap', 'pt']
+CRITICAL_SEVERITY = 4
+
+
+def _epoch_minute(value):
+    return calendar.timegm(value.utctimetuple()) // 60 if value else None
+
+
+def _quantize(value):
+    return int(round(value * COORD_SCALE)) if value is not None else None
+
+
+def build_compact_dashboard():
+    """
+    Build the compact dashboard payload straight from column queries
+    """
+    rows = db.session.execute(
+        select(Prediction.prediction_id, Prediction.disaster_type, Prediction.severity, Prediction.confidence,
+               Prediction.latitude, Prediction.longitude, Prediction.affected_population, Prediction.predicted_onset)
+        .order_by(Prediction.predicted_onset)
+    ).all()
+
+    types = {}
+    p = {k: [] for k in PREDICTION_COLUMNS}
+    critical = 0
+    for pid, dtype, severity, confidence, lat, lng, population, onset in rows:
+        p['id'].append(pid)
+        p['t'].append(types.setdefault(dtype, len(types)))
+        p['s'].append(severity)
+        p['c'].append(int(round(confidence * 100)) if confidence is not None else None)
+        p['la'].append(_quantize(lat))
+        p['ln'].append(_quantize(lng))
+        p['ap'].append(population)
+        p['pt'].append(_epoch_minute(onset))
+        if severity is not None and severity >= CRITICAL_SEVERITY:
+            critical += 1
+
+    resources = db.session.execute(
+        select(Resource.resource_type, Resource.total_quantity, Resource.available_quantity)
+    ).all()
+    deployments = db.session.execute(
+        select(Deployment.deployment_id, Deployment.resource_type, Deployment.quantity, Deployment.status)
+        .order_by(Deployment.timestamp.desc()).limit(10)
+    ).all()
+    hospitals = get_hospital_readiness()
+
+    payload = {
+        'dt': list(types),
+        'q': COORD_SCALE,
+        'p': p,
+        'r': {'k': [r[0] for r in resources], 't': [r[1] for r in resources], 'a': [r[2] for r in resources]},
+        'd': {'id': [d[0] for d in deployments], 'k': [d[1] for d in deployments],
+              'q': [d[2] for d in deployments], 'st': [d[3] for d in deployments]},
+        'h': {'n': [h['name'] for h in hospitals], 'a': [h['available_beds'] for h in hospitals],
+              'i': [h['available_icu'] for h in hospitals],
+              'rs': [int(round(h['readiness_score'] * 10)) for h in hospitals]},
+        's': [len(rows), critical]
+    }
+    return payload
+
+
+def encode(payload):
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def diff_compact(old, new, old_version, new_version):
+    """
+    Delta that turns payload `old` into `new`: changed/added predictions,
+    removed prediction ids, and any other section that changed
+    """
+    delta = {'v': new_version, 'b': old_version, 'dt': new['dt'], 'q': new['q'], 's': new['s']}
+
+    old_types, new_p = old['dt'], new['p']
+    old_rows = {}
+    for i, pid in enumerate(old['p']['id']):
+        row = [old['p'][k][i] for k in PREDICTION_COLUMNS]
+        row[1] = old_types[row[1]]  # compare by type name, not dictionary index
+        old_rows[pid] = row
+
+    upsert = {k: [] for k in PREDICTION_COLUMNS}
+    seen = set()
+    for i, pid in enumerate(new_p['id']):
+        seen.add(pid)
+        row = [new_p[k][i] for k in PREDICTION_COLUMNS]
+        named = list(row)
+        named[1] = new['dt'][row[1]]
+        if old_rows.get(pid) != named:
+            for k, value in zip(PREDICTION_COLUMNS, row):
+                upsert[k].append(value)
+    delta['p'] = upsert
+    delta['pr'] = [pid for pid in old['p']['id'] if pid not in seen]
+
+    for key in ('r', 'd', 'h'):
+        if old[key] != new[key]:
+            delta[key] = new[key]
+    return delta
+
+
+class CompactHistory:
+    """Recent compact payloads by version, so deltas can be computed on request"""
+
+    def __init__(self, size=HISTORY_SIZE):
+        self.size = size
+        self._payloads = OrderedDict()
+        self._lock = threading.Lock()
+
+    def remember(self, version, payload):
+        with self._lock:
+            self._payloads[version] = payload
+            self._payloads.move_to_end(version)
+            while len(self._payloads) > self.size:
+                self._payloads.popitem(last=False)
+
+    def get(self, version):
+        with self._lock:
+            return self._payloads.get(version)
+
+
+def negotiate_encoding(accept_encoding):
+    """
+    Pick the best supported content coding from an Accept-Encoding header
+    """
+    accepted = {part.split(';')[0].strip().lower() for part in (accept_encoding or '').split(',')}
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=6)
+    return body
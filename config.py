@@ -19,12 +19,52 @@ class Config:
     # Database
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///lifeguard.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Optional read replica; dashboard and other read-only endpoints query it
+    DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL', '')
+    SQLALCHEMY_BINDS = {'replica': DATABASE_REPLICA_URL} if DATABASE_REPLICA_URL else {}
+    # Applied to every new SQLite connection (see database.py). WAL lets
+    # readers proceed while a writer commits; NORMAL sync is durable under WAL
+    # except for the last transactions on power loss
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+        'cache_size': -int(os.getenv('SQLITE_CACHE_SIZE_KB', '65536')),
+        'temp_store': 'MEMORY',
+        'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE_MB', '256')) * 1024 * 1024
+    }
     
     # Twilio SMS
     TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID', '')
     TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN', '')
     TWILIO_PHONE_NUMBER = os.getenv('TWILIO_PHONE_NUMBER', '')
-    
+
+    # SMS delivery
+    SMS_MAX_ATTEMPTS = 3
+    SMS_RETRY_BACKOFF_SECONDS = float(os.getenv('SMS_RETRY_BACKOFF_SECONDS', '1.0'))
+    SMS_BULK_WORKERS = int(os.getenv('SMS_BULK_WORKERS', '8'))
+    SMS_RATE_LIMIT_PER_SECOND = float(os.getenv('SMS_RATE_LIMIT_PER_SECOND', '100'))
+
+    # Alert outbox
+    ALERT_OUTBOX_BATCH_SIZE = int(os.getenv('ALERT_OUTBOX_BATCH_SIZE', '500'))
+    # Renewed after every STATUS_FLUSH_SIZE results, so it only has to cover one chunk of sends
+    ALERT_OUTBOX_LEASE_SECONDS = int(os.getenv('ALERT_OUTBOX_LEASE_SECONDS', '120'))
+    ALERT_OUTBOX_MAX_ATTEMPTS = int(os.getenv('ALERT_OUTBOX_MAX_ATTEMPTS', '3'))  # claims per alert
+    ALERT_OUTBOX_POLL_SECONDS = float(os.getenv('ALERT_OUTBOX_POLL_SECONDS', '1.0'))
+
+    # Dashboard snapshot cache (TTL 0 disables; set a directory to share across workers)
+    DASHBOARD_CACHE_TTL_SECONDS = int(os.getenv('DASHBOARD_CACHE_TTL_SECONDS', '30'))
+    DASHBOARD_CACHE_DIR = os.getenv('DASHBOARD_CACHE_DIR', '')
+
+    # Binary risk map snapshot (defaults to the Flask instance folder)
+    RISK_SNAPSHOT_PATH = os.getenv('RISK_SNAPSHOT_PATH', '')
+    RISK_SNAPSHOT_INTERVAL_SECONDS = float(os.getenv('RISK_SNAPSHOT_INTERVAL_SECONDS', '60'))
+
+    # Sampling profiler: fraction of requests stack-sampled (0 disables) and
+    # the latency above which a sampled request's profile is kept
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+    PROFILE_SLOW_REQUEST_MS = int(os.getenv('PROFILE_SLOW_REQUEST_MS', '500'))
+
     # Mapbox
     MAPBOX_ACCESS_TOKEN = os.getenv('MAPBOX_ACCESS_TOKEN', 
         'pk.eyJ1IjoieWFzaHdhbnRoIiwiYSI6ImNtNmRjeW1maTAwZ3oybG9saHN5a3p4Z2YifQ.y0B56G2uDXp-UuW13ccJtA')
@@ -32,6 +72,12 @@ class Config:
     # Weather API
     WEATHER_API_KEY = os.getenv('WEATHER_API_KEY', '')
     WEATHER_API_URL = os.getenv('WEATHER_API_URL', 'https://api.openweathermap.org/data/2.5')
+    WEATHER_FETCH_WORKERS = int(os.getenv('WEATHER_FETCH_WORKERS', '16'))  # concurrent requests and pooled connections
+    WEATHER_CACHE_TTL_SECONDS = int(os.getenv('WEATHER_CACHE_TTL_SECONDS', '600'))
+    # Points are snapped to cells this many degrees wide (~55 km at 0.5); keep it
+    # above INFERENCE_GRID_RESOLUTION so neighbouring grid cells share a lookup
+    WEATHER_CACHE_CELL_DEGREES = float(os.getenv('WEATHER_CACHE_CELL_DEGREES', '0.5'))
+    WEATHER_TIMEOUT_SECONDS = float(os.getenv('WEATHER_TIMEOUT_SECONDS', '10'))
     
     # Node.js Server
     NODE_SERVER_URL = os.getenv('NODE_SERVER_URL', 'http://localhost:3000')
@@ -52,6 +98,49 @@ class Config:
     CRITICAL_SEVERITY_THRESHOLD = 4
     HIGH_RISK_POPULATION_THRESHOLD = 1000000
     
+    # Blood demand forecasting
+    BLOOD_FORECAST_DAYS = 7
+    BLOOD_FORECAST_INTERVAL_SECONDS = float(os.getenv('BLOOD_FORECAST_INTERVAL_SECONDS', '300'))
+
+    # Donor notifications
+    DONOR_WEEKLY_NOTIFICATION_CAP = 2
+
+    # Archival (see archive.py): days after onset / sending / deployment
+    # before rows leave the hot tables
+    PREDICTION_ARCHIVE_AFTER_DAYS = int(os.getenv('PREDICTION_ARCHIVE_AFTER_DAYS', '7'))
+    ALERT_ARCHIVE_AFTER_DAYS = int(os.getenv('ALERT_ARCHIVE_AFTER_DAYS', '2'))
+    DEPLOYMENT_ARCHIVE_AFTER_DAYS = int(os.getenv('DEPLOYMENT_ARCHIVE_AFTER_DAYS', '30'))
+    ARCHIVE_INTERVAL_SECONDS = float(os.getenv('ARCHIVE_INTERVAL_SECONDS', '3600'))
+
+    # Model inference (see inference.py); MODEL_DIR defaults to instance/models
+    MODEL_DIR = os.getenv('MODEL_DIR', '')
+    MODEL_CACHE_SIZE = int(os.getenv('MODEL_CACHE_SIZE', '4'))
+    INFERENCE_MODEL_VERSION = os.getenv('INFERENCE_MODEL_VERSION', '')  # empty: newest available
+    INFERENCE_GRID_RESOLUTION = float(os.getenv('INFERENCE_GRID_RESOLUTION', '0.25'))  # degrees
+    INFERENCE_MIN_CONFIDENCE = float(os.getenv('INFERENCE_MIN_CONFIDENCE', '0.6'))
+    INFERENCE_HORIZON_HOURS = 24
+
+    # Shortfall simulation (see simulation.py); 0 workers means one per CPU
+    SIMULATION_WORKERS = int(os.getenv('SIMULATION_WORKERS', '0'))
+    # Scenarios per task are sized so one task's arrays fit in this budget;
+    # SIMULATION_BATCH_SIZE overrides it when set
+    SIMULATION_MEMORY_MB_PER_WORKER = int(os.getenv('SIMULATION_MEMORY_MB_PER_WORKER', '256'))
+    SIMULATION_BATCH_SIZE = int(os.getenv('SIMULATION_BATCH_SIZE', '0'))
+    SIMULATION_SCENARIOS = int(os.getenv('SIMULATION_SCENARIOS', '10000'))
+    # API runs are background jobs, one at a time per web process; larger
+    # runs go through `flask simulate-shortfall`
+    SIMULATION_MAX_SCENARIOS = int(os.getenv('SIMULATION_MAX_SCENARIOS', '20000'))
+    SIMULATION_RESULT_TTL_SECONDS = int(os.getenv('SIMULATION_RESULT_TTL_SECONDS', '3600'))
+    SIMULATION_HORIZON_HOURS = int(os.getenv('SIMULATION_HORIZON_HOURS', '72'))
+    SIMULATION_ONSET_SIGMA_HOURS = float(os.getenv('SIMULATION_ONSET_SIGMA_HOURS', '12'))
+
+    # Deployment scheduling (see deployments.py): dispatched deployments go
+    # in transit after DISPATCH_MINUTES, arrive after eta_hours and are
+    # deployed, returning their stock, SETUP_HOURS after arrival
+    DEPLOYMENT_DISPATCH_MINUTES = int(os.getenv('DEPLOYMENT_DISPATCH_MINUTES', '15'))
+    DEPLOYMENT_SETUP_HOURS = float(os.getenv('DEPLOYMENT_SETUP_HOURS', '2'))
+    DEPLOYMENT_TICK_SECONDS = float(os.getenv('DEPLOYMENT_TICK_SECONDS', '30'))
+
     # Resource allocation
     AMBULANCE_RESPONSE_TIME_MINUTES = 15
     BLOOD_BANK_SEARCH_RADIUS_KM = 50
@@ -67,6 +156,14 @@ class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
     FLASK_ENV = 'production'
+    # Per worker process: size for its request threads plus background workers
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', '10')),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '20')),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT_SECONDS', '30')),
+        'pool_recycle': 1800,
+        'pool_pre_ping': True
+    }
 
     @property
     def SECRET_KEY(self):
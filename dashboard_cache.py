@@ -0,0 +1,201 @@
+"""
+LifeGuard AI - Dashboard Snapshot Cache
+Serialized API snapshots shared between requests, invalidated on model commits
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import namedtuple
+from concurrent.futures import Future
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+GENERATION_KEY = '__generation__'
+
+Snapshot = namedtuple('Snapshot', ['body', 'etag', 'generation'])
+
+
+class MemoryStore:
+    """In-process key/value store with per-entry TTL"""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl=None):
+        now = time.monotonic()
+        with self._lock:
+            # Drop expired entries so superseded generations don't accumulate
+            for k in [k for k, (_, exp) in self._data.items() if exp is not None and exp < now]:
+                del self._data[k]
+            self._data[key] = (value, now + ttl if ttl else None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class FileStore:
+    """
+    Local directory store shared by every worker process on the host. Each
+    file is a JSON header line followed by the raw body for Snapshots; the
+    directory is shared, so nothing in it is unpickled.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.snap')
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                header = json.loads(f.readline())
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        if not isinstance(header, dict):
+            return None
+        expires_at = header.get('expires_at')
+        if expires_at is not None and expires_at < time.time():
+            return None
+        if 'etag' in header:
+            return Snapshot(body, header['etag'], header['generation'])
+        return header.get('value')
+
+    def set(self, key, value, ttl=None):
+        header = {'expires_at': time.time() + ttl if ttl else None}
+        body = b''
+        if isinstance(value, Snapshot):
+            header.update(etag=value.etag, generation=value.generation)
+            body = value.body
+        else:
+            header['value'] = value
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(json.dumps(header).encode('utf-8') + b'\n')
+            f.write(body)
+        os.replace(tmp_path, self._path(key))
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith('.snap'):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+
+class SnapshotCache:
+    """
+    Caches serialized response bodies keyed by name and cache generation.
+    Invalidation starts a new generation, so concurrent builds that began
+    before a write can never publish a stale snapshot.
+    """
+
+    def __init__(self, store=None, ttl=30):
+        self.store = store or MemoryStore()
+        self.ttl = ttl
+        # entry key -> Future of the rebuild in progress, so only callers of
+        # the same key wait for it
+        self._building = {}
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self):
+        return self.store.get(GENERATION_KEY) or '0'
+
+    def get(self, key, builder):
+        """
+        Return the cached Snapshot for `key`, calling `builder()` for the body bytes on a miss
+        """
+        generation = self.generation
+        if self.ttl <= 0:
+            return self._snapshot(builder(), generation)
+
+        entry_key = f"{key}@{generation}"
+        snapshot = self.store.get(entry_key)
+        if snapshot is not None:
+            return snapshot
+
+        # Only one thread rebuilds a key; the rest wait and reuse its result
+        with self._lock:
+            building = self._building.get(entry_key)
+            owner = building is None
+            if owner:
+                building = self._building[entry_key] = Future()
+        if not owner:
+            return building.result()
+        try:
+            snapshot = self.store.get(entry_key)
+            if snapshot is None:
+                snapshot = self._snapshot(builder(), generation)
+                if self.generation == generation:
+                    self.store.set(entry_key, snapshot, self.ttl)
+            building.set_result(snapshot)
+            return snapshot
+        except BaseException as e:
+            building.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._building[entry_key]
+
+    def invalidate(self):
+        self.store.set(GENERATION_KEY, uuid.uuid4().hex)
+
+    @staticmethod
+    def _snapshot(body, generation):
+        return Snapshot(body, hashlib.sha1(body).hexdigest(), generation)
+
+
+def invalidate_on_commit(cache, models):
+    """
+    Invalidate `cache` after any committed transaction that wrote to one of
+    `models`, whether through the unit of work or bulk INSERT/UPDATE/DELETE.
+    """
+    classes = tuple(models)
+    tables = {m.__table__.name for m in classes}
+    flag = f"invalidate_cache_{id(cache)}"
+
+    @event.listens_for(Session, 'after_flush')
+    def _track_flush(session, flush_context):
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            if isinstance(obj, classes):
+                session.info[flag] = True
+                return
+
+    @event.listens_for(Session, 'do_orm_execute')
+    def _track_bulk(orm_execute_state):
+        if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+            return
+        table = getattr(orm_execute_state.statement, 'table', None)
+        if table is not None and getattr(table, 'name', None) in tables:
+            orm_execute_state.session.info[flag] = True
+
+    @event.listens_for(Session, 'after_commit')
+    def _invalidate(session):
+        if session.info.pop(flag, False):
+            cache.invalidate()
+
+    @event.listens_for(Session, 'after_rollback')
+    def _discard(session):
+        session.info.pop(flag, None)
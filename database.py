@@ -0,0 +1,118 @@
+"""
+LifeGuard AI - Database Engine Setup
+SQLite connection pragmas (WAL, busy timeout, cache sizing) and routing of
+read-only work to an optional replica bind.
+
+Reads wrapped in `replica_reads()` go to the 'replica' bind when one is
+configured (DATABASE_REPLICA_URL); everything else, and any read in a
+session that has already written, stays on the primary. Replica reads can
+lag the primary, so snapshot caches filled from them may trail a commit
+by up to the replica lag plus the cache TTL.
+"""
+
+import contextvars
+import importlib
+from contextlib import contextmanager
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+import logging
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND = 'replica'
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+UPSERT_DIALECTS = ('sqlite', 'postgresql')
+
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+
+
+@contextmanager
+def replica_reads():
+    """
+    Route SELECTs issued inside this block (or decorated function) to the
+    read replica. Only wrap code that does not write.
+    """
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class RoutingSession(Session):
+    """db.session class that sends replica_reads() SELECTs to the replica bind"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and _replica_reads.get() and not self._flushing
+                and not self.info.get('wrote') and not (self.new or self.dirty or self.deleted)
+                and getattr(clause, 'is_select', False)):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+# A session that wrote must keep reading the primary until the transaction ends,
+# or it would not see its own uncommitted changes
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_flushed(session, flush_context):
+    session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _mark_dml(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'after_transaction_end')
+def _clear_wrote(session, transaction):
+    if transaction.parent is None:
+        session.info.pop('wrote', None)
+
+
+def upsert_insert(table, dialect_name):
+    """
+    The dialect's insert() for `table` (which supports on_conflict_do_update),
+    or None when `dialect_name` has no native upsert. Dialect modules are
+    imported on first use so SQLite deployments never load the PostgreSQL one.
+    """
+    if dialect_name not in UPSERT_DIALECTS:
+        return None
+    return importlib.import_module(f"sqlalchemy.dialects.{dialect_name}").insert(table)
+
+
+def _is_file_database(engine):
+    database = engine.url.database
+    return bool(database) and database != ':memory:' and 'mode=memory' not in database
+
+
+def configure_sqlite(engine, pragmas):
+    """
+    Apply `pragmas` (name -> value) to every new connection of a SQLite
+    engine. WAL is skipped for in-memory databases, which cannot use it.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+    if not _is_file_database(engine):
+        pragmas = {k: v for k, v in pragmas.items() if k != 'journal_mode'}
+
+    @event.listens_for(engine, 'connect')
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                try:
+                    cursor.execute(f"PRAGMA {name}={value}")
+                except Exception as e:
+                    # e.g. journal_mode on a read-only replica connection
+                    logger.warning(f"Could not set PRAGMA {name}={value} on {engine.url}: {e}")
+        finally:
+            cursor.close()
+
+
+def init_engines(app, db):
+    """Configure every engine Flask-SQLAlchemy created for `app`"""
+    with app.app_context():
+        for engine in db.engines.values():
+            configure_sqlite(engine, app.config['SQLITE_PRAGMAS'])
@@ -0,0 +1,308 @@
+"""
+LifeGuard AI - Deployment Scheduler
+Advances deployments through dispatched -> in_transit -> arrived -> deployed
+and returns their quantity to Resource.available_quantity once deployed.
+
+Active deployments are held in memory in a heap keyed by when they next
+change status, so a tick only touches the ones that are due: they advance
+with one UPDATE ... RETURNING (guarded on the status they were expected to
+have) and finished ones are returned to stock in the same transaction.
+In-flight totals per region are counters adjusted as deployments start and
+finish. Each tick publishes them to DeploymentInFlight and
+DeploymentStatusCount in the same transaction as its updates, and
+in_flight_totals() reads those small tables, so web processes never
+aggregate the deployments table.
+
+Run one scheduler per database; other processes' new deployments are
+picked up by id on every tick.
+"""
+
+import heapq
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import and_, case, delete, func, insert, or_, select, update
+from models import db, Deployment, DeploymentInFlight, DeploymentStatusCount, Resource
+from config import get_config
+import logging
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ('dispatched', 'in_transit', 'arrived', 'deployed')
+ACTIVE_STATUSES = STATUSES[:-1]
+UPDATE_CHUNK_SIZE = 5000
+# Rows below the id high-water mark that are re-checked on every sync, in
+# case a transaction that took a lower id committed after a higher one
+SYNC_OVERLAP = 1000
+
+
+def status_due(timestamp, eta_hours, status):
+    """When a deployment dispatched at `timestamp` leaves `status`"""
+    config = get_config()
+    if status == 'dispatched':
+        return timestamp + timedelta(minutes=config.DEPLOYMENT_DISPATCH_MINUTES)
+    arrival = timestamp + timedelta(hours=eta_hours or 0)
+    if status == 'in_transit':
+        return arrival
+    if status == 'arrived':
+        return arrival + timedelta(hours=config.DEPLOYMENT_SETUP_HOURS)
+    return None
+
+
+def status_at(timestamp, eta_hours, status, now):
+    """The furthest status reached by `now`, never going back from `status`"""
+    index = STATUSES.index(status)
+    while index < len(ACTIVE_STATUSES) and status_due(timestamp, eta_hours, STATUSES[index]) <= now:
+        index += 1
+    return STATUSES[index]
+
+
+def in_flight_totals(region=None):
+    """
+    ({region: {resource_type: quantity}}, {status: count}) of deployments not
+    yet deployed, as the scheduler last published them
+    """
+    query = select(DeploymentInFlight.region, DeploymentInFlight.resource_type, DeploymentInFlight.quantity)
+    if region is not None:
+        query = query.where(DeploymentInFlight.region == region)
+    regions = {} if region is None else {region: {}}
+    for target_region, resource_type, quantity in db.session.execute(query):
+        regions.setdefault(target_region, {})[resource_type] = quantity
+    by_status = dict.fromkeys(ACTIVE_STATUSES, 0)
+    by_status.update(db.session.execute(select(DeploymentStatusCount.status, DeploymentStatusCount.count)).all())
+    return regions, by_status
+
+
+class _Active:
+    __slots__ = ('status', 'due', 'timestamp', 'eta_hours', 'region', 'resource_type', 'quantity')
+
+    def __init__(self, row):
+        self.status = row.status
+        self.timestamp = row.timestamp
+        self.eta_hours = row.eta_hours
+        self.region = row.target_region or ''
+        self.resource_type = row.resource_type
+        self.quantity = row.quantity or 0
+        self.due = status_due(self.timestamp, self.eta_hours, self.status)
+
+
+class DeploymentScheduler:
+    """In-memory schedule of active deployments, advanced by tick() or a background thread"""
+
+    def __init__(self, app, interval=30.0):
+        self.app = app
+        self.interval = interval
+        self._active = {}
+        self._queue = []
+        self._in_flight = defaultdict(lambda: defaultdict(int))
+        self._by_status = dict.fromkeys(ACTIVE_STATUSES, 0)
+        self._last_id = 0
+        # Counters as of the last committed publish, None until the first
+        self._published = None
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_tick = {}
+
+    def _track(self, deployment_id, entry):
+        self._active[deployment_id] = entry
+        self._in_flight[entry.region][entry.resource_type] += entry.quantity
+        self._by_status[entry.status] += 1
+        heapq.heappush(self._queue, (entry.due, deployment_id))
+
+    def _untrack(self, deployment_id):
+        entry = self._active.pop(deployment_id)
+        region = self._in_flight[entry.region]
+        region[entry.resource_type] -= entry.quantity
+        if not region[entry.resource_type]:
+            del region[entry.resource_type]
+            if not region:
+                del self._in_flight[entry.region]
+        self._by_status[entry.status] -= 1
+        return entry
+
+    def _move(self, deployment_id, status):
+        entry = self._active[deployment_id]
+        self._by_status[entry.status] -= 1
+        self._by_status[status] += 1
+        entry.status = status
+        entry.due = status_due(entry.timestamp, entry.eta_hours, status)
+        # The old heap entry goes stale and is skipped when popped
+        heapq.heappush(self._queue, (entry.due, deployment_id))
+
+    def sync(self):
+        """
+        Start tracking active deployments created since the last sync (all of
+        them on the first call). Returns how many were added.
+        """
+        columns = (Deployment.id, Deployment.status, Deployment.timestamp, Deployment.eta_hours,
+                   Deployment.target_region, Deployment.resource_type, Deployment.quantity)
+        with self._lock:
+            since = max(self._last_id - SYNC_OVERLAP, 0) if self._last_id else 0
+            rows = db.session.execute(
+                select(*columns).where(Deployment.id > since, Deployment.status.in_(ACTIVE_STATUSES))
+            ).all()
+            last_id = db.session.execute(select(func.max(Deployment.id))).scalar() or 0
+            added = 0
+            for row in rows:
+                if row.id not in self._active:
+                    self._track(row.id, _Active(row))
+                    added += 1
+            self._last_id = max(self._last_id, last_id)
+        return added
+
+    def tick(self, now=None):
+        """
+        Advance every deployment that is due at `now` and return finished
+        ones to stock. Returns {'advanced', 'completed', 'returned', 'seconds'}.
+        """
+        now = now or datetime.utcnow()
+        start = time.perf_counter()
+        with self._lock:
+            self.sync()
+            due, seen = [], set()
+            while self._queue and self._queue[0][0] <= now:
+                when, deployment_id = heapq.heappop(self._queue)
+                entry = self._active.get(deployment_id)
+                if entry is None or entry.due != when or deployment_id in seen:
+                    continue
+                seen.add(deployment_id)
+                due.append((deployment_id, entry.status,
+                            status_at(entry.timestamp, entry.eta_hours, entry.status, now)))
+
+            try:
+                moved = self._advance(due)
+                returned = self._return_stock(moved)
+                completed = 0
+                for deployment_id, status in moved.items():
+                    if status == 'deployed':
+                        self._untrack(deployment_id)
+                        completed += 1
+                    else:
+                        self._move(deployment_id, status)
+                self._resync([d for d, _, _ in due if d not in moved])
+                published = self._publish()
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                # The counters may now be ahead of the table; reload everything next tick
+                self._reset()
+                raise
+            self._published = published
+
+        self.last_tick = {'advanced': len(moved), 'completed': completed, 'returned': returned,
+                          'seconds': round(time.perf_counter() - start, 4)}
+        if moved:
+            logger.info(f"Advanced {len(moved)} deployments, {completed} completed")
+        return self.last_tick
+
+    def _advance(self, due):
+        """Apply the transitions in `due`; returns {id: new status} for the rows actually changed"""
+        moved = {}
+        table = Deployment.__table__
+        for i in range(0, len(due), UPDATE_CHUNK_SIZE):
+            chunk = due[i:i + UPDATE_CHUNK_SIZE]
+            moves = defaultdict(list)
+            for deployment_id, current, target in chunk:
+                moves[(current, target)].append(deployment_id)
+            stmt = (
+                update(table)
+                .where(or_(*(and_(table.c.id.in_(ids), table.c.status == current)
+                             for (current, _), ids in moves.items())))
+                .values(status=case(*((table.c.id.in_(ids), target) for (_, target), ids in moves.items()),
+                                    else_=table.c.status))
+                .returning(table.c.id, table.c.status)
+            )
+            moved.update(db.session.execute(stmt).all())
+        return moved
+
+    def _return_stock(self, moved):
+        totals = defaultdict(int)
+        for deployment_id, status in moved.items():
+            if status == 'deployed':
+                entry = self._active[deployment_id]
+                totals[entry.resource_type] += entry.quantity
+        if totals:
+            db.session.execute(
+                update(Resource)
+                .where(Resource.resource_type.in_(list(totals)))
+                .values(available_quantity=Resource.available_quantity + case(
+                    *((Resource.resource_type == t, q) for t, q in totals.items()), else_=0))
+                .execution_options(synchronize_session=False)
+            )
+        return dict(totals)
+
+    def _publish(self):
+        """Write the counters to the shared tables if they changed; returns them"""
+        counters = ({(r, t): q for r, totals in self._in_flight.items() for t, q in totals.items() if q},
+                    dict(self._by_status))
+        if counters != self._published:
+            db.session.execute(delete(DeploymentInFlight))
+            db.session.execute(delete(DeploymentStatusCount))
+            if counters[0]:
+                db.session.execute(insert(DeploymentInFlight), [
+                    {'region': r, 'resource_type': t, 'quantity': q} for (r, t), q in counters[0].items()])
+            db.session.execute(insert(DeploymentStatusCount), [
+                {'status': s, 'count': c} for s, c in counters[1].items()])
+        return counters
+
+    def _reset(self):
+        self._active.clear()
+        self._queue.clear()
+        self._in_flight.clear()
+        self._by_status = dict.fromkeys(ACTIVE_STATUSES, 0)
+        self._last_id = 0
+        self._published = None
+
+    def _resync(self, ids):
+        # Rows another writer changed before our UPDATE reached them
+        if not ids:
+            return
+        current = dict(db.session.execute(
+            select(Deployment.id, Deployment.status).where(Deployment.id.in_(ids))).all())
+        for deployment_id in ids:
+            status = current.get(deployment_id)
+            if status in ACTIVE_STATUSES:
+                self._move(deployment_id, status)
+            else:
+                self._untrack(deployment_id)
+
+    def in_flight(self, region=None):
+        """{region: {resource_type: quantity}} of deployments not yet deployed"""
+        with self._lock:
+            if region is not None:
+                return {region: dict(self._in_flight.get(region, {}))}
+            return {r: dict(totals) for r, totals in self._in_flight.items()}
+
+    def stats(self):
+        with self._lock:
+            return {'active': len(self._active), 'by_status': dict(self._by_status),
+                    'queued': len(self._queue), 'last_tick': self.last_tick}
+
+    def is_running(self):
+        """Whether the background thread is ticking, keeping the counters current"""
+        return bool(self._thread and self._thread.is_alive())
+
+    def run(self):
+        logger.info("Deployment scheduler started")
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    self.tick()
+            except Exception as e:
+                logger.error(f"Deployment tick failed: {e}")
+            self._stop.wait(self.interval)
+        logger.info("Deployment scheduler stopped")
+
+    def start(self):
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name='deployments', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
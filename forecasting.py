@@ -0,0 +1,252 @@
+"""
+LifeGuard AI - Blood Demand Forecasting
+Per-region, per-blood-type demand computed with NumPy over all active
+predictions at once, written to BloodForecast in bulk.
+
+Each forecast stores a digest of everything it was computed from (the
+per-region aggregates the model reduces predictions to, its hospital
+capacity and the blood supply), so a refresh only reads the prediction
+rows of regions whose inputs changed.
+Refreshes run from ForecastWorker or `flask refresh-forecasts`, never
+inside a request.
+"""
+
+import hashlib
+import json
+import threading
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import case, delete, func, insert, or_, select
+from models import db, Prediction, Hospital, Resource, BloodForecast
+from config import get_config
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Column order of every per-blood-type array below
+BLOOD_TYPES = ["A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-"]
+# Share of the Indian population by blood type
+BLOOD_TYPE_SHARES = (0.215, 0.012, 0.325, 0.015, 0.075, 0.003, 0.345, 0.010)
+
+# Casualties needing transfusion per affected person, indexed by severity 0-5
+CASUALTY_RATE = (0.0, 0.00005, 0.0001, 0.0003, 0.0008, 0.002)
+DISASTER_MULTIPLIER = {"earthquake": 1.8, "cyclone": 1.2, "flood": 1.0, "heatwave": 0.4}
+UNITS_PER_CASUALTY = 2.5
+# Patients a free bed can take over the forecast window
+BED_TURNOVER = 3
+
+# Only predictions of Moderate severity or above generate demand
+MIN_SEVERITY = 2
+IN_CHUNK_SIZE = 500
+# Per-prediction model inputs, the region first
+INPUT_COLUMNS = (Prediction.region, Prediction.severity, Prediction.affected_population, Prediction.confidence,
+                 Prediction.disaster_type, Prediction.prediction_id)
+
+
+def _active_filter(now, days):
+    """Predictions with an onset within `days` either side of `now` (or none yet)"""
+    return (
+        Prediction.region.isnot(None),
+        Prediction.severity >= MIN_SEVERITY,
+        or_(Prediction.predicted_onset.is_(None),
+            Prediction.predicted_onset.between(now - timedelta(days=days), now + timedelta(days=days)))
+    )
+
+
+def _chunks(values, size=IN_CHUNK_SIZE):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def _casualties():
+    """compute_demands()' casualties per prediction as a SQL expression"""
+    rate = case(*((Prediction.severity == s, r) for s, r in enumerate(CASUALTY_RATE)), else_=CASUALTY_RATE[-1])
+    multiplier = case(*((Prediction.disaster_type == t, m) for t, m in DISASTER_MULTIPLIER.items()), else_=1.0)
+    return (func.coalesce(Prediction.affected_population, 0) * rate
+            * func.coalesce(Prediction.confidence, 1.0) * multiplier)
+
+
+def _region_inputs(now, days):
+    """
+    A digest of each region's inputs, from one GROUP BY over the active
+    predictions. Per region it covers what compute_demands() reduces the
+    predictions to: total and confidence-weighted casualties, plus the
+    largest casualties and an id-weighted sum, which move when a different
+    prediction comes to drive the region's demand.
+    """
+    casualties = _casualties()
+    aggregates = db.session.execute(
+        select(Prediction.region, func.count(), func.sum(casualties),
+               func.sum(casualties * func.coalesce(Prediction.confidence, 1.0)),
+               func.max(casualties), func.sum(casualties * Prediction.id))
+        .where(*_active_filter(now, days)).group_by(Prediction.region)
+    ).all()
+    capacity = {row[0]: tuple(row[1:]) for row in db.session.execute(
+        select(Hospital.region, func.coalesce(func.sum(Hospital.available_beds), 0),
+               func.coalesce(func.sum(Hospital.available_icu), 0), func.coalesce(func.sum(Hospital.total_beds), 0))
+        .group_by(Hospital.region)
+    )}
+    supply = db.session.execute(
+        select(Resource.available_quantity).where(Resource.resource_type == 'blood_units')
+    ).scalar() or 0
+    national_beds = sum(c[2] for c in capacity.values())
+
+    digests = {}
+    for region, count, *sums in aggregates:
+        # Float sums depend on the order the database adds rows in
+        sums = [f"{value or 0.0:.12g}" for value in sums]
+        key = repr((count, sums, capacity.get(region), national_beds, supply, days))
+        digests[region] = hashlib.md5(key.encode()).hexdigest()
+    return digests, capacity, supply, national_beds
+
+
+def _region_rows(regions, now, days):
+    """Active prediction rows (INPUT_COLUMNS) of `regions`, ordered by region then id"""
+    rows = []
+    for chunk in _chunks(regions):
+        rows.extend(db.session.execute(
+            select(*INPUT_COLUMNS).where(*_active_filter(now, days), Prediction.region.in_(chunk))
+            .order_by(Prediction.region, Prediction.id)
+        ).all())
+    return rows
+
+
+def compute_demands(regions, severity, population, confidence, disaster_type, capacity, supply, national_beds):
+    """
+    Vectorized demand model over one row per prediction.
+
+    Returns (region_names, demands[R, 8], confidence[R], shortage[R], top_row[R])
+    where `top_row` indexes the prediction driving most of each region's demand.
+    """
+    import numpy as np
+    names, codes = np.unique(np.asarray(regions, dtype=object), return_inverse=True)
+    n_regions = len(names)
+
+    severity = np.clip(np.nan_to_num(np.asarray(severity, dtype=float)), 0, len(CASUALTY_RATE) - 1).astype(np.int64)
+    population = np.nan_to_num(np.asarray(population, dtype=float))
+    confidence = np.nan_to_num(np.asarray(confidence, dtype=float), nan=1.0)
+    types, type_codes = np.unique(np.asarray(disaster_type, dtype=object).astype(str), return_inverse=True)
+    multiplier = np.array([DISASTER_MULTIPLIER.get(t, 1.0) for t in types])[type_codes]
+
+    casualties = population * np.array(CASUALTY_RATE)[severity] * confidence * multiplier
+    region_casualties = np.bincount(codes, weights=casualties, minlength=n_regions)
+
+    # Regions with hospitals can only treat what their free beds allow; the
+    # rest are assumed transferred, so regions without hospitals stay uncapped
+    region_capacity = np.array([capacity.get(r, (0, 0, 0)) for r in names], dtype=float).reshape(n_regions, 3)
+    beds = (region_capacity[:, 0] + region_capacity[:, 1]) * BED_TURNOVER
+    treated = np.where(beds > 0, np.minimum(region_casualties, beds), region_casualties)
+
+    demands = np.ceil(treated[:, None] * UNITS_PER_CASUALTY * np.array(BLOOD_TYPE_SHARES)[None, :]).astype(np.int64)
+
+    weighted = np.bincount(codes, weights=casualties * confidence, minlength=n_regions)
+    region_confidence = np.divide(weighted, region_casualties, out=np.zeros(n_regions), where=region_casualties > 0)
+
+    # Blood stock is held by hospitals in proportion to their size. Regions
+    # without hospitals hold none, and their casualties are transferred as
+    # above, so they are never reported short themselves
+    if national_beds > 0:
+        region_supply = supply * region_capacity[:, 2] / national_beds
+        shortage = (demands.sum(axis=1) > region_supply) & (region_capacity[:, 2] > 0)
+    else:
+        region_supply = np.full(n_regions, supply / max(n_regions, 1))
+        shortage = demands.sum(axis=1) > region_supply
+
+    order = np.lexsort((casualties, codes))
+    last = np.r_[np.flatnonzero(np.diff(codes[order])), len(order) - 1] if len(order) else np.array([], dtype=int)
+    top_row = order[last]
+    return names, demands, region_confidence, shortage, top_row
+
+
+def refresh_blood_forecasts(force=False, now=None):
+    """
+    Recompute BloodForecast rows for regions whose inputs changed (all
+    regions with `force`) and drop forecasts for regions with no active
+    predictions. Returns counts of updated, removed and unchanged regions.
+    """
+    now = now or datetime.utcnow()
+    days = get_config().BLOOD_FORECAST_DAYS
+    digests, capacity, supply, national_beds = _region_inputs(now, days)
+
+    existing = dict(db.session.execute(select(BloodForecast.region, BloodForecast.inputs_digest)).all())
+    changed = sorted(r for r, d in digests.items() if force or existing.get(r) != d)
+    removed = sorted(set(existing) - set(digests))
+    rows = _region_rows(changed, now, days)
+
+    forecasts = []
+    if rows:
+        regions, severity, population, confidence, disaster_type, prediction_ids = zip(*rows)
+        names, demands, region_confidence, shortage, top_row = compute_demands(
+            regions, severity, population, confidence, disaster_type, capacity, supply, national_beds)
+        forecasts = [{
+            'forecast_id': f"FC-{uuid.uuid4().hex}",
+            'region': region,
+            'timestamp': now,
+            'prediction_id': prediction_ids[top],
+            'blood_demands_json': json.dumps(dict(zip(BLOOD_TYPES, units))),
+            'confidence': round(float(conf), 4),
+            'shortage_detected': bool(short),
+            'inputs_digest': digests[region]
+        } for region, units, conf, short, top in zip(
+            names, demands.tolist(), region_confidence, shortage, top_row)]
+
+    try:
+        for chunk in _chunks(changed + removed):
+            db.session.execute(delete(BloodForecast).where(BloodForecast.region.in_(chunk)))
+        if forecasts:
+            db.session.execute(insert(BloodForecast), forecasts)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    logger.info(f"Blood forecasts refreshed: {len(changed)} updated, {len(removed)} removed")
+    return {'updated': len(changed), 'removed': len(removed), 'unchanged': len(digests) - len(changed)}
+
+
+def get_blood_shortages():
+    """
+    Regions currently forecast to run short, largest demand first
+    """
+    forecasts = BloodForecast.query.filter_by(shortage_detected=True).all()
+    results = [{
+        'region': f.region,
+        'prediction_id': f.prediction_id,
+        'blood_demands': f.blood_demands,
+        'confidence': f.confidence
+    } for f in forecasts]
+    results.sort(key=lambda f: -sum(f['blood_demands'].values()))
+    return results
+
+
+class ForecastWorker:
+    """Background thread that runs refresh_blood_forecasts() every `interval` seconds"""
+
+    def __init__(self, app, interval=300.0):
+        self.app = app
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run(self):
+        logger.info("Blood forecast worker started")
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    refresh_blood_forecasts()
+            except Exception as e:
+                logger.error(f"Blood forecast refresh failed: {e}")
+            self._stop.wait(self.interval)
+        logger.info("Blood forecast worker stopped")
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name='blood-forecast', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
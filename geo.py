@@ -0,0 +1,250 @@
+"""
+LifeGuard AI - Geospatial Query Layer
+Grid-cell index maintained on write, with NumPy-vectorized exact filtering
+"""
+
+import json
+import math
+from sqlalchemy import bindparam, event, select, update
+from models import db, User, Prediction, Hospital, RiskZone
+from config import get_config
+
+# Grid resolution in degrees (~55 km at the equator). Changing it requires
+# re-running backfill_cells() on every indexed table.
+CELL_DEGREES = 0.5
+CELL_COLUMNS = int(360 / CELL_DEGREES)
+
+# Above this many cells a lat/lng range scan is cheaper than a huge IN list
+MAX_CELLS_PER_QUERY = 900
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 111.32
+
+INDEXED_MODELS = (User, Prediction, Hospital)
+
+
+def cell_for(lat, lng):
+    """Grid cell id for a coordinate (scalar or NumPy arrays)"""
+    import numpy as np
+    row = np.floor((np.asarray(lat, dtype=float) + 90.0) / CELL_DEGREES).astype(np.int64)
+    col = np.floor((np.asarray(lng, dtype=float) + 180.0) / CELL_DEGREES).astype(np.int64) % CELL_COLUMNS
+    cells = row * CELL_COLUMNS + col
+    return int(cells) if cells.ndim == 0 else cells
+
+
+def cells_for_bbox(min_lat, min_lng, max_lat, max_lng, max_cells=None):
+    """
+    All grid cell ids overlapping a bounding box clamped to +-90/+-180, or
+    None when that is more than `max_cells` (counted before building any)
+    """
+    if not all(math.isfinite(v) for v in (min_lat, min_lng, max_lat, max_lng)):
+        raise ValueError("bounding box must be finite")
+    row_lo = math.floor((max(min_lat, -90.0) + 90.0) / CELL_DEGREES)
+    row_hi = math.floor((min(max_lat, 90.0) + 90.0) / CELL_DEGREES)
+    col_lo = math.floor((max(min_lng, -180.0) + 180.0) / CELL_DEGREES)
+    col_hi = math.floor((min(max_lng, 180.0) + 180.0) / CELL_DEGREES)
+    # +180 shares its column with -180
+    cols = range(CELL_COLUMNS) if col_hi - col_lo >= CELL_COLUMNS else range(col_lo, col_hi + 1)
+    if max_cells is not None and max(row_hi - row_lo + 1, 0) * len(cols) > max_cells:
+        return None
+    return [row * CELL_COLUMNS + (col % CELL_COLUMNS)
+            for row in range(row_lo, row_hi + 1)
+            for col in cols]
+
+
+def bbox_around(lat, lng, radius_km):
+    """Bounding box (min_lat, min_lng, max_lat, max_lng) enclosing a circle"""
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    dlng = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 1e-6))
+    return lat - dlat, lng - dlng, lat + dlat, lng + dlng
+
+
+def haversine_km(lat, lng, lats, lngs):
+    """Great-circle distance from one point to arrays of points"""
+    import numpy as np
+    lat1 = np.radians(lat)
+    lat2 = np.radians(np.asarray(lats, dtype=float))
+    dlat = lat2 - lat1
+    dlng = np.radians(np.asarray(lngs, dtype=float) - lng)
+    a = np.sin(dlat / 2.0) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def points_in_polygon(lats, lngs, polygon):
+    """
+    Ray-casting point-in-polygon test vectorized over the points.
+    `polygon` is a sequence of [lat, lng] vertices.
+    """
+    import numpy as np
+    lats = np.asarray(lats, dtype=float)
+    lngs = np.asarray(lngs, dtype=float)
+    poly = np.asarray(polygon, dtype=float)
+    inside = np.zeros(lats.shape, dtype=bool)
+    if len(poly) < 3:
+        return inside
+    vy, vx = poly[:, 0], poly[:, 1]
+    jy, jx = np.roll(vy, 1), np.roll(vx, 1)
+    for y1, x1, y2, x2 in zip(vy, vx, jy, jx):
+        crosses = (y1 > lats) != (y2 > lats)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_at = (x2 - x1) * (lats - y1) / (y2 - y1) + x1
+        inside ^= crosses & (lngs < x_at)
+    return inside
+
+
+def _candidate_filter(model, min_lat, min_lng, max_lat, max_lng):
+    """WHERE clause selecting index candidates inside a bounding box"""
+    cells = cells_for_bbox(min_lat, min_lng, max_lat, max_lng, MAX_CELLS_PER_QUERY)
+    if cells is not None:
+        return model.geo_cell.in_(cells)
+    return model.latitude.between(min_lat, max_lat) & model.longitude.between(min_lng, max_lng)
+
+
+def bbox_filter(model, min_lat, min_lng, max_lat, max_lng):
+    """
+    WHERE clause for rows strictly inside a bounding box, using the cell index
+    """
+    return (_candidate_filter(model, min_lat, min_lng, max_lat, max_lng)
+            & model.latitude.between(min_lat, max_lat)
+            & model.longitude.between(min_lng, max_lng))
+
+
+def hospitals_near(lat, lng, radius_km=None):
+    """
+    Hospitals within `radius_km` of a point, nearest first
+    """
+    import numpy as np
+    if radius_km is None:
+        radius_km = get_config().BLOOD_BANK_SEARCH_RADIUS_KM
+    if not 0 < radius_km < math.inf:
+        raise ValueError("radius_km must be a positive number")
+    rows = db.session.execute(
+        select(Hospital.id, Hospital.name, Hospital.region, Hospital.latitude, Hospital.longitude,
+               Hospital.available_beds, Hospital.available_icu, Hospital.ventilators_available)
+        .where(_candidate_filter(Hospital, *bbox_around(lat, lng, radius_km)))
+    ).all()
+    if not rows:
+        return []
+
+    distances = haversine_km(lat, lng, [r.latitude for r in rows], [r.longitude for r in rows])
+    order = np.argsort(distances)
+    results = []
+    for i in order:
+        if distances[i] > radius_km:
+            break
+        r = rows[i]
+        results.append({
+            'id': r.id,
+            'name': r.name,
+            'region': r.region,
+            'lat': r.latitude,
+            'lng': r.longitude,
+            'available_beds': r.available_beds,
+            'available_icu': r.available_icu,
+            'ventilators_available': r.ventilators_available,
+            'distance_km': round(float(distances[i]), 2)
+        })
+    return results
+
+
+def hospitals_near_prediction(prediction_id, radius_km=None):
+    """
+    Hospitals within `radius_km` of a prediction's location, or None if it doesn't exist
+    """
+    row = db.session.execute(
+        select(Prediction.latitude, Prediction.longitude).where(Prediction.prediction_id == prediction_id)
+    ).first()
+    if row is None:
+        return None
+    return hospitals_near(row.latitude, row.longitude, radius_km)
+
+
+def predictions_in_bbox(min_lat, min_lng, max_lat, max_lng):
+    """
+    Ids of predictions inside a viewport bounding box
+    """
+    import numpy as np
+    rows = db.session.execute(
+        select(Prediction.prediction_id, Prediction.latitude, Prediction.longitude)
+        .where(_candidate_filter(Prediction, min_lat, min_lng, max_lat, max_lng))
+    ).all()
+    if not rows:
+        return []
+    lats = np.fromiter((r.latitude for r in rows), dtype=float, count=len(rows))
+    lngs = np.fromiter((r.longitude for r in rows), dtype=float, count=len(rows))
+    mask = (lats >= min_lat) & (lats <= max_lat) & (lngs >= min_lng) & (lngs <= max_lng)
+    return [rows[i].prediction_id for i in np.flatnonzero(mask)]
+
+
+def users_in_zone(zone_id, chunk_size=50000):
+    """
+    Yield (user_id, phone_number) for users inside a risk zone polygon.
+    Candidates are streamed in chunks so memory stays bounded.
+    """
+    import numpy as np
+    zone = db.session.execute(
+        select(RiskZone.coordinates_json, RiskZone.min_lat, RiskZone.min_lng, RiskZone.max_lat, RiskZone.max_lng)
+        .where(RiskZone.zone_id == zone_id)
+    ).first()
+    if zone is None or not zone.coordinates_json:
+        return
+    polygon = json.loads(zone.coordinates_json)
+
+    result = db.session.execute(
+        select(User.user_id, User.phone_number, User.latitude, User.longitude)
+        .where(_candidate_filter(User, zone.min_lat, zone.min_lng, zone.max_lat, zone.max_lng))
+        .execution_options(yield_per=chunk_size)
+    )
+    for chunk in result.partitions(chunk_size):
+        lats = np.fromiter((r.latitude for r in chunk), dtype=float, count=len(chunk))
+        lngs = np.fromiter((r.longitude for r in chunk), dtype=float, count=len(chunk))
+        for i in np.flatnonzero(points_in_polygon(lats, lngs, polygon)):
+            yield chunk[i].user_id, chunk[i].phone_number
+
+
+def backfill_cells(chunk_size=50000):
+    """
+    Compute geo_cell for rows inserted without it (e.g. by bulk Core inserts)
+    """
+    updated = 0
+    for model in INDEXED_MODELS:
+        table = model.__table__
+        while True:
+            rows = db.session.execute(
+                select(model.id, model.latitude, model.longitude)
+                .where(model.geo_cell.is_(None), model.latitude.isnot(None), model.longitude.isnot(None))
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+            cells = cell_for([r.latitude for r in rows], [r.longitude for r in rows])
+            db.session.execute(
+                update(table).where(table.c.id == bindparam('b_id')).values(geo_cell=bindparam('b_cell')),
+                [{'b_id': r.id, 'b_cell': int(c)} for r, c in zip(rows, cells)]
+            )
+            db.session.commit()
+            updated += len(rows)
+    return updated
+
+
+def _set_cell(mapper, connection, target):
+    if target.latitude is not None and target.longitude is not None:
+        target.geo_cell = cell_for(target.latitude, target.longitude)
+    else:
+        target.geo_cell = None
+
+
+def _set_zone_bounds(mapper, connection, target):
+    polygon = json.loads(target.coordinates_json) if target.coordinates_json else []
+    if polygon:
+        lats = [p[0] for p in polygon]
+        lngs = [p[1] for p in polygon]
+        target.min_lat, target.max_lat = min(lats), max(lats)
+        target.min_lng, target.max_lng = min(lngs), max(lngs)
+
+
+for _model in INDEXED_MODELS:
+    event.listen(_model, 'before_insert', _set_cell)
+    event.listen(_model, 'before_update', _set_cell)
+event.listen(RiskZone, 'before_insert', _set_zone_bounds)
+event.listen(RiskZone, 'before_update', _set_zone_bounds)
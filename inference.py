@@ -0,0 +1,329 @@
+"""
+LifeGuard AI - Batch Model Inference
+Scores a whole national grid with versioned scikit-learn models, one
+vectorized predict_proba call per model, and upserts the flagged cells as
+predictions stamped with the model version.
+
+Models are joblib files named <name>-<version>.joblib in the model
+directory. Each process loads a model once into an LRU cache, with its
+NumPy arrays memory-mapped so worker processes share one copy through the
+page cache.
+"""
+
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from sqlalchemy import delete, exists, select
+from models import db, Prediction, Hospital, Alert, BloodForecast
+from ingest import FIELDS, upsert_predictions
+from geo import KM_PER_DEGREE_LAT
+from config import get_config
+import logging
+
+logger = logging.getLogger(__name__)
+
+DISASTER_MODEL = 'disaster'
+SEVERITY_MODEL = 'severity'
+NO_DISASTER = 'none'
+
+FEATURES = ('latitude', 'longitude', 'doy_sin', 'doy_cos', 'rainfall_mm', 'temperature_c', 'wind_kph', 'pressure_hpa')
+WEATHER_FEATURES = FEATURES[4:]
+# Climatology used for cells without weather observations
+WEATHER_DEFAULTS = {'rainfall_mm': 0.0, 'temperature_c': 27.0, 'wind_kph': 10.0, 'pressure_hpa': 1010.0}
+
+INDIA_BOUNDS = (6.0, 68.0, 36.0, 98.0)
+# Prediction radius by severity (index 0 unused) and density for affected estimates
+SEVERITY_RADIUS_KM = (0.0, 10.0, 20.0, 30.0, 50.0, 75.0)
+POPULATION_PER_KM2 = 450
+REGION_MAX_DISTANCE_KM = 150
+UPSERT_CHUNK_SIZE = 5000
+IN_CHUNK_SIZE = 500
+
+_MODEL_FILE = re.compile(r'^(?P<name>[a-z_]+)-(?P<version>[\w.]+)\.joblib$')
+
+
+def _version_key(version):
+    # Numeric parts compare as numbers: 1.10 > 1.9
+    return [(0, int(p), '') if p.isdigit() else (1, 0, p) for p in version.split('.')]
+
+
+class ModelCache:
+    """
+    Thread-safe LRU of loaded models keyed by (name, version). Concurrent
+    requests for a model that is not loaded yet wait for a single load.
+    """
+
+    def __init__(self, directory, capacity=4, mmap=True):
+        self.directory = directory
+        self.capacity = capacity
+        self.mmap = mmap
+        self.hits = 0
+        self.misses = 0
+        self._models = OrderedDict()
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def versions(self, name):
+        """Available versions of a model, oldest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        found = [m.group('version') for m in map(_MODEL_FILE.match, os.listdir(self.directory))
+                 if m and m.group('name') == name]
+        return sorted(found, key=_version_key)
+
+    def path(self, name, version):
+        return os.path.join(self.directory, f"{name}-{version}.joblib")
+
+    def get(self, name, version=None):
+        """(model, version), loading the newest version unless one is pinned"""
+        if version is None:
+            available = self.versions(name)
+            if not available:
+                raise LookupError(f"No {name} model in {self.directory}")
+            version = available[-1]
+        key = (name, version)
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return self._models[key], version
+            load_lock = self._loading.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                if key in self._models:
+                    self.hits += 1
+                    return self._models[key], version
+            import joblib
+            start = time.perf_counter()
+            model = joblib.load(self.path(name, version), mmap_mode='r' if self.mmap else None)
+            logger.info(f"Loaded model {name}-{version} in {time.perf_counter() - start:.2f}s")
+            with self._lock:
+                self.misses += 1
+                self._models[key] = model
+                while len(self._models) > self.capacity:
+                    self._models.popitem(last=False)
+                self._loading.pop(key, None)
+        return model, version
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+
+def national_grid(resolution, bounds=INDIA_BOUNDS):
+    """Flattened cell-centre latitudes and longitudes of a regular grid"""
+    import numpy as np
+    min_lat, min_lng, max_lat, max_lng = bounds
+    lats = np.arange(min_lat + resolution / 2, max_lat, resolution)
+    lngs = np.arange(min_lng + resolution / 2, max_lng, resolution)
+    lat, lng = np.meshgrid(lats, lngs, indexing='ij')
+    return lat.ravel(), lng.ravel()
+
+
+def feature_matrix(lat, lng, when, weather=None):
+    """
+    (n, len(FEATURES)) float32 matrix. `weather` maps a weather feature to
+    a per-cell array or a scalar; missing values fall back to climatology.
+    """
+    import numpy as np
+    lat = np.asarray(lat, dtype=float)
+    day = 2 * math.pi * when.timetuple().tm_yday / 365.25
+    X = np.empty((len(lat), len(FEATURES)), dtype=np.float32)
+    X[:, 0] = lat
+    X[:, 1] = lng
+    X[:, 2] = math.sin(day)
+    X[:, 3] = math.cos(day)
+    weather = weather or {}
+    for column, name in enumerate(WEATHER_FEATURES, 4):
+        values = np.broadcast_to(np.asarray(weather.get(name, np.nan), dtype=float), lat.shape)
+        X[:, column] = np.where(np.isnan(values), WEATHER_DEFAULTS[name], values)
+    return X
+
+
+def score(X, disaster_model, severity_model):
+    """
+    Score every row at once: (disaster_type, confidence, severity,
+    severity_confidence) arrays
+    """
+    import numpy as np
+    rows = np.arange(len(X))
+    proba = disaster_model.predict_proba(X)
+    best = proba.argmax(axis=1)
+    severity_proba = severity_model.predict_proba(X)
+    severity_best = severity_proba.argmax(axis=1)
+    return (disaster_model.classes_[best], proba[rows, best],
+            severity_model.classes_[severity_best].astype(np.int64), severity_proba[rows, severity_best])
+
+
+def explain(X, rows, model, top=2):
+    """
+    Text for each of `rows` naming the important features where it departs
+    most from the rest of the scored batch
+    """
+    import numpy as np
+    importances = getattr(model, 'feature_importances_', None)
+    if importances is None or not len(rows):
+        return [None] * len(rows)
+    selected = X[rows]
+    z = np.abs((selected - X.mean(axis=0)) / (X.std(axis=0) + 1e-9)) * importances
+    leaders = np.argsort(-z, axis=1)[:, :top]
+    return ["Driven by " + ", ".join(f"{FEATURES[j]}={selected[i, j]:.1f}" for j in leaders[i])
+            for i in range(len(rows))]
+
+
+def nearest_regions(lat, lng):
+    """Region of the nearest hospital within REGION_MAX_DISTANCE_KM of each point"""
+    import numpy as np
+    hospitals = db.session.execute(
+        select(Hospital.region, Hospital.latitude, Hospital.longitude)
+        .where(Hospital.latitude.isnot(None), Hospital.longitude.isnot(None), Hospital.region.isnot(None))
+    ).all()
+    regions = [None] * len(lat)
+    if not hospitals:
+        return regions
+    names = [h.region for h in hospitals]
+    h_lat = np.array([h.latitude for h in hospitals])
+    h_lng = np.array([h.longitude for h in hospitals])
+    for start in range(0, len(lat), 512):
+        p_lat = np.asarray(lat[start:start + 512])[:, None]
+        p_lng = np.asarray(lng[start:start + 512])[:, None]
+        dy = (p_lat - h_lat) * KM_PER_DEGREE_LAT
+        dx = (p_lng - h_lng) * KM_PER_DEGREE_LAT * np.cos(np.radians(p_lat))
+        distance = dx * dx + dy * dy
+        nearest = distance.argmin(axis=1)
+        close = distance[np.arange(len(nearest)), nearest] <= REGION_MAX_DISTANCE_KM ** 2
+        for i in np.flatnonzero(close):
+            regions[start + i] = names[nearest[i]]
+    return regions
+
+
+def _remove_stale(prefix, keep):
+    """Drop this run's earlier predictions for cells no longer flagged"""
+    existing = db.session.execute(
+        select(Prediction.prediction_id).where(Prediction.prediction_id.startswith(prefix))
+    ).scalars().all()
+    stale = sorted(set(existing) - keep)
+    removed = 0
+    for start in range(0, len(stale), IN_CHUNK_SIZE):
+        removed += db.session.execute(delete(Prediction).where(
+            Prediction.prediction_id.in_(stale[start:start + IN_CHUNK_SIZE]),
+            # Alerts and forecasts may still point at them
+            ~exists().where(Alert.prediction_id == Prediction.prediction_id),
+            ~exists().where(BloodForecast.prediction_id == Prediction.prediction_id)
+        )).rowcount
+    db.session.commit()
+    return removed
+
+
+def run_inference(cache, when=None, resolution=None, lat=None, lng=None, weather=None, version=None):
+    """
+    Score the national grid (or the given points) for `when` and upsert one
+    prediction per flagged cell. Re-running for the same day updates those
+    predictions in place and removes cells that are no longer flagged.
+    """
+    import numpy as np
+    config = get_config()
+    when = when or datetime.utcnow()
+    version = version or config.INFERENCE_MODEL_VERSION or None
+    disaster_model, disaster_version = cache.get(DISASTER_MODEL, version)
+    severity_model, severity_version = cache.get(SEVERITY_MODEL, version)
+    model_version = disaster_version if disaster_version == severity_version else \
+        f"{disaster_version}/{severity_version}"
+    if len(model_version) > Prediction.model_version.type.length:
+        raise ValueError(f"Model version stamp {model_version!r} is too long to store")
+
+    if lat is None:
+        lat, lng = national_grid(resolution or config.INFERENCE_GRID_RESOLUTION)
+    X = feature_matrix(lat, lng, when, weather)
+
+    start = time.perf_counter()
+    disaster, confidence, severity, severity_confidence = score(X, disaster_model, severity_model)
+    elapsed = time.perf_counter() - start
+
+    flagged = np.flatnonzero((disaster != NO_DISASTER) & (confidence >= config.INFERENCE_MIN_CONFIDENCE))
+    severity = np.clip(severity[flagged], 1, 5)
+    radius = np.array(SEVERITY_RADIUS_KM)[severity]
+    lat = np.asarray(lat, dtype=float)[flagged]
+    lng = np.asarray(lng, dtype=float)[flagged]
+    onset = when + timedelta(hours=config.INFERENCE_HORIZON_HOURS)
+    prefix = f"ML-{onset:%Y%m%d}-"
+
+    rows = [dict.fromkeys(FIELDS) | {
+        'prediction_id': f"{prefix}{la:+.2f}{ln:+.2f}",
+        'timestamp': when,
+        'disaster_type': str(d),
+        'confidence': round(c, 4),
+        'latitude': la,
+        'longitude': ln,
+        'region': region,
+        'radius_km': r,
+        'predicted_onset': onset,
+        'severity': s,
+        'severity_confidence': round(sc, 4),
+        'affected_population': int(POPULATION_PER_KM2 * math.pi * r * r),
+        'explanation': text,
+        'model_version': model_version
+    } for la, ln, d, c, s, sc, r, region, text in zip(
+        lat.tolist(), lng.tolist(), disaster[flagged], confidence[flagged].tolist(), severity.tolist(),
+        severity_confidence[flagged].tolist(), radius.tolist(), nearest_regions(lat, lng),
+        explain(X, flagged, disaster_model))]
+
+    for i in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        upsert_predictions(rows[i:i + UPSERT_CHUNK_SIZE])
+    removed = _remove_stale(prefix, {r['prediction_id'] for r in rows})
+
+    logger.info(f"Inference {model_version}: {len(X)} cells scored in {elapsed:.2f}s, "
+                f"{len(rows)} flagged, {removed} cleared")
+    return {
+        'model_version': model_version,
+        'cells': len(X),
+        'flagged': len(rows),
+        'removed': removed,
+        'score_seconds': round(elapsed, 4),
+        'cells_per_second': round(len(X) / elapsed) if elapsed else None
+    }
+
+
+def train_baseline_models(directory, version, samples=50000, seed=0):
+    """
+    Fit baseline random forests on synthetic, rule-labelled weather samples
+    and save them as <name>-<version>.joblib. Stands in until models trained
+    on real observations are published to the model directory.
+    """
+    import numpy as np
+    import joblib
+    from sklearn.ensemble import RandomForestClassifier
+
+    rng = np.random.default_rng(seed)
+    min_lat, min_lng, max_lat, max_lng = INDIA_BOUNDS
+    lat = rng.uniform(min_lat, max_lat, samples)
+    lng = rng.uniform(min_lng, max_lng, samples)
+    day = rng.uniform(0, 2 * math.pi, samples)
+    rainfall = rng.gamma(0.6, 40.0, samples)
+    temperature = rng.normal(30.0, 6.0, samples)
+    wind = rng.gamma(2.0, 12.0, samples)
+    pressure = rng.normal(1010.0, 5.0, samples) - 0.25 * wind
+    X = np.column_stack([lat, lng, np.sin(day), np.cos(day), rainfall, temperature, wind, pressure]).astype(np.float32)
+
+    coastal = (lng < 74) | (lng > 84) | (lat < 13)
+    labels = np.full(samples, NO_DISASTER, dtype=object)
+    labels[temperature > 42] = 'heatwave'
+    labels[rainfall > 150] = 'flood'
+    labels[coastal & (wind > 55) & (pressure < 1000)] = 'cyclone'
+    intensity = np.select(
+        [labels == 'cyclone', labels == 'flood', labels == 'heatwave'],
+        [(wind - 55) / 30, (rainfall - 150) / 150, (temperature - 42) / 4], default=0.0)
+    severity = np.where(labels == NO_DISASTER, 1, np.clip(2 + np.floor(intensity * 3), 2, 5)).astype(np.int64)
+
+    os.makedirs(directory, exist_ok=True)
+    for name, target in ((DISASTER_MODEL, labels.astype(str)), (SEVERITY_MODEL, severity)):
+        model = RandomForestClassifier(n_estimators=40, max_depth=12, min_samples_leaf=5, n_jobs=-1,
+                                       random_state=seed).fit(X, target)
+        # Uncompressed so arrays can be memory-mapped on load
+        joblib.dump(model, os.path.join(directory, f"{name}-{version}.joblib"))
+    logger.info(f"Trained baseline models {version} on {samples} samples")
@@ -0,0 +1,208 @@
+"""
+LifeGuard AI - Prediction Ingestion
+Streams CSV or NDJSON prediction batches in chunks, validates each record
+and upserts them keyed on prediction_id with one executemany per chunk.
+
+Loading the same batch twice leaves the table unchanged, so a failed model
+run can simply be re-submitted. An update keeps the prediction's original
+timestamp, which the keyset pagination in service.py relies on.
+"""
+
+import csv
+import io
+import json
+import math
+from datetime import datetime, timezone
+from sqlalchemy import delete, insert
+from models import db, Prediction
+from geo import cell_for
+from database import upsert_insert
+import logging
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 20
+FORMATS = ('csv', 'ndjson')
+# Larger than any single cyclone or flood footprint
+MAX_RADIUS_KM = 1000.0
+
+
+def _text(limit):
+    def parse(value):
+        value = str(value).strip()
+        if len(value) > limit:
+            raise ValueError(f"longer than {limit} characters")
+        return value
+    return parse
+
+
+def _number(kind, low=None, high=None):
+    def parse(value):
+        number = float(value)
+        # NaN would slip through the range check below (every comparison is False)
+        if not math.isfinite(number):
+            raise ValueError(f"{value} is not a finite number")
+        if kind is int:
+            if not number.is_integer():
+                raise ValueError(f"{value} is not an integer")
+            number = int(number)
+        if (low is not None and number < low) or (high is not None and number > high):
+            raise ValueError(f"{number} outside [{low}, {high}]")
+        return number
+    return parse
+
+
+def _datetime(value):
+    """ISO 8601 string or epoch seconds, stored as naive UTC"""
+    try:
+        if isinstance(value, (int, float)):
+            parsed = datetime.fromtimestamp(value, timezone.utc)
+        else:
+            parsed = datetime.fromisoformat(str(value).strip().replace('Z', '+00:00'))
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    except (OverflowError, OSError) as e:
+        # Epochs and offsets that leave datetime's year 1-9999 range
+        raise ValueError(f"{value} is out of range ({e})")
+    return parsed
+
+
+# Column -> parser; parsers raise ValueError on bad input
+FIELDS = {
+    'prediction_id': _text(64),
+    'timestamp': _datetime,
+    'disaster_type': _text(50),
+    'confidence': _number(float, 0.0, 1.0),
+    'latitude': _number(float, -90.0, 90.0),
+    'longitude': _number(float, -180.0, 180.0),
+    'region': _text(100),
+    'radius_km': _number(float, 0.0, MAX_RADIUS_KM),
+    'predicted_onset': _datetime,
+    'severity': _number(int, 1, 5),
+    'severity_confidence': _number(float, 0.0, 1.0),
+    'affected_population': _number(int, 0),
+    'explanation': str,
+    'model_version': _text(64)
+}
+REQUIRED_FIELDS = ('prediction_id', 'disaster_type', 'latitude', 'longitude', 'severity')
+
+
+def validate(record):
+    """
+    Normalize one raw record into a full Prediction row; raises ValueError
+    """
+    if not isinstance(record, dict):
+        raise ValueError("record is not an object")
+    row = {}
+    for field, parse in FIELDS.items():
+        value = record.get(field)
+        if value is None or value == '':
+            row[field] = None
+            continue
+        try:
+            row[field] = parse(value)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{field}: {e}")
+    missing = [f for f in REQUIRED_FIELDS if row[f] in (None, '')]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    return row
+
+
+def iter_records(stream, fmt):
+    """
+    Yield (line_number, raw_record_or_error) from a text stream
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == 'ndjson':
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except ValueError as e:
+                yield line_number, ValueError(f"invalid JSON: {e}")
+    else:
+        raise ValueError(f"Unsupported format {fmt!r}, expected one of {FORMATS}")
+
+
+def upsert_statement(dialect_name):
+    """
+    INSERT ... ON CONFLICT (prediction_id) DO UPDATE for the bound dialect,
+    or None when the dialect has no native upsert
+    """
+    stmt = upsert_insert(Prediction.__table__, dialect_name)
+    if stmt is None:
+        return None
+    columns = [c for c in FIELDS if c not in ('prediction_id', 'timestamp')] + ['geo_cell']
+    return stmt.on_conflict_do_update(
+        index_elements=['prediction_id'],
+        set_={c: stmt.excluded[c] for c in columns}
+    )
+
+
+def upsert_predictions(rows):
+    """
+    Upsert full Prediction rows (every FIELDS key, as validate() returns)
+    in one statement and commit; returns the number of distinct rows
+    """
+    import numpy as np
+    # Last occurrence wins; one statement can't touch the same key twice
+    rows = list({row['prediction_id']: row for row in rows}.values())
+    now = datetime.utcnow()
+    lats = np.fromiter((r['latitude'] for r in rows), dtype=float, count=len(rows))
+    lngs = np.fromiter((r['longitude'] for r in rows), dtype=float, count=len(rows))
+    # Core inserts skip the geo.py mapper hooks, so fill the cell index here
+    for row, cell in zip(rows, cell_for(lats, lngs).tolist()):
+        row['geo_cell'] = cell
+        if row['timestamp'] is None:
+            row['timestamp'] = now
+
+    stmt = upsert_statement(db.session.get_bind().dialect.name)
+    try:
+        if stmt is None:
+            db.session.execute(delete(Prediction).where(
+                Prediction.prediction_id.in_([r['prediction_id'] for r in rows])))
+            stmt = insert(Prediction.__table__)
+        db.session.execute(stmt, rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(rows)
+
+
+def ingest_predictions(stream, fmt='ndjson', chunk_size=CHUNK_SIZE):
+    """
+    Validate and upsert predictions from a text stream, committing per chunk.
+    Invalid records are skipped and reported; returns a summary dict.
+    """
+    stats = {'received': 0, 'upserted': 0, 'rejected': 0, 'errors': []}
+    chunk = []
+    for line_number, record in iter_records(stream, fmt):
+        stats['received'] += 1
+        try:
+            if isinstance(record, Exception):
+                raise record
+            chunk.append(validate(record))
+        except ValueError as e:
+            stats['rejected'] += 1
+            if len(stats['errors']) < MAX_REPORTED_ERRORS:
+                stats['errors'].append({'line': line_number, 'error': str(e)})
+            continue
+        if len(chunk) >= chunk_size:
+            stats['upserted'] += upsert_predictions(chunk)
+            chunk = []
+    if chunk:
+        stats['upserted'] += upsert_predictions(chunk)
+    logger.info(f"Ingested {stats['upserted']} predictions ({stats['rejected']} rejected)")
+    return stats
+
+
+def open_text(binary_stream, encoding='utf-8'):
+    """Wrap a binary stream (file, request body) for ingest_predictions"""
+    return io.TextIOWrapper(binary_stream, encoding=encoding, newline='')
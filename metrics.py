@@ -0,0 +1,324 @@
+"""
+LifeGuard AI - Performance Instrumentation
+Request latency histograms, per-request SQL query counts and timings,
+and an optional sampling profiler, exposed in Prometheus text format.
+
+Every thread records into its own shard, so the hot path takes no lock;
+shards are only merged when /metrics is scraped.
+"""
+
+import random
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter as _Tally, deque
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import logging
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+# The same statement this many times within one request is reported as N+1
+N_PLUS_ONE_THRESHOLD = 10
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=''):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    """Metric families plus the per-thread shards holding their values"""
+
+    def __init__(self):
+        self.families = {}
+        self._local = threading.local()
+        self._shards = []
+        self._retired = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name, help, labelnames=()):
+        return self._register(Counter(self, name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(self, name, help, labelnames, buckets))
+
+    def _register(self, family):
+        if family.name in self.families:
+            raise ValueError(f"Metric {family.name} already registered")
+        self.families[family.name] = family
+        return family
+
+    def shard(self):
+        """This thread's values; only the owning thread ever writes to it"""
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def merged(self):
+        """
+        Sum of all shards. Shards of finished threads are folded into one
+        retired shard so short-lived worker threads don't accumulate.
+        """
+        with self._lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    _fold(self._retired, shard)
+            self._shards = live
+            total = {}
+            _fold(total, self._retired)
+            for _, shard in live:
+                _fold(total, shard)
+        return total
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        values = self.merged()
+        lines = []
+        for family in self.families.values():
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            series = sorted((key[1], value) for key, value in values.items() if key[0] == family.name)
+            for labelvalues, value in series:
+                lines.extend(family.render(labelvalues, value))
+        return '\n'.join(lines) + '\n'
+
+
+def _fold(total, shard):
+    # dict.items() is copied atomically under the GIL, so a concurrent
+    # insert by the owning thread can't break the iteration
+    for key, value in list(shard.items()):
+        if isinstance(value, list):
+            current = total.get(key)
+            total[key] = list(value) if current is None else [a + b for a, b in zip(current, value)]
+        else:
+            total[key] = total.get(key, 0) + value
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, registry, name, help, labelnames):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def inc(self, *labelvalues, amount=1):
+        shard = self.registry.shard()
+        key = (self.name, labelvalues)
+        shard[key] = shard.get(key, 0) + amount
+
+    def value(self, *labelvalues):
+        return self.registry.merged().get((self.name, labelvalues), 0)
+
+    def render(self, labelvalues, value):
+        return [f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}"]
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, registry, name, help, labelnames, buckets):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labelvalues):
+        shard = self.registry.shard()
+        key = (self.name, labelvalues)
+        # Per-bucket counts (last one is +Inf), then sum, then count
+        slots = shard.get(key)
+        if slots is None:
+            slots = shard[key] = [0] * (len(self.buckets) + 3)
+        slots[bisect_left(self.buckets, value)] += 1
+        slots[-2] += value
+        slots[-1] += 1
+
+    def count(self, *labelvalues):
+        slots = self.registry.merged().get((self.name, labelvalues))
+        return slots[-1] if slots else 0
+
+    def render(self, labelvalues, slots):
+        lines = []
+        cumulative = 0
+        for bound, hits in zip(self.buckets + ('+Inf',), slots):
+            cumulative += hits
+            le = f'le="{bound}"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labelvalues, le)} {cumulative}")
+        labels = _labels(self.labelnames, labelvalues)
+        lines.append(f"{self.name}_sum{labels} {_number(slots[-2])}")
+        lines.append(f"{self.name}_count{labels} {slots[-1]}")
+        return lines
+
+
+registry = Registry()
+
+REQUEST_LATENCY = registry.histogram(
+    'lifeguard_http_request_duration_seconds', 'HTTP request latency', ('method', 'route', 'status'))
+REQUEST_QUERIES = registry.histogram(
+    'lifeguard_http_request_db_queries', 'SQL statements executed per request', ('route',), QUERY_COUNT_BUCKETS)
+REQUEST_DB_TIME = registry.histogram(
+    'lifeguard_http_request_db_seconds', 'Time spent in SQL per request', ('route',))
+DB_QUERY_LATENCY = registry.histogram(
+    'lifeguard_db_query_duration_seconds', 'SQL statement latency')
+N_PLUS_ONE = registry.counter(
+    'lifeguard_db_n_plus_one_total', 'Requests repeating one statement N+1 style', ('route',))
+
+
+class StackSampler:
+    """
+    Samples the stacks of registered threads every `interval` seconds from
+    one background thread, so sampled requests pay almost nothing inline.
+    """
+
+    def __init__(self, interval=0.005, depth=12, keep=20):
+        self.interval = interval
+        self.depth = depth
+        self.profiles = deque(maxlen=keep)
+        self._targets = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self, ident):
+        with self._lock:
+            self._targets[ident] = _Tally()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def stop(self, ident):
+        """Stop sampling a thread and return its {collapsed_stack: samples}"""
+        with self._lock:
+            tally = self._targets.pop(ident, None)
+            if not self._targets:
+                self._wake.clear()
+        return tally
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            with self._lock:
+                targets = list(self._targets.items())
+            frames = sys._current_frames()
+            for ident, tally in targets:
+                frame = frames.get(ident)
+                if frame is not None:
+                    tally[self._collapse(frame)] += 1
+
+    def _collapse(self, frame):
+        stack = []
+        while frame is not None and len(stack) < self.depth:
+            code = frame.f_code
+            stack.append(f"{code.co_filename.rsplit('/', 1)[-1]}:{code.co_name}:{frame.f_lineno}")
+            frame = frame.f_back
+        return ';'.join(reversed(stack))
+
+
+class _RequestState(threading.local):
+    active = False
+
+
+_request = _RequestState()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info['query_start'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start']
+    DB_QUERY_LATENCY.observe(elapsed)
+    if _request.active:
+        _request.queries += 1
+        _request.db_seconds += elapsed
+        _request.statements[statement] += 1
+
+
+def instrument_app(app, profile_sample_rate=0.0, profile_slow_ms=500):
+    """
+    Record latency and SQL usage for every request of `app`. With a
+    non-zero `profile_sample_rate` that fraction of requests is stack-sampled
+    and the profile is kept (and logged) when it ran longer than `profile_slow_ms`.
+    Returns the sampler, or None when profiling is off.
+    """
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    sampler = StackSampler() if profile_sample_rate > 0 else None
+
+    @app.before_request
+    def _start_request_metrics():
+        _request.active = True
+        _request.start = time.perf_counter()
+        _request.queries = 0
+        _request.db_seconds = 0.0
+        _request.statements = _Tally()
+        _request.status = 500
+        _request.sampled = sampler is not None and random.random() < profile_sample_rate
+        if _request.sampled:
+            sampler.start(threading.get_ident())
+
+    @app.after_request
+    def _record_status(response):
+        _request.status = response.status_code
+        return response
+
+    @app.teardown_request
+    def _finish_request_metrics(exc):
+        if not _request.active:
+            return
+        _request.active = False
+        elapsed = time.perf_counter() - _request.start
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        REQUEST_LATENCY.observe(elapsed, request.method, route, str(_request.status))
+        REQUEST_QUERIES.observe(_request.queries, route)
+        REQUEST_DB_TIME.observe(_request.db_seconds, route)
+
+        if _request.statements:
+            statement, repeats = _request.statements.most_common(1)[0]
+            if repeats >= N_PLUS_ONE_THRESHOLD:
+                N_PLUS_ONE.inc(route)
+                logger.warning(f"Possible N+1 on {route}: statement ran {repeats} times: "
+                               f"{' '.join(statement.split())[:200]}")
+
+        if _request.sampled:
+            tally = sampler.stop(threading.get_ident())
+            if tally and elapsed * 1000 >= profile_slow_ms:
+                top = tally.most_common(10)
+                sampler.profiles.append({
+                    'route': route,
+                    'method': request.method,
+                    'duration_ms': round(elapsed * 1000, 1),
+                    'samples': sum(tally.values()),
+                    'stacks': [{'stack': stack, 'samples': n} for stack, n in top]
+                })
+                logger.warning(f"Slow request {request.method} {route} took {elapsed * 1000:.0f} ms; "
+                               f"hottest stack: {top[0][0]}")
+
+    return sampler
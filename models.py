@@ -5,11 +5,13 @@ LifeGuard AI - Database Models
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 import json
+from database import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(db.Model):
     __tablename__ = 'users'
+    __table_args__ = (db.Index('ix_users_region_blood_type', 'region', 'blood_type'),)
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.String(64), unique=True, index=True)
     role = db.Column(db.String(20), default='donor')  # authority, hospital, donor
@@ -17,9 +19,13 @@ class User(db.Model):
     language_preference = db.Column(db.String(10), default='en')
     region = db.Column(db.String(100))
     blood_type = db.Column(db.String(5))
-    notification_count_this_week = db.Column(db.Integer, default=0)
+    notification_count_this_week = db.Column(db.Integer, default=0)  # only valid for notification_week
+    notification_week = db.Column(db.Integer)  # week number the count belongs to, see targeting.py
     last_notification = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+    geo_cell = db.Column(db.Integer, index=True)  # maintained by geo.py
 
 class Prediction(db.Model):
     __tablename__ = 'predictions'
@@ -30,25 +36,45 @@ class Prediction(db.Model):
     confidence = db.Column(db.Float)
     latitude = db.Column(db.Float)
     longitude = db.Column(db.Float)
+    geo_cell = db.Column(db.Integer, index=True)  # maintained by geo.py
+    region = db.Column(db.String(100), index=True)
     radius_km = db.Column(db.Float)
-    predicted_onset = db.Column(db.DateTime)
+    predicted_onset = db.Column(db.DateTime, index=True)  # archived some days after, see archive.py
     severity = db.Column(db.Integer)  # 1-5
     severity_confidence = db.Column(db.Float)
     affected_population = db.Column(db.Integer)
     explanation = db.Column(db.Text)
-    model_version = db.Column(db.String(20))
+    model_version = db.Column(db.String(64))  # '<disaster>/<severity>' when the versions differ
+
+    def to_dict(self):
+        return {
+            "id": self.prediction_id,
+            "disaster_type": self.disaster_type,
+            "severity": self.severity,
+            "confidence": round(self.confidence * 100, 1) if self.confidence is not None else None,
+            "lat": self.latitude,
+            "lng": self.longitude,
+            "affected_population": self.affected_population,
+            "predicted_time": self.predicted_onset.strftime("%Y-%m-%d %H:%M") if self.predicted_onset else None
+        }
 
 class Alert(db.Model):
     __tablename__ = 'alerts'
     id = db.Column(db.Integer, primary_key=True)
     alert_id = db.Column(db.String(64), unique=True, index=True)
     user_id = db.Column(db.String(64), db.ForeignKey('users.user_id'))
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     alert_type = db.Column(db.String(20))  # DISASTER, DONOR_REQUEST
     message = db.Column(db.Text)
     language = db.Column(db.String(10))
-    status = db.Column(db.String(20))  # SENT, FAILED, PENDING
-    prediction_id = db.Column(db.String(64), db.ForeignKey('predictions.prediction_id'))
+    status = db.Column(db.String(20), index=True)  # PENDING, SENDING, SENT, FAILED
+    prediction_id = db.Column(db.String(64), db.ForeignKey('predictions.prediction_id'), index=True)
+    phone_number = db.Column(db.String(20))
+    attempts = db.Column(db.Integer, default=0)
+    lease_owner = db.Column(db.String(64), index=True)
+    lease_expires_at = db.Column(db.DateTime)
+    sent_at = db.Column(db.DateTime)
+    provider_sid = db.Column(db.String(64))
 
 class BloodForecast(db.Model):
     __tablename__ = 'blood_forecasts'
@@ -60,6 +86,7 @@ class BloodForecast(db.Model):
     blood_demands_json = db.Column(db.Text)  # JSON string of blood type demands
     confidence = db.Column(db.Float)
     shortage_detected = db.Column(db.Boolean, default=False)
+    inputs_digest = db.Column(db.String(32))  # see forecasting.py
 
     @property
     def blood_demands(self):
@@ -74,11 +101,19 @@ class RiskZone(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     zone_id = db.Column(db.String(64), unique=True)
     region = db.Column(db.String(100))
-    coordinates_json = db.Column(db.Text)  # JSON polygon coordinates
+    coordinates_json = db.Column(db.Text)  # JSON polygon coordinates as [[lat, lng], ...]
+    min_lat = db.Column(db.Float)  # bounding box maintained by geo.py
+    min_lng = db.Column(db.Float)
+    max_lat = db.Column(db.Float)
+    max_lng = db.Column(db.Float)
     severity = db.Column(db.Integer)
     affected_population = db.Column(db.Integer)
     last_updated = db.Column(db.DateTime, default=datetime.utcnow)
     color_code = db.Column(db.String(10))
+    # Set by zones.py for zones built from predictions
+    lod_json = db.Column(db.Text)  # {"1": [[lat, lng], ...], "2": ...} simplified outlines
+    prediction_count = db.Column(db.Integer)
+    inputs_digest = db.Column(db.String(32), unique=True)
 
 class Hospital(db.Model):
     __tablename__ = 'hospitals'
@@ -87,6 +122,7 @@ class Hospital(db.Model):
     region = db.Column(db.String(100))
     latitude = db.Column(db.Float)
     longitude = db.Column(db.Float)
+    geo_cell = db.Column(db.Integer, index=True)  # maintained by geo.py
     total_beds = db.Column(db.Integer)
     available_beds = db.Column(db.Integer)
     total_icu = db.Column(db.Integer)
@@ -100,6 +136,9 @@ class Resource(db.Model):
     total_quantity = db.Column(db.Integer)
     available_quantity = db.Column(db.Integer)
 
+    def to_dict(self):
+        return {"total": self.total_quantity, "available": self.available_quantity}
+
 class Deployment(db.Model):
     __tablename__ = 'deployments'
     id = db.Column(db.Integer, primary_key=True)
@@ -107,7 +146,37 @@ class Deployment(db.Model):
     resource_type = db.Column(db.String(50))
     quantity = db.Column(db.Integer)
     target_region = db.Column(db.String(100))
-    status = db.Column(db.String(20))  # dispatched, in_transit, arrived, deployed
+    status = db.Column(db.String(20), index=True)  # dispatched, in_transit, arrived, deployed
     eta_hours = db.Column(db.Integer)
     priority = db.Column(db.String(20))  # critical, high, medium
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def to_dict(self):
+        return {"id": self.deployment_id, "resource": self.resource_type, "quantity": self.quantity, "status": self.status}
+
+class DeploymentInFlight(db.Model):
+    """Quantity not yet deployed per region and resource type, published by deployments.py"""
+    __tablename__ = 'deployments_in_flight'
+    region = db.Column(db.String(100), primary_key=True)  # '' for deployments without a target region
+    resource_type = db.Column(db.String(50), primary_key=True)
+    quantity = db.Column(db.BigInteger, nullable=False, default=0)
+
+class DeploymentStatusCount(db.Model):
+    """Number of active deployments per status, published with DeploymentInFlight"""
+    __tablename__ = 'deployment_status_counts'
+    status = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class DailyRollup(db.Model):
+    """Per-day totals of archived rows, written by archive.py"""
+    __tablename__ = 'daily_rollups'
+    __table_args__ = (db.UniqueConstraint('kind', 'day', 'region', 'category', name='uq_daily_rollups_key'),)
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # prediction, alert, deployment
+    day = db.Column(db.Date, nullable=False)
+    region = db.Column(db.String(100), nullable=False, default='')
+    category = db.Column(db.String(50), nullable=False, default='')  # disaster, alert or resource type
+    count = db.Column(db.Integer, nullable=False, default=0)
+    # prediction: affected population, alert: delivered, deployment: quantity
+    total = db.Column(db.BigInteger, nullable=False, default=0)
+    max_severity = db.Column(db.Integer)  # predictions only
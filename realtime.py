@@ -0,0 +1,126 @@
+"""
+LifeGuard AI - Real-time Dashboard Updates
+Broadcasts incremental model changes to connected dashboards over Socket.IO
+"""
+
+import socketio
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from models import Prediction, Resource, Deployment
+import logging
+
+logger = logging.getLogger(__name__)
+
+# One server shared by all dashboards; every commit costs a single broadcast
+sio = socketio.Server(async_mode='threading', cors_allowed_origins='*')
+
+TRACKED_TABLES = {m.__table__.name for m in (Prediction, Resource, Deployment)}
+
+
+def _empty_delta():
+    return {
+        'predictions': {'upsert': {}, 'removed': set()},
+        'resources': {},
+        'deployments': {},
+        'resync': False
+    }
+
+
+class DeltaBroadcaster:
+    """
+    Collects Prediction, Resource and Deployment changes per transaction and
+    emits them as one `delta` event after commit. Bulk statements that bypass
+    the unit of work emit `resync` so clients refetch the full snapshot.
+    """
+
+    def __init__(self, emit):
+        self.emit = emit
+        self.key = f"realtime_delta_{id(self)}"
+        self._listeners = [
+            ('after_flush', self._after_flush),
+            ('do_orm_execute', self._on_execute),
+            ('after_commit', self._after_commit),
+            ('after_rollback', self._after_rollback)
+        ]
+        for name, fn in self._listeners:
+            event.listen(Session, name, fn)
+
+    def close(self):
+        """Detach the session hooks"""
+        for name, fn in self._listeners:
+            event.remove(Session, name, fn)
+
+    def _delta(self, session):
+        return session.info.setdefault(self.key, _empty_delta())
+
+    def _after_flush(self, session, flush_context):
+        for obj in session.new:
+            self._record(session, obj)
+        for obj in session.dirty:
+            if session.is_modified(obj, include_collections=False):
+                self._record(session, obj)
+        for obj in session.deleted:
+            if isinstance(obj, Prediction):
+                delta = self._delta(session)
+                delta['predictions']['upsert'].pop(obj.prediction_id, None)
+                delta['predictions']['removed'].add(obj.prediction_id)
+            elif isinstance(obj, (Resource, Deployment)):
+                self._delta(session)['resync'] = True
+
+    def _record(self, session, obj):
+        if isinstance(obj, Prediction):
+            delta = self._delta(session)
+            history = inspect(obj).attrs.prediction_id.history
+            # A renamed prediction replaces the old id on the client
+            for old_id in history.deleted or ():
+                if old_id:
+                    delta['predictions']['removed'].add(old_id)
+            delta['predictions']['removed'].discard(obj.prediction_id)
+            delta['predictions']['upsert'][obj.prediction_id] = obj.to_dict()
+        elif isinstance(obj, Resource):
+            self._delta(session)['resources'][obj.resource_type] = obj.to_dict()
+        elif isinstance(obj, Deployment):
+            self._delta(session)['deployments'][obj.deployment_id] = obj.to_dict()
+
+    def _on_execute(self, orm_execute_state):
+        if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+            return
+        table = getattr(orm_execute_state.statement, 'table', None)
+        if table is not None and getattr(table, 'name', None) in TRACKED_TABLES:
+            self._delta(orm_execute_state.session)['resync'] = True
+
+    def _after_commit(self, session):
+        delta = session.info.pop(self.key, None)
+        if delta is None:
+            return
+        try:
+            if delta['resync']:
+                self.emit('resync', {})
+                return
+            self.emit('delta', {
+                'predictions': {
+                    'upsert': list(delta['predictions']['upsert'].values()),
+                    'removed': sorted(delta['predictions']['removed'])
+                },
+                'resources': delta['resources'],
+                'deployments': list(delta['deployments'].values())
+            })
+        except Exception as e:
+            logger.error(f"Failed to broadcast dashboard delta: {e}")
+
+    def _after_rollback(self, session):
+        session.info.pop(self.key, None)
+
+
+def broadcast(event_name, data):
+    sio.emit(event_name, data)
+
+
+@sio.event
+def connect(sid, environ):
+    logger.info(f"Dashboard connected: {sid}")
+
+
+@sio.event
+def disconnect(sid, *args):
+    logger.info(f"Dashboard disconnected: {sid}")
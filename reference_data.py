@@ -0,0 +1,32 @@
+"""
+LifeGuard AI - Reference Data
+Regions, disaster types and initial resource stock, shared by the app's
+seed data and the benchmark data generators
+"""
+
+INDIA_REGIONS = {
+    "Maharashtra": {"lat": 19.7515, "lng": 75.7139, "population": 112374333, "hospitals": 4823},
+    "Tamil Nadu": {"lat": 11.1271, "lng": 78.6569, "population": 72147030, "hospitals": 3456},
+    "Gujarat": {"lat": 22.2587, "lng": 71.1924, "population": 60439692, "hospitals": 2890},
+    "Kerala": {"lat": 10.8505, "lng": 76.2711, "population": 33406061, "hospitals": 2134},
+    "West Bengal": {"lat": 22.9868, "lng": 87.8550, "population": 91276115, "hospitals": 3678}
+}
+
+DISASTER_TYPES = {
+    "cyclone": {"icon": "🌀", "color": "#6366f1", "severity_range": (3, 5)},
+    "flood": {"icon": "🌊", "color": "#0ea5e9", "severity_range": (2, 5)},
+    "earthquake": {"icon": "🌍", "color": "#ef4444", "severity_range": (3, 5)},
+    "heatwave": {"icon": "🔥", "color": "#f97316", "severity_range": (2, 4)}
+}
+
+# Initial Resource rows for an empty database
+SEED_RESOURCES = [
+    {"resource_type": "ambulances", "total_quantity": 15000, "available_quantity": 12500},
+    {"resource_type": "hospital_beds", "total_quantity": 1850000, "available_quantity": 980000},
+    {"resource_type": "icu_beds", "total_quantity": 95000, "available_quantity": 45000},
+    {"resource_type": "ventilators", "total_quantity": 48000, "available_quantity": 28000},
+    {"resource_type": "blood_units", "total_quantity": 500000, "available_quantity": 420000},
+    {"resource_type": "medical_teams", "total_quantity": 5000, "available_quantity": 3500},
+    {"resource_type": "relief_kits", "total_quantity": 2000000, "available_quantity": 1500000},
+    {"resource_type": "oxygen_cylinders", "total_quantity": 250000, "available_quantity": 180000}
+]
@@ -0,0 +1,398 @@
+"""
+LifeGuard AI - Binary Risk Map Snapshot
+Predictions, risk zones and hospital readiness materialized as fixed-width
+NumPy structured arrays in one file. Workers mmap the file and slice the
+arrays without copying; the browser caches the same bytes for offline use.
+
+File layout (little-endian):
+    magic   8 bytes  b'LGSNAP01'
+    length  uint32   size of the JSON header
+    header  JSON     version, created, string dictionaries and, per section,
+                     {offset, count, itemsize, fields: {name: [type, offset]}}
+    data    one block per section, each aligned to ALIGNMENT bytes
+
+The version hashes the section bytes, so rebuilding unchanged data yields
+the same version and leaves the file (and every reader) untouched.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from models import db, Prediction, RiskZone, Hospital
+from service import readiness_score_expr
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'LGSNAP01'
+ALIGNMENT = 64
+NO_TIME = -2 ** 63  # int64 minimum
+EPOCH = datetime(1970, 1, 1)
+
+# Structured dtype specs; NumPy accepts them wherever it takes a dtype
+PREDICTION_DTYPE = [
+    ('id', 'S64'), ('disaster_type', 'u1'), ('severity', 'u1'), ('confidence', '<f4'),
+    ('lat', '<f4'), ('lng', '<f4'), ('radius_km', '<f4'), ('affected_population', '<u4'),
+    ('onset', '<i8'), ('region', '<u4')
+]
+ZONE_DTYPE = [
+    ('id', 'S64'), ('region', '<u4'), ('severity', 'u1'), ('affected_population', '<u4'),
+    ('min_lat', '<f4'), ('min_lng', '<f4'), ('max_lat', '<f4'), ('max_lng', '<f4'),
+    ('vertex_start', '<u4'), ('vertex_count', '<u4')
+]
+VERTEX_DTYPE = [('lat', '<f4'), ('lng', '<f4')]
+HOSPITAL_DTYPE = [
+    ('name_offset', '<u4'), ('name_length', '<u2'), ('region', '<u4'), ('lat', '<f4'), ('lng', '<f4'),
+    ('available_beds', '<u4'), ('available_icu', '<u4'), ('readiness', '<f4')
+]
+STRING_DTYPE = 'u1'
+SECTIONS = {
+    'predictions': PREDICTION_DTYPE,
+    'zones': ZONE_DTYPE,
+    'zone_vertices': VERTEX_DTYPE,
+    'hospitals': HOSPITAL_DTYPE,
+    'strings': STRING_DTYPE  # UTF-8 heap for hospital names
+}
+
+
+class _Dictionary:
+    """Assigns stable integer codes to strings ('' for None)"""
+
+    def __init__(self):
+        self.values = []
+        self._index = {}
+
+    def encode(self, values):
+        codes = []
+        for value in values:
+            value = value or ''
+            code = self._index.get(value)
+            if code is None:
+                code = self._index[value] = len(self.values)
+                self.values.append(value)
+            codes.append(code)
+        return codes
+
+
+def _filled(values, default=0):
+    return [default if v is None else v for v in values]
+
+
+def _epoch_seconds(values):
+    return [NO_TIME if v is None else int((v - EPOCH).total_seconds()) for v in values]
+
+
+def build_sections():
+    """
+    Query the source tables into structured arrays.
+    Returns ({section: array}, {dictionary name: [strings]}).
+    """
+    import numpy as np
+    disaster_types, regions = _Dictionary(), _Dictionary()
+
+    rows = db.session.execute(
+        select(Prediction.prediction_id, Prediction.disaster_type, Prediction.severity, Prediction.confidence,
+               Prediction.latitude, Prediction.longitude, Prediction.radius_km, Prediction.affected_population,
+               Prediction.predicted_onset, Prediction.region)
+        .order_by(Prediction.prediction_id)
+    ).all()
+    predictions = np.zeros(len(rows), dtype=PREDICTION_DTYPE)
+    if rows:
+        ids, types, severity, confidence, lat, lng, radius, population, onset, region = zip(*rows)
+        predictions['id'] = [i.encode('utf-8') for i in ids]
+        predictions['disaster_type'] = disaster_types.encode(types)
+        predictions['severity'] = _filled(severity)
+        predictions['confidence'] = _filled(confidence, np.nan)
+        predictions['lat'] = _filled(lat, np.nan)
+        predictions['lng'] = _filled(lng, np.nan)
+        predictions['radius_km'] = _filled(radius, np.nan)
+        predictions['affected_population'] = _filled(population)
+        predictions['onset'] = _epoch_seconds(onset)
+        predictions['region'] = regions.encode(region)
+
+    zone_rows = db.session.execute(
+        select(RiskZone.zone_id, RiskZone.region, RiskZone.severity, RiskZone.affected_population,
+               RiskZone.min_lat, RiskZone.min_lng, RiskZone.max_lat, RiskZone.max_lng, RiskZone.coordinates_json)
+        .order_by(RiskZone.zone_id)
+    ).all()
+    zones = np.zeros(len(zone_rows), dtype=ZONE_DTYPE)
+    polygons = [json.loads(z.coordinates_json) if z.coordinates_json else [] for z in zone_rows]
+    counts = np.array([len(p) for p in polygons], dtype=np.uint32)
+    vertices = np.zeros(int(counts.sum()), dtype=VERTEX_DTYPE)
+    if zone_rows:
+        if len(vertices):
+            flat = np.array([v for p in polygons for v in p], dtype=float).reshape(-1, 2)
+            vertices['lat'], vertices['lng'] = flat[:, 0], flat[:, 1]
+        zones['id'] = [z.zone_id.encode('utf-8') for z in zone_rows]
+        zones['region'] = regions.encode(z.region for z in zone_rows)
+        zones['severity'] = _filled(z.severity for z in zone_rows)
+        zones['affected_population'] = _filled(z.affected_population for z in zone_rows)
+        for field in ('min_lat', 'min_lng', 'max_lat', 'max_lng'):
+            zones[field] = _filled((getattr(z, field) for z in zone_rows), np.nan)
+        zones['vertex_start'] = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        zones['vertex_count'] = counts
+
+    hospital_rows = db.session.execute(
+        select(Hospital.name, Hospital.region, Hospital.latitude, Hospital.longitude,
+               Hospital.available_beds, Hospital.available_icu, readiness_score_expr())
+        .order_by(Hospital.id)
+    ).all()
+    hospitals = np.zeros(len(hospital_rows), dtype=HOSPITAL_DTYPE)
+    names = [(h[0] or '').encode('utf-8')[:0xFFFF] for h in hospital_rows]
+    strings = np.frombuffer(b''.join(names), dtype=STRING_DTYPE)
+    if hospital_rows:
+        lengths = np.array([len(n) for n in names], dtype=np.uint32)
+        hospitals['name_offset'] = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        hospitals['name_length'] = lengths
+        hospitals['region'] = regions.encode(h[1] for h in hospital_rows)
+        hospitals['lat'] = _filled((h[2] for h in hospital_rows), np.nan)
+        hospitals['lng'] = _filled((h[3] for h in hospital_rows), np.nan)
+        hospitals['available_beds'] = _filled(h[4] for h in hospital_rows)
+        hospitals['available_icu'] = _filled(h[5] for h in hospital_rows)
+        hospitals['readiness'] = [h[6] * 100 for h in hospital_rows]
+
+    arrays = {'predictions': predictions, 'zones': zones, 'zone_vertices': vertices,
+              'hospitals': hospitals, 'strings': strings}
+    return arrays, {'disaster_types': disaster_types.values, 'regions': regions.values}
+
+
+def _align(n):
+    return -n % ALIGNMENT
+
+
+def _section_header(spec):
+    import numpy as np
+    dtype = np.dtype(spec)
+    if dtype.names is None:
+        return {'itemsize': dtype.itemsize, 'fields': {}}
+    return {
+        'itemsize': dtype.itemsize,
+        'fields': {name: [dtype.fields[name][0].str, dtype.fields[name][1]] for name in dtype.names}
+    }
+
+
+def encode_snapshot(arrays, dictionaries):
+    """
+    Serialize sections into the snapshot file format; returns (bytes, version)
+    """
+    import numpy as np
+    blobs = {name: np.ascontiguousarray(arrays[name], dtype=dtype).tobytes() for name, dtype in SECTIONS.items()}
+    digest = hashlib.sha1()
+    for name in SECTIONS:
+        digest.update(blobs[name])
+    digest.update(json.dumps(dictionaries, sort_keys=True).encode('utf-8'))
+    version = digest.hexdigest()[:16]
+
+    sections = {name: dict(_section_header(dtype), count=len(arrays[name])) for name, dtype in SECTIONS.items()}
+    header = {'format': 1, 'version': version, 'created': int(time.time()), 'sections': sections}
+    header.update(dictionaries)
+
+    # Offsets depend on the header size, which depends on the offsets' digits;
+    # repeat the layout until the data start stops moving
+    start = 0
+    for _ in range(5):
+        offset = start
+        for name in SECTIONS:
+            sections[name]['offset'] = offset
+            offset += len(blobs[name]) + _align(len(blobs[name]))
+        header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+        prefix = len(MAGIC) + 4 + len(header_bytes)
+        if prefix + _align(prefix) == start:
+            break
+        start = prefix + _align(prefix)
+    else:
+        raise RuntimeError("Snapshot header layout did not converge")
+
+    parts = [MAGIC, struct.pack('<I', len(header_bytes)), header_bytes, b'\0' * _align(prefix)]
+    for name in SECTIONS:
+        parts.append(blobs[name])
+        parts.append(b'\0' * _align(len(blobs[name])))
+    return b''.join(parts), version
+
+
+def read_version(path):
+    """Version of the snapshot at `path`, or None if there is none"""
+    try:
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            length, = struct.unpack('<I', f.read(4))
+            return json.loads(f.read(length))['version']
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def write_snapshot(path):
+    """
+    Materialize the current data to `path` atomically. The file is only
+    replaced when the content changed; returns the snapshot version.
+    """
+    body, version = encode_snapshot(*build_sections())
+    if read_version(path) == version:
+        return version
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.snapshot-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    logger.info(f"Risk snapshot {version} written ({len(body)} bytes)")
+    return version
+
+
+class SnapshotReader:
+    """
+    Read-only, memory-mapped view of a snapshot file. Section arrays are
+    zero-copy views into the mapping; they stay valid after the file is
+    replaced because the old inode lives until the mapping is closed.
+    """
+
+    def __init__(self, path):
+        import numpy as np
+        self.path = path
+        with open(path, 'rb') as f:
+            self._stat = os.fstat(f.fileno())
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.buffer[:len(MAGIC)] != MAGIC:
+            self.buffer.close()
+            raise ValueError(f"{path} is not a risk snapshot")
+        length, = struct.unpack_from('<I', self.buffer, len(MAGIC))
+        start = len(MAGIC) + 4
+        self.header = json.loads(self.buffer[start:start + length])
+        self.version = self.header['version']
+        self.disaster_types = self.header['disaster_types']
+        self.regions = self.header['regions']
+        self.arrays = {
+            name: np.frombuffer(self.buffer, dtype=dtype, count=self.header['sections'][name]['count'],
+                                offset=self.header['sections'][name]['offset'])
+            for name, dtype in SECTIONS.items()
+        }
+
+    @property
+    def predictions(self):
+        return self.arrays['predictions']
+
+    @property
+    def zones(self):
+        return self.arrays['zones']
+
+    @property
+    def hospitals(self):
+        return self.arrays['hospitals']
+
+    def is_stale(self):
+        """True when the file on disk was replaced since it was mapped (one stat call)"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return (stat.st_ino, stat.st_mtime_ns) != (self._stat.st_ino, self._stat.st_mtime_ns)
+
+    def zone_polygon(self, i):
+        import numpy as np
+        zone = self.zones[i]
+        start = int(zone['vertex_start'])
+        vertices = self.arrays['zone_vertices'][start:start + int(zone['vertex_count'])]
+        return np.column_stack((vertices['lat'], vertices['lng']))
+
+    def hospital_name(self, i):
+        hospital = self.hospitals[i]
+        start = int(hospital['name_offset'])
+        return self.arrays['strings'][start:start + int(hospital['name_length'])].tobytes().decode('utf-8')
+
+    def prediction_dicts(self, start=0, stop=None):
+        """Predictions[start:stop] in the Prediction.to_dict() shape"""
+        import numpy as np
+        rows = self.predictions[start:stop]
+        return [{
+            'id': row['id'].decode('utf-8'),
+            'disaster_type': self.disaster_types[row['disaster_type']],
+            'severity': int(row['severity']),
+            'confidence': None if np.isnan(row['confidence']) else round(float(row['confidence']) * 100, 1),
+            # float32 coordinates are good to about a metre
+            'lat': round(float(row['lat']), 5),
+            'lng': round(float(row['lng']), 5),
+            'affected_population': int(row['affected_population']),
+            'predicted_time': None if row['onset'] == NO_TIME else
+            (EPOCH + timedelta(seconds=int(row['onset']))).strftime("%Y-%m-%d %H:%M")
+        } for row in rows]
+
+    def close(self):
+        self.arrays = {}
+        self.buffer.close()
+
+
+class SnapshotStore:
+    """
+    Process-wide reader for one snapshot path, remapped when the file changes
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Current reader, writing the snapshot first if none exists yet"""
+        with self._lock:
+            if self._reader is None or self._reader.is_stale():
+                if not os.path.exists(self.path):
+                    write_snapshot(self.path)
+                # The previous mapping is left to the GC: arrays handed out
+                # from it may still be in use by other threads
+                self._reader = SnapshotReader(self.path)
+            return self._reader
+
+
+class SnapshotPublisher:
+    """
+    Background thread that re-materializes the snapshot every `interval`
+    seconds, running `before_publish` (e.g. a zone rebuild) first
+    """
+
+    def __init__(self, app, path, interval=60.0, before_publish=None):
+        self.app = app
+        self.path = path
+        self.interval = interval
+        self.before_publish = before_publish
+        self._stop = threading.Event()
+        self._thread = None
+
+    def publish(self):
+        with self.app.app_context():
+            if self.before_publish:
+                self.before_publish()
+            return write_snapshot(self.path)
+
+    def run(self):
+        logger.info("Risk snapshot publisher started")
+        while not self._stop.is_set():
+            try:
+                self.publish()
+            except Exception as e:
+                logger.error(f"Risk snapshot publish failed: {e}")
+            self._stop.wait(self.interval)
+        logger.info("Risk snapshot publisher stopped")
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name='risk-snapshot', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
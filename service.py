@@ -2,74 +2,237 @@
 LifeGuard AI - Business Logic Services
 """
 
+import base64
+import json
 import random
+import uuid
 from datetime import datetime, timedelta
+from sqlalchemy import Float, and_, bindparam, case, cast, func, insert, select, tuple_, update
 from models import db, Prediction, Resource, Deployment, Hospital
+from geo import bbox_filter
 import logging
 
 logger = logging.getLogger(__name__)
 
+CRITICAL_RESOURCES = ['ambulances', 'medical_teams', 'oxygen_cylinders']
+RELIEF_RESOURCES = ['relief_kits']
+
 def allocate_resources_for_prediction(prediction_id):
     """
     Business logic to automatically allocate resources based on a prediction
     """
-    prediction = Prediction.query.filter_by(prediction_id=prediction_id).first()
-    if not prediction:
+    deployments = allocate_resources_batch([prediction_id])
+    if deployments is None:
         return None
+    ids = [d['deployment_id'] for d in deployments]
+    return Deployment.query.filter(Deployment.deployment_id.in_(ids)).all() if ids else []
 
-    # Simple logic: allocate based on severity and population
-    if prediction.severity >= 4:
-        # High severity - allocate critical resources
-        resources_to_deploy = ['ambulances', 'medical_teams', 'oxygen_cylinders']
-    else:
-        resources_to_deploy = ['relief_kits']
+def allocate_resources_batch(prediction_ids, session=None):
+    """
+    Allocate resources for many predictions in a single transaction.
 
-    deployments = []
-    for res_type in resources_to_deploy:
-        resource = Resource.query.filter_by(resource_type=res_type).first()
-        if resource and resource.available_quantity > 0:
-            qty = min(resource.available_quantity, prediction.affected_population // 1000 + 1)
+    Predictions are served by severity, then affected population. Stock is
+    decremented with conditional UPDATEs (`available >= qty`) so concurrent
+    allocators can never drive a resource negative, and all Deployment rows
+    are bulk-inserted at the end. Returns the inserted deployment rows, or
+    None if none of the predictions exist.
+    """
+    session = session or db.session
+    predictions = session.execute(
+        select(Prediction.prediction_id, Prediction.severity, Prediction.affected_population, Prediction.region)
+        .where(Prediction.prediction_id.in_(list(prediction_ids)))
+    ).all()
+    if not predictions:
+        return None
+    predictions.sort(key=lambda p: (-(p.severity or 0), -(p.affected_population or 0)))
 
-            # Create deployment
-            deployment = Deployment(
-                deployment_id=f"DEP-{random.randint(10000, 99999)}",
-                resource_type=res_type,
-                quantity=qty,
-                target_region=prediction.region if hasattr(prediction, 'region') else "Affected Area",
-                status='dispatched',
-                eta_hours=random.randint(1, 12),
-                priority='critical' if prediction.severity >= 4 else 'high'
-            )
+    rows = []
+    try:
+        for prediction in predictions:
+            # Simple logic: allocate based on severity and population
+            critical = (prediction.severity or 0) >= 4
+            need = (prediction.affected_population or 0) // 1000 + 1
+            for res_type in CRITICAL_RESOURCES if critical else RELIEF_RESOURCES:
+                qty = _reserve(session, res_type, need)
+                if not qty:
+                    continue
+                rows.append({
+                    'deployment_id': f"DEP-{uuid.uuid4().hex}",
+                    'resource_type': res_type,
+                    'quantity': qty,
+                    'target_region': prediction.region or "Affected Area",
+                    'status': 'dispatched',
+                    'eta_hours': random.randint(1, 12),
+                    'priority': 'critical' if critical else 'high',
+                    'timestamp': datetime.utcnow()
+                })
+        if rows:
+            session.execute(insert(Deployment), rows)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return rows
 
-            # Update resource availability
-            resource.available_quantity -= qty
+def _reserve(session, res_type, need):
+    """
+    Atomically take up to `need` units of a resource; returns the amount taken
+    """
+    take = (
+        update(Resource)
+        .where(Resource.resource_type == res_type, Resource.available_quantity >= bindparam('qty'))
+        .values(available_quantity=Resource.available_quantity - bindparam('qty'))
+        .execution_options(synchronize_session=False)
+    )
+    if session.execute(take, {'qty': need}).rowcount == 1:
+        return need
 
-            db.session.add(deployment)
-            deployments.append(deployment)
+    # Not enough for the full amount: take whatever is left, retrying if a
+    # concurrent allocator changes the stock between the read and the update
+    while True:
+        available = session.execute(
+            select(Resource.available_quantity).where(Resource.resource_type == res_type)
+        ).scalar()
+        if not available or available <= 0:
+            return 0
+        qty = min(available, need)
+        if session.execute(take, {'qty': qty}).rowcount == 1:
+            return qty
 
-    db.session.commit()
-    return deployments
+def readiness_score_expr():
+    """
+    SQL expression for a hospital's readiness (0-1): 70% free beds, 30% free ICU
+    """
+    return func.coalesce(case(
+        (and_(Hospital.total_beds > 0, Hospital.total_icu > 0),
+         (cast(Hospital.available_beds, Float) / Hospital.total_beds) * 0.7
+         + (cast(Hospital.available_icu, Float) / Hospital.total_icu) * 0.3),
+        else_=0.0
+    ), 0.0)
+
+def readiness_status(readiness):
+    return 'Ready' if readiness > 0.6 else 'Busy' if readiness > 0.2 else 'Critical'
 
-def get_hospital_readiness(region=None):
+def get_hospital_readiness(region=None, limit=None, offset=0, critical_first=False):
     """
-    Get readiness status of hospitals
+    Get readiness status of hospitals.
+
+    Scores are computed in SQL over plain columns (no ORM objects); with
+    `critical_first` the least ready hospitals come first, so `limit` gives
+    the top-K most critical. `limit`/`offset` paginate the result.
     """
-    query = Hospital.query
+    readiness = readiness_score_expr().label('readiness')
+    query = select(Hospital.name, Hospital.region, Hospital.available_beds, Hospital.available_icu, readiness)
     if region:
-        query = query.filter_by(region=region)
-
-    hospitals = query.all()
-    results = []
-    for h in hospitals:
-        # Readiness score based on available beds and ICU
-        readiness = (h.available_beds / h.total_beds) * 0.7 + (h.available_icu / h.total_icu) * 0.3 if h.total_beds > 0 and h.total_icu > 0 else 0
-
-        results.append({
-            'name': h.name,
-            'region': h.region,
-            'available_beds': h.available_beds,
-            'available_icu': h.available_icu,
-            'readiness_score': round(readiness * 100, 1),
-            'status': 'Ready' if readiness > 0.6 else 'Busy' if readiness > 0.2 else 'Critical'
-        })
-    return results
+        query = query.where(Hospital.region == region)
+    query = query.order_by(readiness, Hospital.id) if critical_first else query.order_by(Hospital.id)
+    if limit is not None:
+        query = query.limit(limit)
+    if offset:
+        query = query.offset(offset)
+
+    return [{
+        'name': name,
+        'region': hospital_region,
+        'available_beds': available_beds,
+        'available_icu': available_icu,
+        'readiness_score': round(score * 100, 1),
+        'status': readiness_status(score)
+    } for name, hospital_region, available_beds, available_icu, score in db.session.execute(query)]
+
+def get_region_readiness():
+    """
+    Per-region readiness rollups computed with a single GROUP BY
+    """
+    readiness = readiness_score_expr()
+    rows = db.session.execute(
+        select(
+            Hospital.region,
+            func.count(Hospital.id),
+            func.avg(readiness),
+            func.min(readiness),
+            func.sum(case((readiness <= 0.2, 1), else_=0)),
+            func.coalesce(func.sum(Hospital.available_beds), 0),
+            func.coalesce(func.sum(Hospital.available_icu), 0),
+            func.coalesce(func.sum(Hospital.ventilators_available), 0)
+        ).group_by(Hospital.region).order_by(Hospital.region)
+    )
+    return [{
+        'region': region,
+        'hospitals': count,
+        'mean_readiness': round(mean * 100, 1),
+        'min_readiness': round(minimum * 100, 1),
+        'critical_hospitals': critical,
+        'free_beds': beds,
+        'free_icu': icu,
+        'free_ventilators': ventilators
+    } for region, count, mean, minimum, critical, beds, icu, ventilators in rows]
+
+# Public field name -> (column, formatter) for /api/predictions projections
+PREDICTION_FIELDS = {
+    'id': (Prediction.prediction_id, None),
+    'disaster_type': (Prediction.disaster_type, None),
+    'severity': (Prediction.severity, None),
+    'lat': (Prediction.latitude, None),
+    'lng': (Prediction.longitude, None),
+    'confidence': (Prediction.confidence, lambda v: round(v * 100, 1)),
+    'radius_km': (Prediction.radius_km, None),
+    'affected_population': (Prediction.affected_population, None),
+    'predicted_time': (Prediction.predicted_onset, lambda v: v.strftime("%Y-%m-%d %H:%M")),
+    'timestamp': (Prediction.timestamp, lambda v: v.isoformat()),
+    'model_version': (Prediction.model_version, None)
+}
+DEFAULT_PREDICTION_FIELDS = ['id', 'disaster_type', 'severity', 'lat', 'lng']
+
+def encode_cursor(timestamp, row_id):
+    raw = json.dumps([timestamp.isoformat(), row_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """
+    Decode a keyset cursor into (timestamp, id); raises ValueError if malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        timestamp, row_id = json.loads(raw)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def iter_predictions(fields=None, disaster_type=None, min_severity=None, bbox=None,
+                     cursor=None, limit=None, chunk_size=1000):
+    """
+    Yield (row_dict, next_cursor) for predictions, newest first.
+
+    Only the columns behind `fields` are selected, results are fetched with
+    yield_per so memory stays flat, and paging uses a keyset cursor on
+    (timestamp, id) rather than OFFSET. Raises ValueError for unknown fields.
+    """
+    fields = fields or DEFAULT_PREDICTION_FIELDS
+    unknown = [f for f in fields if f not in PREDICTION_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    columns = [PREDICTION_FIELDS[f][0] for f in fields]
+    formatters = [PREDICTION_FIELDS[f][1] for f in fields]
+    query = select(Prediction.timestamp, Prediction.id, *columns)
+
+    if disaster_type:
+        query = query.where(Prediction.disaster_type == disaster_type)
+    if min_severity is not None:
+        query = query.where(Prediction.severity >= min_severity)
+    if bbox:
+        query = query.where(bbox_filter(Prediction, *bbox))
+    if cursor:
+        timestamp, row_id = decode_cursor(cursor)
+        query = query.where(tuple_(Prediction.timestamp, Prediction.id) < (timestamp, row_id))
+    query = query.order_by(Prediction.timestamp.desc(), Prediction.id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+
+    result = db.session.execute(query.execution_options(yield_per=chunk_size))
+    for row in result:
+        item = {}
+        for name, fmt, value in zip(fields, formatters, row[2:]):
+            item[name] = fmt(value) if fmt and value is not None else value
+        yield item, encode_cursor(row[0], row[1])
@@ -0,0 +1,270 @@
+"""
+LifeGuard AI - Resource Shortfall Simulation
+Monte Carlo estimate of whether current Resource stock covers the active
+predictions. Each scenario samples which predictions materialize (their
+confidence), their severity (off by one level with probability
+1 - severity_confidence) and their onset, then runs the
+allocate_resources_batch() policy on every scenario at once in NumPy:
+highest severity, then largest population, is served first, and each
+prediction takes what is left up to its need.
+
+Scenario batches are spread over a process pool. The prediction inputs
+are placed in shared memory once per run, so workers receive only a name
+and a seed. A batch allocates several (scenarios x predictions) arrays, so
+its size is derived from a per-worker memory budget rather than fixed.
+
+The API submits runs to SimulationJobs, which works through them on one
+background thread and keeps each job's status and result in a
+dashboard_cache store, so request threads never wait on a simulation.
+"""
+
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from multiprocessing import shared_memory
+from sqlalchemy import func, select
+from models import db, Prediction, Resource
+from service import CRITICAL_RESOURCES, RELIEF_RESOURCES
+from config import get_config
+from dashboard_cache import MemoryStore
+import logging
+
+logger = logging.getLogger(__name__)
+
+RESOURCES = CRITICAL_RESOURCES + RELIEF_RESOURCES
+# Columns of the shared input matrix, one row per prediction
+INPUT_COLUMNS = ('confidence', 'severity', 'severity_confidence', 'need', 'onset_hours', 'region')
+UNKNOWN_REGION = 'Unknown'
+# Peak bytes simulate_batch() allocates per (scenario, prediction) cell:
+# ~56 measured with tracemalloc, plus the int64 index pairs of np.nonzero()
+# when most predictions go unmet
+BYTES_PER_CELL = 72
+
+
+def load_inputs(now=None, horizon_hours=72, onset_sigma_hours=12.0):
+    """
+    (inputs, regions, stock) for predictions whose onset could fall within
+    `horizon_hours` of `now`: a float64 matrix with INPUT_COLUMNS, region
+    names indexed by its region column, and available units per RESOURCES
+    """
+    import numpy as np
+    now = now or datetime.utcnow()
+    onset = func.coalesce(Prediction.predicted_onset, Prediction.timestamp)
+    rows = db.session.execute(
+        select(Prediction.confidence, Prediction.severity, Prediction.severity_confidence,
+               Prediction.affected_population, onset, Prediction.region)
+        .where(onset >= now - timedelta(hours=horizon_hours),
+               onset <= now + timedelta(hours=horizon_hours + 3 * onset_sigma_hours))
+    ).all()
+    available = dict(db.session.execute(
+        select(Resource.resource_type, Resource.available_quantity).where(Resource.resource_type.in_(RESOURCES))
+    ).all())
+    stock = np.array([available.get(r) or 0 for r in RESOURCES], dtype=float)
+
+    regions = sorted({r.region or UNKNOWN_REGION for r in rows})
+    codes = {region: i for i, region in enumerate(regions)}
+    inputs = np.array([(
+        1.0 if r.confidence is None else r.confidence,
+        r.severity or 0,
+        1.0 if r.severity_confidence is None else r.severity_confidence,
+        # Same need as allocate_resources_batch()
+        (r.affected_population or 0) // 1000 + 1,
+        (r[4] - now).total_seconds() / 3600,
+        codes[r.region or UNKNOWN_REGION]
+    ) for r in rows], dtype=float).reshape(-1, len(INPUT_COLUMNS))
+    return inputs, regions, stock
+
+
+def simulate_batch(inputs, stock, n_regions, scenarios, seed, horizon_hours, onset_sigma_hours):
+    """
+    Run `scenarios` scenarios. Returns per-resource shortfall counts,
+    (resource, region) unmet-demand counts, summed unmet units and the
+    total demand of every scenario.
+    """
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    # Presorted by need, the per-scenario service order is a stable sort on
+    # severity alone, which NumPy radix-sorts as int8
+    inputs = inputs[np.argsort(-inputs[:, 3], kind='stable')]
+    confidence, severity, severity_confidence, need, onset, region = inputs.T
+    region = region.astype(np.int64)
+    shape = (scenarios, len(inputs))
+
+    active = rng.random(shape) < confidence
+    if onset_sigma_hours:
+        active &= onset + rng.normal(0.0, onset_sigma_hours, shape) <= horizon_hours
+    else:
+        active &= onset <= horizon_hours
+    shifted = rng.random(shape) >= severity_confidence
+    sampled = np.clip(severity + shifted * rng.choice((-1, 1), shape), 1, 5).astype(np.int8)
+    critical = sampled >= get_config().CRITICAL_SEVERITY_THRESHOLD
+
+    # Service order per scenario: severity, then need (population), descending
+    order = np.argsort(-sampled, axis=1, kind='stable')
+    rows = np.arange(scenarios)[:, None]
+
+    shortfalls = np.zeros(len(RESOURCES), dtype=np.int64)
+    region_unmet = np.zeros((len(RESOURCES), n_regions), dtype=np.int64)
+    unmet_units = np.zeros(len(RESOURCES))
+    demand_totals = np.zeros((len(RESOURCES), scenarios))
+    for r, resource in enumerate(RESOURCES):
+        wants = active & (critical if resource in CRITICAL_RESOURCES else ~critical)
+        demand = np.where(wants, need, 0.0)[rows, order]
+        before = np.cumsum(demand, axis=1) - demand
+        unmet = demand - np.clip(stock[r] - before, 0.0, demand)
+
+        demand_totals[r] = demand.sum(axis=1)
+        shortfalls[r] = np.count_nonzero(demand_totals[r] > stock[r])
+        unmet_units[r] = unmet.sum()
+        # A region is short in a scenario when any of its predictions is
+        s, i = np.nonzero(unmet)
+        short = np.zeros(scenarios * n_regions, dtype=bool)
+        short[s * n_regions + region[order[s, i]]] = True
+        region_unmet[r] = short.reshape(scenarios, n_regions).sum(axis=0)
+    return shortfalls, region_unmet, unmet_units, demand_totals
+
+
+def _simulate_shared(name, shape, stock, n_regions, scenarios, seed, horizon_hours, onset_sigma_hours):
+    import numpy as np
+    block = shared_memory.SharedMemory(name=name)
+    inputs = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+    try:
+        return simulate_batch(inputs, stock, n_regions, scenarios, seed, horizon_hours, onset_sigma_hours)
+    finally:
+        # close() fails while any view of the buffer is alive
+        del inputs
+        block.close()
+
+
+class ShortfallSimulator:
+    """Runs simulations on a process pool that is started on first use and reused"""
+
+    def __init__(self, workers=None, batch_size=None, memory_mb=256):
+        self.workers = workers or multiprocessing.cpu_count()
+        self.batch_size = batch_size
+        self.memory_mb = memory_mb
+        self._pool = None
+
+    def batch_size_for(self, n_predictions):
+        """Scenarios per batch: `batch_size` if set, else as many as fit in `memory_mb`"""
+        if self.batch_size:
+            return self.batch_size
+        return max(1, self.memory_mb * 1024 * 1024 // (BYTES_PER_CELL * max(n_predictions, 1)))
+
+    def _executor(self):
+        if self._pool is None:
+            # Spawned rather than forked: the web process runs other threads
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+        return self._pool
+
+    def run(self, inputs, regions, stock, scenarios=10000, horizon_hours=72, onset_sigma_hours=12.0, seed=None):
+        """
+        Shortfall probability, expected unmet units and demand percentiles
+        per resource, and the probability that each region's demand for a
+        resource goes unmet. Results for a seed do not depend on `workers`.
+        """
+        import numpy as np
+        start = time.perf_counter()
+        batch_size = self.batch_size_for(len(inputs))
+        sizes = [min(batch_size, scenarios - i) for i in range(0, scenarios, batch_size)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        args = (stock, len(regions))
+        options = (horizon_hours, onset_sigma_hours)
+
+        if self.workers == 1 or len(sizes) == 1 or not len(inputs):
+            results = [simulate_batch(inputs, *args, n, s, *options) for n, s in zip(sizes, seeds)]
+        else:
+            block = shared_memory.SharedMemory(create=True, size=inputs.nbytes)
+            try:
+                np.ndarray(inputs.shape, dtype=np.float64, buffer=block.buf)[:] = inputs
+                futures = [self._executor().submit(_simulate_shared, block.name, inputs.shape, *args, n, s, *options)
+                           for n, s in zip(sizes, seeds)]
+                results = [f.result() for f in futures]
+            finally:
+                block.close()
+                block.unlink()
+
+        shortfalls = sum(r[0] for r in results)
+        region_unmet = sum(r[1] for r in results)
+        unmet_units = sum(r[2] for r in results)
+        demand = np.concatenate([r[3] for r in results], axis=1)
+        p50, p95 = np.percentile(demand, [50, 95], axis=1)
+        elapsed = time.perf_counter() - start
+        logger.info(f"Simulated {scenarios} scenarios over {len(inputs)} predictions in {elapsed:.2f}s")
+        return {
+            'scenarios': scenarios,
+            'predictions': len(inputs),
+            'horizon_hours': horizon_hours,
+            'seconds': round(elapsed, 3),
+            'resources': {resource: {
+                'available': int(stock[r]),
+                'shortfall_probability': round(shortfalls[r] / scenarios, 4),
+                'expected_unmet': round(unmet_units[r] / scenarios, 1),
+                'demand_p50': float(p50[r]),
+                'demand_p95': float(p95[r])
+            } for r, resource in enumerate(RESOURCES)},
+            'regions': {region: {resource: round(region_unmet[r, g] / scenarios, 4)
+                                 for r, resource in enumerate(RESOURCES)}
+                        for g, region in enumerate(regions)}
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+class SimulationJobs:
+    """
+    Runs ShortfallSimulator.run() off the request thread, one job at a time,
+    so concurrent requests queue instead of oversubscribing the process pool.
+    Job records live in `store` for `ttl` seconds; a FileStore lets any web
+    process on the host answer for a job another one started.
+    """
+
+    def __init__(self, simulator, store=None, ttl=3600):
+        self.simulator = simulator
+        self.store = store or MemoryStore()
+        self.ttl = ttl
+        self._runner = None
+        self._lock = threading.Lock()
+
+    def submit(self, inputs, regions, stock, *args):
+        """Queue a run with ShortfallSimulator.run()'s arguments; returns the job id"""
+        job_id = uuid.uuid4().hex
+        self._set(job_id, {'status': 'pending'})
+        with self._lock:
+            if self._runner is None:
+                self._runner = ThreadPoolExecutor(max_workers=1, thread_name_prefix='simulation')
+            self._runner.submit(self._run, job_id, inputs, regions, stock, *args)
+        return job_id
+
+    def get(self, job_id):
+        """The job's record ({'status', and 'result' or 'error'}), or None if unknown or expired"""
+        return self.store.get(self._key(job_id))
+
+    def _run(self, job_id, *args):
+        self._set(job_id, {'status': 'running'})
+        try:
+            result = self.simulator.run(*args)
+        except Exception as e:
+            logger.exception(f"Simulation {job_id} failed")
+            self._set(job_id, {'status': 'failed', 'error': str(e)})
+        else:
+            self._set(job_id, {'status': 'done', 'result': result})
+
+    def _set(self, job_id, record):
+        self.store.set(self._key(job_id), dict(record, job_id=job_id), self.ttl)
+
+    @staticmethod
+    def _key(job_id):
+        return f"simulation:{job_id}"
+
+    def shutdown(self):
+        with self._lock:
+            runner, self._runner = self._runner, None
+        if runner is not None:
+            runner.shutdown()
@@ -3,56 +3,134 @@ LifeGuard AI - SMS Alert Service
 Low-bandwidth communication using Twilio
 """
 
+import heapq
+import itertools
 import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
-from twilio.rest import Client
-from twilio.base.exceptions import TwilioRestException
 from config import get_config
-from translations import get_sms_template
+from translations import get_sms_template, render_bulk
+from metrics import registry, LATENCY_BUCKETS
 import logging
 
 logger = logging.getLogger(__name__)
 
+SMS_LATENCY = registry.histogram(
+    'lifeguard_sms_send_duration_seconds', 'SMS send latency including retries', ('status',), LATENCY_BUCKETS)
+SMS_MESSAGES = registry.counter('lifeguard_sms_messages_total', 'SMS send outcomes', ('status',))
+SMS_RETRIES = registry.counter('lifeguard_sms_retries_total', 'Twilio sends retried after an error')
+
+_END = object()
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces calls to at most `rate` per second"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Block until the caller may send the next message
+        """
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
 class SMSService:
     """SMS service for sending disaster alerts"""
 
-    def __init__(self):
+    def __init__(self, client=None, max_attempts=None, backoff_seconds=None):
         config = get_config()
         self.account_sid = config.TWILIO_ACCOUNT_SID
         self.auth_token = config.TWILIO_AUTH_TOKEN
         self.from_number = config.TWILIO_PHONE_NUMBER
+        self.max_attempts = max_attempts if max_attempts is not None else config.SMS_MAX_ATTEMPTS
+        self.backoff_seconds = backoff_seconds if backoff_seconds is not None else config.SMS_RETRY_BACKOFF_SECONDS
+        self.bulk_workers = config.SMS_BULK_WORKERS
+        self.rate_limit = config.SMS_RATE_LIMIT_PER_SECOND
 
-        # Initialize Twilio client if credentials are available
-        if self.account_sid and self.auth_token:
-            try:
-                self.client = Client(self.account_sid, self.auth_token)
-                self.enabled = True
-                logger.info("SMS Service initialized with Twilio")
-            except Exception as e:
-                logger.error(f"Failed to initialize Twilio client: {e}")
-                self.enabled = False
-        else:
-            self.enabled = False
+        # Use an injected client (e.g. a local fake) when provided; otherwise
+        # the Twilio client is built on the first send
+        self._client = client
+        self._client_lock = threading.Lock()
+        self.enabled = client is not None or bool(self.account_sid and self.auth_token)
+        if not self.enabled:
             logger.warning("SMS Service disabled - Twilio credentials not configured")
 
-    def send_sms(self, to_number, message, language='en'):
+    @property
+    def client(self):
+        if self._client is None and self.enabled:
+            with self._client_lock:
+                if self._client is None and self.enabled:
+                    try:
+                        from twilio.rest import Client
+                        self._client = Client(self.account_sid, self.auth_token)
+                        logger.info("SMS Service initialized with Twilio")
+                    except Exception as e:
+                        logger.error(f"Failed to initialize Twilio client: {e}")
+                        self.enabled = False
+        return self._client
+
+    def send_sms(self, to_number, message, language='en', limiter=None):
         """
-        Send SMS to a phone number
+        Send SMS to a phone number, retrying Twilio errors with exponential
+        backoff. `limiter` (a RateLimiter) is acquired before every attempt.
         """
-        if not self.enabled:
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            attempt += 1
+            result, delay = self._attempt(to_number, message, attempt, limiter)
+            if delay is None:
+                break
+            if delay > 0:
+                time.sleep(delay)
+        self._record(result, time.perf_counter() - start)
+        return result
+
+    def _record(self, result, seconds):
+        SMS_LATENCY.observe(seconds, result['status'])
+        SMS_MESSAGES.inc(result['status'])
+        if result.get('attempts', 1) > 1:
+            SMS_RETRIES.inc(amount=result['attempts'] - 1)
+
+    def _attempt(self, to_number, message, attempt, limiter=None):
+        """
+        Make one send attempt. Returns (result, None) when it is final, or
+        (result, delay) when a Twilio error should be retried after `delay`
+        seconds.
+        """
+        client = self.client
+        if client is None:
             logger.info(f"[MOCK SMS] To: {to_number}, Message: {message}")
             return {
                 'success': True,
                 'status': 'mock_sent',
                 'message': 'SMS service not configured, message logged only',
-                'sid': f'MOCK-{datetime.now().timestamp()}'
-            }
+                'sid': f'MOCK-{datetime.now().timestamp()}',
+                'to': to_number
+            }, None
 
-        try:
-            if not to_number.startswith('+'):
-                to_number = '+91' + to_number  # Default to India
+        from twilio.base.exceptions import TwilioRestException
+        if not to_number.startswith('+'):
+            to_number = '+91' + to_number  # Default to India
 
-            message_instance = self.client.messages.create(
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            message_instance = client.messages.create(
                 body=message,
                 from_=self.from_number,
                 to=to_number
@@ -65,25 +143,97 @@ class SMSService:
                 'status': 'sent',
                 'sid': message_instance.sid,
                 'to': to_number,
-                'message': message
-            }
+                'message': message,
+                'attempts': attempt
+            }, None
 
         except TwilioRestException as e:
-            logger.error(f"Twilio error sending SMS to {to_number}: {e}")
-            return {
+            result = {
                 'success': False,
                 'status': 'failed',
                 'error': str(e),
-                'to': to_number
+                'to': to_number,
+                'attempts': attempt
             }
+            if attempt < self.max_attempts:
+                delay = self.backoff_seconds * (2 ** (attempt - 1))
+                logger.warning(f"Twilio error sending SMS to {to_number} (attempt {attempt}), retrying in {delay}s: {e}")
+                return result, delay
+            logger.error(f"Twilio error sending SMS to {to_number}: {e}")
+            return result, None
         except Exception as e:
             logger.error(f"Error sending SMS to {to_number}: {e}")
             return {
                 'success': False,
                 'status': 'error',
                 'error': str(e),
-                'to': to_number
-            }
+                'to': to_number,
+                'attempts': attempt
+            }, None
+
+    def send_bulk(self, recipients, message=None, language='en', workers=None, rate_limit=None):
+        """
+        Send SMS to many recipients concurrently, yielding each result as it completes.
+
+        `recipients` is an iterable of phone numbers (sent `message`) or of
+        (phone_number, message[, ref]) tuples; `ref` is echoed back in the
+        result so callers can match it to their own records. The iterable is
+        consumed lazily and at most 2 * workers sends are in flight, so very
+        large recipient lists never materialize in memory.
+
+        The rate limit applies to every attempt, retries included. A failed
+        attempt is rescheduled after its backoff rather than sleeping on a
+        pool thread.
+        """
+        workers = workers or self.bulk_workers
+        limiter = RateLimiter(self.rate_limit if rate_limit is None else rate_limit)
+        # (due, sequence, send arguments) of attempts waiting out their backoff
+        retries = []
+        sequence = itertools.count()
+
+        def deliver(to_number, body, ref, attempt, started):
+            result, delay = self._attempt(to_number, body, attempt, limiter)
+            return result, delay, (to_number, body, ref, attempt, started)
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sms-bulk') as executor:
+            pending = set()
+            recipients = iter(recipients)
+            exhausted = False
+            while True:
+                now = time.monotonic()
+                while retries and retries[0][0] <= now:
+                    pending.add(executor.submit(deliver, *heapq.heappop(retries)[2]))
+                while not exhausted and len(pending) < workers * 2:
+                    recipient = next(recipients, _END)
+                    if recipient is _END:
+                        exhausted = True
+                        break
+                    ref = None
+                    if isinstance(recipient, tuple):
+                        to_number, body = recipient[0], recipient[1]
+                        if len(recipient) > 2:
+                            ref = recipient[2]
+                    else:
+                        to_number, body = recipient, message
+                    pending.add(executor.submit(deliver, to_number, body, ref, 1, time.perf_counter()))
+
+                if not pending:
+                    if not retries:
+                        break
+                    time.sleep(max(retries[0][0] - time.monotonic(), 0.0))
+                    continue
+                timeout = max(retries[0][0] - time.monotonic(), 0.0) if retries else None
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result, delay, (to_number, body, ref, attempt, started) = future.result()
+                    if delay is not None:
+                        heapq.heappush(retries, (time.monotonic() + delay, next(sequence),
+                                                 (result['to'], body, ref, attempt + 1, started)))
+                        continue
+                    self._record(result, time.perf_counter() - started)
+                    if ref is not None:
+                        result['ref'] = ref
+                    yield result
 
     def send_disaster_alert(self, to_number, disaster_type, region, severity, language='en'):
         """
@@ -98,6 +248,15 @@ class SMSService:
 
         return self.send_sms(to_number, message, language)
 
+    def send_disaster_alert_bulk(self, recipients, disaster_type, region, severity, workers=None, rate_limit=None):
+        """
+        Send a disaster alert to many (phone_number, language) recipients,
+        rendering each language variant once. Yields results as they complete.
+        """
+        variants = render_bulk(disaster_type, recipients, region=region, severity=severity)
+        messages = ((number, v['message']) for v in variants for number in v['recipients'])
+        return self.send_bulk(messages, workers=workers, rate_limit=rate_limit)
+
     def send_blood_donor_alert(self, to_number, blood_type, region, disaster, contact_phone, language='en'):
         """
         Send blood donor activation alert
@@ -0,0 +1,144 @@
+"""
+LifeGuard AI - Recipient Targeting
+Selects alert recipients in chunks and enforces the weekly notification cap
+with one set-based UPDATE per chunk.
+
+Weekly counters roll over lazily: `notification_count_this_week` only counts
+while `notification_week` equals the current week, so no job ever has to
+reset the whole users table.
+"""
+
+import json
+from datetime import date, datetime
+from sqlalchemy import case, or_, select, update
+from models import db, User, RiskZone
+from config import get_config
+from geo import bbox_filter, points_in_polygon
+
+# Weeks are counted from Monday 1970-01-05 so they start on Mondays
+WEEK_EPOCH = date(1970, 1, 5)
+
+
+def week_number(when=None):
+    when = when or datetime.utcnow()
+    return (when.date() - WEEK_EPOCH).days // 7
+
+
+def _eligible(week, cap):
+    """Users still under `cap` notifications in `week`"""
+    return or_(
+        User.notification_week.is_(None),
+        User.notification_week != week,
+        User.notification_count_this_week.is_(None),
+        User.notification_count_this_week < cap
+    )
+
+
+def _claim(where, week, cap, now):
+    """
+    Atomically count one notification for every still-eligible user matching
+    `where` and return (id, user_id, phone_number, language_preference)
+    """
+    return db.session.execute(
+        update(User)
+        .where(where, _eligible(week, cap))
+        .values(
+            notification_count_this_week=case(
+                (User.notification_week == week, User.notification_count_this_week + 1),
+                else_=1
+            ),
+            notification_week=week,
+            last_notification=now
+        )
+        .returning(User.id, User.user_id, User.phone_number, User.language_preference)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+
+def _as_recipients(rows):
+    return [{'user_id': r.user_id, 'phone_number': r.phone_number, 'language': r.language_preference or 'en'}
+            for r in sorted(rows, key=lambda r: r.id)]
+
+
+def select_recipients(region=None, zone_id=None, blood_types=None, role=None, cap=None, chunk_size=10000):
+    """
+    Yield chunks of recipient dicts ({'user_id', 'phone_number', 'language'})
+    for a region or risk zone, optionally filtered by blood type and role.
+
+    Each chunk is claimed with a single UPDATE ... RETURNING that also
+    increments the weekly counters, then committed, so users already at
+    `cap` (default DONOR_WEEKLY_NOTIFICATION_CAP) are skipped even when
+    several campaigns run concurrently.
+    """
+    if region is None and zone_id is None:
+        raise ValueError("Either region or zone_id is required")
+    cap = cap if cap is not None else get_config().DONOR_WEEKLY_NOTIFICATION_CAP
+    week = week_number()
+
+    filters = []
+    if region is not None:
+        filters.append(User.region == region)
+    if blood_types:
+        filters.append(User.blood_type.in_(list(blood_types)))
+    if role:
+        filters.append(User.role == role)
+
+    if zone_id is not None:
+        yield from _select_zone_recipients(zone_id, filters, week, cap, chunk_size)
+        return
+
+    last_id = 0
+    while True:
+        ids = db.session.execute(
+            select(User.id)
+            .where(*filters, User.id > last_id, _eligible(week, cap))
+            .order_by(User.id).limit(chunk_size)
+        ).scalars().all()
+        if not ids:
+            return
+        last_id = ids[-1]
+        rows = _claim(User.id.in_(ids), week, cap, datetime.utcnow())
+        db.session.commit()
+        if rows:
+            yield _as_recipients(rows)
+
+
+def _select_zone_recipients(zone_id, filters, week, cap, chunk_size):
+    import numpy as np
+    zone = db.session.execute(
+        select(RiskZone.coordinates_json, RiskZone.min_lat, RiskZone.min_lng, RiskZone.max_lat, RiskZone.max_lng)
+        .where(RiskZone.zone_id == zone_id)
+    ).first()
+    if zone is None or not zone.coordinates_json:
+        return
+    polygon = json.loads(zone.coordinates_json)
+
+    last_id = 0
+    while True:
+        candidates = db.session.execute(
+            select(User.id, User.latitude, User.longitude)
+            .where(*filters, bbox_filter(User, zone.min_lat, zone.min_lng, zone.max_lat, zone.max_lng),
+                   User.id > last_id, _eligible(week, cap))
+            .order_by(User.id).limit(chunk_size)
+        ).all()
+        if not candidates:
+            return
+        last_id = candidates[-1].id
+        lats = np.fromiter((c.latitude for c in candidates), dtype=float, count=len(candidates))
+        lngs = np.fromiter((c.longitude for c in candidates), dtype=float, count=len(candidates))
+        inside = [candidates[i].id for i in np.flatnonzero(points_in_polygon(lats, lngs, polygon))]
+        if not inside:
+            continue
+        rows = _claim(User.id.in_(inside), week, cap, datetime.utcnow())
+        db.session.commit()
+        if rows:
+            yield _as_recipients(rows)
+
+
+def weekly_notification_count(user):
+    """
+    Notifications a user has received this week, accounting for lazy rollover
+    """
+    if user.notification_week != week_number():
+        return 0
+    return user.notification_count_this_week or 0
@@ -1,14 +1,56 @@
-
-import unittest
+import gzip
+import io
 import json
-from app import app, db
-from models import Resource, Prediction
+import os
+import signal
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+import numpy as np
+from sqlalchemy import create_engine, event, func, select, update
+from sqlalchemy.orm import sessionmaker
+from twilio.base.exceptions import TwilioRestException
+
+# Point the app at a throwaway database before it is imported
+os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+os.environ['RISK_SNAPSHOT_PATH'] = os.path.join(tempfile.mkdtemp(prefix='lifeguard-test-'), 'risk_snapshot.bin')
+
+from app import app, db, dashboard_cache, map_cache, serve_snapshot
+from alert_outbox import AlertOutbox
+from archive import archive_expired, archive_metadata, daily_summary
+from benchmarks.fake_twilio import FakeTwilioClient
+from benchmarks.fake_weather import FakeWeatherServer
+from config import get_config
+from dashboard_cache import SnapshotCache, MemoryStore, FileStore
+from database import configure_sqlite, replica_reads, REPLICA_BIND
+from deployments import DeploymentScheduler
+from forecasting import refresh_blood_forecasts, compute_demands, get_blood_shortages
+from geo import cells_for_bbox, hospitals_near, predictions_in_bbox, users_in_zone
+from inference import ModelCache, run_inference, train_baseline_models, national_grid, feature_matrix, FEATURES
+from ingest import ingest_predictions
+from metrics import REQUEST_LATENCY, REQUEST_QUERIES, N_PLUS_ONE, StackSampler
+from models import (Resource, Prediction, Alert, Hospital, User, RiskZone, Deployment, DeploymentInFlight,
+                    BloodForecast, DailyRollup)
+from realtime import DeltaBroadcaster
+from risk_snapshot import write_snapshot, SnapshotReader
+from service import get_hospital_readiness, get_region_readiness, allocate_resources_batch, allocate_resources_for_prediction
+from simulation import ShortfallSimulator, SimulationJobs, load_inputs
+from sms_service import SMSService, SMS_MESSAGES
+from targeting import select_recipients, week_number
+from tiles import build_tile, tile_bounds, valid_tile
+from translations import render_bulk, estimate_dispatch, sms_segments
+from weather import WeatherFetcher, STALE_TTLS, parse_conditions
+from zones import cluster_circles, union_outline, rebuild_risk_zones
 
 class LifeGuardTestCase(unittest.TestCase):
     def setUp(self):
         app.config['TESTING'] = True
         app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
         self.client = app.test_client()
+        dashboard_cache.invalidate()
         with app.app_context():
             db.create_all()
 
@@ -25,6 +67,31 @@ class LifeGuardTestCase(unittest.TestCase):
         self.assertIn('resources', data)
         self.assertIn('statistics', data)
 
+    def test_dashboard_etag_not_modified(self):
+        """Test that an unchanged dashboard snapshot is answered with 304"""
+        first = self.client.get('/api/dashboard')
+        etag = first.headers['ETag']
+        second = self.client.get('/api/dashboard', headers={'If-None-Match': etag})
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.data, b'')
+
+    def test_dashboard_cache_invalidated_on_commit(self):
+        """Test that committed writes to dashboard models refresh the snapshot"""
+        etag = self.client.get('/api/dashboard').headers['ETag']
+        with app.app_context():
+            db.session.add(Resource(resource_type="ambulances", total_quantity=10, available_quantity=10))
+            db.session.commit()
+        response = self.client.get('/api/dashboard', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ambulances', json.loads(response.data)['resources'])
+
+        etag = response.headers['ETag']
+        with app.app_context():
+            Resource.query.update({'available_quantity': 5})
+            db.session.commit()
+        response = self.client.get('/api/dashboard', headers={'If-None-Match': etag})
+        self.assertEqual(json.loads(response.data)['resources']['ambulances']['available'], 5)
+
     def test_database_persistence(self):
         """Test that we can add and retrieve data from DB"""
         with app.app_context():
@@ -36,5 +103,1471 @@ class LifeGuardTestCase(unittest.TestCase):
             self.assertIsNotNone(retrieved)
             self.assertEqual(retrieved.available_quantity, 80)
 
+    def test_init_db_command(self):
+        """Test that init-db creates and seeds the schema once"""
+        with app.app_context():
+            db.drop_all()
+        runner = app.test_cli_runner()
+        self.assertEqual(runner.invoke(args=['init-db']).exit_code, 0)
+        self.assertEqual(runner.invoke(args=['init-db']).exit_code, 0)
+        with app.app_context():
+            self.assertEqual(Resource.query.filter_by(resource_type='ambulances').count(), 1)
+
+    def test_run_workers_command(self):
+        """Test that run-workers starts the background workers and stops them on SIGTERM"""
+        previous = signal.getsignal(signal.SIGTERM)
+        try:
+            with mock.patch('app.start_workers', side_effect=lambda: os.kill(os.getpid(), signal.SIGTERM)) as start, \
+                    mock.patch('app.stop_workers') as stop:
+                result = app.test_cli_runner().invoke(args=['run-workers'])
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+        self.assertEqual(result.exit_code, 0)
+        start.assert_called_once()
+        stop.assert_called_once()
+
+class SMSServiceTestCase(unittest.TestCase):
+    def test_twilio_client_created_on_first_use(self):
+        """Test that configured credentials build the Twilio client lazily, once"""
+        with mock.patch.object(get_config(), 'TWILIO_ACCOUNT_SID', 'AC' + '0' * 32), \
+                mock.patch.object(get_config(), 'TWILIO_AUTH_TOKEN', 'token'):
+            service = SMSService()
+        self.assertTrue(service.enabled)
+        self.assertIsNone(service._client)
+        client = service.client
+        self.assertEqual(type(client).__module__, 'twilio.rest')
+        self.assertIs(service.client, client)
+
+    def test_retries_twilio_errors_up_to_max_attempts(self):
+        """Test that failed sends are retried and give up after 3 attempts"""
+        client = FakeTwilioClient(failure_rate=1.0)
+        service = SMSService(client=client, backoff_seconds=0)
+        result = service.send_sms('9800000001', 'test')
+        self.assertFalse(result['success'])
+        self.assertEqual(result['attempts'], 3)
+        self.assertEqual(client.messages.calls, 3)
+
+    def test_bulk_alert_renders_each_language_once(self):
+        """Test that recipients are grouped by language with encoding and segment counts"""
+        recipients = [('9800000001', 'en'), ('9800000002', 'hi'), ('9800000003', 'en')]
+        variants = {v['language']: v for v in render_bulk('cyclone', recipients, region='Kerala', severity=4)}
+        self.assertEqual(variants['en']['recipients'], ['9800000001', '9800000003'])
+        self.assertEqual((variants['en']['encoding'], variants['en']['segments']), ('GSM-7', 1))
+        self.assertEqual((variants['hi']['encoding'], variants['hi']['segments']), ('UCS-2', 2))
+        self.assertEqual(estimate_dispatch(variants.values())['segments'], 4)
+        self.assertEqual(sms_segments('x' * 161), 2)
+
+        client = FakeTwilioClient()
+        service = SMSService(client=client, backoff_seconds=0)
+        results = list(service.send_disaster_alert_bulk(recipients, 'cyclone', 'Kerala', 4, rate_limit=0))
+        self.assertEqual(len(results), 3)
+        self.assertEqual({m.body for m in client.messages.sent}, {variants['en']['message'], variants['hi']['message']})
+
+    def test_send_bulk_streams_every_result(self):
+        """Test that bulk dispatch yields one result per recipient"""
+        client = FakeTwilioClient(latency=0.001)
+        service = SMSService(client=client, backoff_seconds=0)
+        recipients = (f"98{i:08d}" for i in range(200))
+        results = list(service.send_bulk(recipients, 'alert', workers=8, rate_limit=0))
+        self.assertEqual(len(results), 200)
+        self.assertTrue(all(r['success'] for r in results))
+        self.assertEqual(len({r['to'] for r in results}), 200)
+
+    def test_bulk_retries_acquire_the_limiter_and_free_the_worker(self):
+        """Test that every attempt is rate limited and a backoff does not hold a pool thread"""
+        client = FakeTwilioClient()
+        create = client.messages.create
+
+        def flaky(body, from_, to):
+            if to.endswith('0001'):
+                raise TwilioRestException(503, '/Messages.json', msg='unavailable', method='POST')
+            return create(body, from_, to)
+        client.messages.create = flaky
+        service = SMSService(client=client, backoff_seconds=0.2)
+        limiter = mock.Mock()
+        with mock.patch('sms_service.RateLimiter', return_value=limiter):
+            results = list(service.send_bulk(['9800000001', '9800000002', '9800000003'], 'alert', workers=1))
+        self.assertEqual([r['to'][-4:] for r in results], ['0002', '0003', '0001'])
+        self.assertEqual((results[-1]['status'], results[-1]['attempts']), ('failed', 3))
+        self.assertEqual(limiter.acquire.call_count, 5)
+
+class AlertOutboxTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ctx = app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.client = FakeTwilioClient()
+        self.sms = SMSService(client=self.client, backoff_seconds=0)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_enqueue_and_drain(self):
+        """Test that enqueued alerts are sent once and marked SENT"""
+        outbox = AlertOutbox(app, self.sms, batch_size=2, workers=2)
+        outbox.enqueue([{'phone_number': f'98000000{i:02d}', 'message': 'evacuate'} for i in range(5)])
+        self.assertEqual(outbox.stats()['pending'], 5)
+
+        self.assertEqual(outbox.drain(), 5)
+        stats = outbox.stats()
+        self.assertEqual(stats['sent'], 5)
+        self.assertEqual(stats['pending'], 0)
+        self.assertEqual(self.client.messages.calls, 5)
+        self.assertTrue(all(a.provider_sid for a in Alert.query.all()))
+
+    def test_expired_lease_is_reclaimed(self):
+        """Test that alerts claimed by a crashed worker are picked up after the lease expires"""
+        crashed = AlertOutbox(app, self.sms, lease_seconds=3600)
+        crashed.enqueue([{'phone_number': '9800000001', 'message': 'evacuate'}])
+        _, rows = crashed.claim_batch()
+        self.assertEqual(len(rows), 1)
+
+        # Lease still held: nothing to claim
+        self.assertEqual(AlertOutbox(app, self.sms).process_batch(), 0)
+
+        Alert.query.update({'lease_expires_at': Alert.lease_expires_at - timedelta(hours=2)})
+        db.session.commit()
+        self.assertEqual(AlertOutbox(app, self.sms).process_batch(), 1)
+        alert = Alert.query.one()
+        self.assertEqual(alert.status, 'SENT')
+        self.assertEqual(alert.attempts, 2)
+
+    def test_exhausted_alerts_fail_instead_of_being_reclaimed(self):
+        """Test that a row whose lease keeps expiring is claimed max_attempts times, then FAILED"""
+        crashed = AlertOutbox(app, self.sms, max_attempts=2)
+        crashed.enqueue([{'phone_number': '9800000001', 'message': 'evacuate'}])
+        for _ in range(2):
+            self.assertEqual(len(crashed.claim_batch()[1]), 1)
+            Alert.query.update({'lease_expires_at': datetime.utcnow() - timedelta(seconds=1)})
+            db.session.commit()
+        self.assertEqual(crashed.claim_batch()[1], [])
+        alert = Alert.query.one()
+        self.assertEqual((alert.status, alert.attempts, alert.lease_owner), ('FAILED', 2, None))
+        self.assertEqual(self.client.messages.calls, 0)
+
+    def test_lease_is_renewed_per_chunk(self):
+        """Test that a batch still being sent keeps its lease after each flushed chunk"""
+        outbox = AlertOutbox(app, self.sms, lease_seconds=600)
+        outbox.enqueue([{'phone_number': f'98000000{i:02d}', 'message': 'evacuate'} for i in range(3)])
+        token, rows = outbox.claim_batch()
+        Alert.query.update({'lease_expires_at': datetime.utcnow() - timedelta(seconds=1)})
+        db.session.commit()
+        outbox._record_results(token, [{'ref': rows[0].id, 'success': True, 'sid': 'SM1'}])
+        self.assertEqual(AlertOutbox(app, self.sms).claim_batch()[1], [])
+        remaining = Alert.query.filter_by(status='SENDING').all()
+        self.assertEqual(len(remaining), 2)
+        self.assertTrue(all(a.lease_expires_at > datetime.utcnow() for a in remaining))
+
+class DeltaBroadcasterTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ctx = app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.events = []
+        self.broadcaster = DeltaBroadcaster(lambda name, data: self.events.append((name, data)))
+
+    def tearDown(self):
+        self.broadcaster.close()
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_commit_emits_single_delta(self):
+        """Test that one commit produces one delta with every changed row"""
+        db.session.add(Prediction(prediction_id='PRED-1', disaster_type='flood', confidence=0.9,
+                                  latitude=10.0, longitude=76.0, severity=4,
+                                  predicted_onset=datetime.utcnow()))
+        db.session.add(Resource(resource_type='ambulances', total_quantity=10, available_quantity=7))
+        db.session.commit()
+
+        self.assertEqual(len(self.events), 1)
+        name, delta = self.events[0]
+        self.assertEqual(name, 'delta')
+        self.assertEqual([p['id'] for p in delta['predictions']['upsert']], ['PRED-1'])
+        self.assertEqual(delta['resources'], {'ambulances': {'total': 10, 'available': 7}})
+
+        db.session.delete(Prediction.query.one())
+        db.session.commit()
+        self.assertEqual(self.events[-1][1]['predictions']['removed'], ['PRED-1'])
+
+    def test_bulk_update_requests_resync(self):
+        """Test that bulk statements make clients refetch the snapshot"""
+        Resource.query.update({'available_quantity': 0})
+        db.session.commit()
+        self.assertEqual(self.events, [('resync', {})])
+
+class GeoQueryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ctx = app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.client = app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_hospitals_near_prediction(self):
+        """Test radius search returns only hospitals in range, nearest first"""
+        db.session.add(Prediction(prediction_id='PRED-1', latitude=19.0, longitude=72.8))
+        db.session.add_all([
+            Hospital(name='Near', latitude=19.05, longitude=72.85),
+            Hospital(name='Nearer', latitude=19.01, longitude=72.81),
+            Hospital(name='Far', latitude=13.06, longitude=80.25)
+        ])
+        db.session.commit()
+
+        response = self.client.get('/api/predictions/PRED-1/hospitals?radius_km=50')
+        self.assertEqual([h['name'] for h in json.loads(response.data)], ['Nearer', 'Near'])
+        self.assertEqual(self.client.get('/api/predictions/NOPE/hospitals').status_code, 404)
+        for radius in ('nan', 'inf', '0', '-5', 'x'):
+            response = self.client.get(f'/api/predictions/PRED-1/hospitals?radius_km={radius}')
+            self.assertEqual(response.status_code, 400, radius)
+
+    def test_bbox_and_polygon_queries(self):
+        """Test viewport and risk-zone polygon membership"""
+        db.session.add_all([
+            Prediction(prediction_id='IN', latitude=20.2, longitude=78.2),
+            Prediction(prediction_id='OUT', latitude=25.0, longitude=78.2),
+            User(user_id='u1', phone_number='1', latitude=20.3, longitude=78.3),
+            User(user_id='u2', phone_number='2', latitude=20.8, longitude=78.8),
+            RiskZone(zone_id='Z1', coordinates_json=json.dumps([[20, 78], [21, 78], [20, 79]]))
+        ])
+        db.session.commit()
+
+        self.assertEqual(predictions_in_bbox(20.0, 78.0, 21.0, 79.0), ['IN'])
+        self.assertEqual(list(users_in_zone('Z1')), [('u1', '1')])
+
+    def test_huge_and_invalid_boxes(self):
+        """Test that oversized boxes fall back before building cells and non-finite input is rejected"""
+        db.session.add(Prediction(prediction_id='IN', latitude=20.2, longitude=78.2))
+        db.session.commit()
+        self.assertIsNone(cells_for_bbox(-2000.0, -2000.0, 2000.0, 2000.0, max_cells=900))
+        # Clamped to the globe: 361 rows of 720 columns
+        self.assertEqual(len(cells_for_bbox(-2000.0, -2000.0, 2000.0, 2000.0)), 361 * 720)
+        self.assertEqual(cells_for_bbox(21.0, 79.0, 20.0, 78.0), [])
+        self.assertEqual(predictions_in_bbox(-1e9, -1e9, 1e9, 1e9), ['IN'])
+        with self.assertRaises(ValueError):
+            cells_for_bbox(float('nan'), 0.0, 1.0, 1.0)
+        for radius in (float('nan'), float('inf'), 0.0, -5.0):
+            with self.assertRaises(ValueError):
+                hospitals_near(20.0, 78.0, radius)
+
+class HospitalReadinessTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ctx = app.app_context()
+        self.ctx.push()
+        db.create_all()
+        db.session.add_all([
+            Hospital(name='A', region='Kerala', total_beds=100, available_beds=90, total_icu=10, available_icu=9, ventilators_available=3),
+            Hospital(name='B', region='Kerala', total_beds=100, available_beds=10, total_icu=10, available_icu=1, ventilators_available=1),
+            Hospital(name='C', region='Gujarat', total_beds=100, available_beds=50, total_icu=0, available_icu=0, ventilators_available=2)
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_scores_and_ordering(self):
+        """Test readiness scores, status bands, region filter and top-K critical"""
+        results = get_hospital_readiness()
+        self.assertEqual([(h['name'], h['readiness_score'], h['status']) for h in results],
+                         [('A', 90.0, 'Ready'), ('B', 10.0, 'Critical'), ('C', 0, 'Critical')])
+        self.assertEqual([h['name'] for h in get_hospital_readiness(region='Kerala')], ['A', 'B'])
+        self.assertEqual([h['name'] for h in get_hospital_readiness(critical_first=True, limit=2)], ['C', 'B'])
+        self.assertEqual([h['name'] for h in get_hospital_readiness(limit=1, offset=1)], ['B'])
+
+    def test_readiness_api_paging(self):
+        """Test the readiness endpoint's page size cap and parameter validation"""
+        client = app.test_client()
+        self.assertEqual([h['name'] for h in client.get('/api/hospitals/readiness?limit=2&offset=1').get_json()],
+                         ['B', 'C'])
+        with mock.patch('app.HOSPITALS_MAX_PAGE_SIZE', 2):
+            self.assertEqual(len(client.get('/api/hospitals/readiness').get_json()), 2)
+        for query in ('limit=0', 'limit=-1', 'offset=-2'):
+            self.assertEqual(client.get(f'/api/hospitals/readiness?{query}').status_code, 400)
+
+    def test_region_rollups(self):
+        """Test per-region aggregates"""
+        kerala = {r['region']: r for r in get_region_readiness()}['Kerala']
+        self.assertEqual(kerala['hospitals'], 2)
+        self.assertEqual(kerala['mean_readiness'], 50.0)
+        self.assertEqual(kerala['min_readiness'], 10.0)
+        self.assertEqual(kerala['critical_hospitals'], 1)
+        self.assertEqual(kerala['free_icu'], 10)
+        self.assertEqual(kerala['free_ventilators'], 4)
+
+class ResourceAllocatorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ctx = app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_batch_prioritizes_severity_and_caps_at_stock(self):
+        """Test that the most severe prediction is served first and stock never goes negative"""
+        db.session.add_all([
+            Resource(resource_type='ambulances', total_quantity=15, available_quantity=15),
+            Prediction(prediction_id='LOW', severity=4, affected_population=9000),
+            Prediction(prediction_id='HIGH', severity=5, affected_population=9000)
+        ])
+        db.session.commit()
+
+        rows = allocate_resources_batch(['LOW', 'HIGH'])
+        self.assertEqual([(r['resource_type'], r['quantity']) for r in rows], [('ambulances', 10), ('ambulances', 5)])
+        self.assertEqual(len({r['deployment_id'] for r in rows}), 2)
+        self.assertEqual(Resource.query.one().available_quantity, 0)
+        self.assertIsNone(allocate_resources_for_prediction('MISSING'))
+
+    def test_concurrent_allocators_never_over_allocate(self):
+        """Stress test: many threads allocating against shared stock on a file database"""
+        path = os.path.join(tempfile.mkdtemp(), 'alloc.db')
+        engine = create_engine(f'sqlite:///{path}', connect_args={'timeout': 30})
+        db.metadata.create_all(engine)
+        Session = sessionmaker(engine)
+        with Session() as session:
+            session.add(Resource(resource_type='relief_kits', total_quantity=500, available_quantity=500))
+            session.add_all([Prediction(prediction_id=f'P{i}', severity=2, affected_population=7000) for i in range(200)])
+            session.commit()
+
+        errors = []
+
+        def worker(ids):
+            with Session() as session:
+                try:
+                    for i in ids:
+                        allocate_resources_batch([f'P{i}'], session=session)
+                except Exception as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(range(n, 200, 8),)) for n in range(8)]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+
+        with Session() as session:
+            allocated = session.query(func.sum(Deployment.quantity)).scalar()
+            available = session.query(Resource.available_quantity).scalar()
+        engine.dispose()
+        self.assertEqual(errors, [])
+        self.assertEqual(available, 0)
+        self.assertEqual(allocated, 500)
+
+class PredictionsApiTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ctx = app.app_context()
+        self.ctx.push()
+        db.create_all()
+        base = datetime(2026, 1, 1)
+        db.session.add_all([
+            Prediction(prediction_id=f'P{i}', timestamp=base + timedelta(hours=i // 2), disaster_type='flood' if i % 2 else 'cyclone',
+                       severity=i % 5 + 1, confidence=0.9, latitude=20.0 + i * 0.1, longitude=78.0)
+            for i in range(10)
+        ])
+        db.session.commit()
+        self.client = app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_keyset_pagination_covers_every_row_once(self):
+        """Test that following X-Next-Cursor walks all rows newest first without duplicates"""
+        seen = []
+        url = '/api/predictions?limit=3'
+        while url:
+            response = self.client.get(url)
+            seen.extend(p['id'] for p in json.loads(response.data))
+            cursor = response.headers.get('X-Next-Cursor')
+            url = f'/api/predictions?limit=3&cursor={cursor}' if cursor else None
+        self.assertEqual(seen, [f'P{i}' for i in range(9, -1, -1)])
+
+    def test_filters_projection_and_ndjson(self):
+        """Test filters, field projection and the streaming NDJSON mode"""
+        response = self.client.get('/api/predictions?disaster_type=flood&min_severity=4&fields=id,confidence')
+        self.assertEqual(json.loads(response.data), [{'id': 'P9', 'confidence': 90.0}, {'id': 'P3', 'confidence': 90.0}])
+
+        response = self.client.get('/api/predictions?format=ndjson&fields=id&bbox=20.25,77,20.55,79')
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertEqual([json.loads(line)['id'] for line in response.data.decode().splitlines()], ['P5', 'P4', 'P3'])
+
+        self.assertEqual(self.client.get('/api/predictions?fields=nope').status_code, 400)
+        self.assertEqual(self.client.get('/api/predictions?cursor=garbage').status_code, 400)
+
+    def test_rejects_limit_below_one(self):
+        """Test that zero or negative limits are refused rather than lifting the page cap"""
+        for limit in (0, -1):
+            self.assertEqual(self.client.get(f'/api/predictions?limit={limit}').status_code, 400)
+            self.assertEqual(self.client.get(f'/api/predictions?format=ndjson&limit={limit}').status_code, 400)
+
+    def test_rejects_invalid_bbox(self):
+        """Test that non-finite, inverted and out-of-range boxes are refused"""
+        for bbox in ('nan,77,21,79', '20,77,inf,79', '21,77,20,79', '20,79,21,77', '-91,77,21,79', '20,77,21,181', '1,2,3'):
+            self.assertEqual(self.client.get(f'/api/predictions?bbox={bbox}').status_code, 400, bbox)
+        self.assertEqual(self.client.get('/api/predictions?bbox=-90,-180,90,180').status_code, 200)
+
+class CompactDashboardTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ctx = app.app_context()
+        self.ctx.push()
+        db.create_all()
+        dashboard_cache.invalidate()
+        db.session.add_all([
+            Prediction(prediction_id=f'P{i}', disaster_type='flood', severity=i % 5 + 1, confidence=0.87,
+                       latitude=20.12345 + i, longitude=78.5, affected_population=1000 * i,
+                       predicted_onset=datetime(2026, 1, 1) + timedelta(hours=i))
+            for i in range(50)
+        ])
+        db.session.add(Resource(resource_type='ambulances', total_quantity=10, available_quantity=7))
+        db.session.commit()
+        self.client = app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_compact_is_smaller_and_gzip_negotiated(self):
+        """Test the columnar payload shape, size and compression"""
+        full = self.client.get('/api/dashboard')
+        compact = self.client.get('/api/dashboard?format=compact')
+        data = json.loads(compact.data)
+        self.assertEqual(data['p']['id'][0], 'P0')
+        self.assertEqual(data['p']['la'][1], 21123)
+        self.assertEqual(data['p']['c'][0], 87)
+        self.assertEqual(data['s'], [50, 20])
+        self.assertLess(len(compact.data), len(full.data) * 0.6)
+
+        zipped = self.client.get('/api/dashboard?format=compact', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(zipped.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(zipped.data), compact.data)
+        self.assertLess(len(zipped.data), len(full.data) * 0.3)
+
+    def test_delta_since_version(self):
+        """Test that a delta only carries changed predictions and sections"""
+        version = self.client.get('/api/dashboard?format=compact').headers['X-Dashboard-Version']
+        Prediction.query.filter_by(prediction_id='P3').one().severity = 1
+        db.session.delete(Prediction.query.filter_by(prediction_id='P4').one())
+        db.session.commit()
+
+        delta = json.loads(self.client.get(f'/api/dashboard?format=compact&since={version}').data)
+        self.assertEqual(delta['b'], version)
+        self.assertEqual(delta['p']['id'], ['P3'])
+        self.assertEqual(delta['pr'], ['P4'])
+        self.assertNotIn('r', delta)
+
+        unknown = json.loads(self.client.get('/api/dashboard?format=compact&since=stale').data)
+        self.assertEqual(len(unknown['p']['id']), 49)
+
+    def test_compressed_body_follows_invalidation(self):
+        """Test that a body compressed across an invalidation is never served for the newer snapshot"""
+        with app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+            old = dashboard_cache.get('race', lambda: b'{"v": 1}')
+            dashboard_cache.invalidate()
+            serve_snapshot('race', old)
+            fresh = dashboard_cache.get('race', lambda: b'{"v": 2}')
+            self.assertEqual(gzip.decompress(serve_snapshot('race', fresh).get_data()), b'{"v": 2}')
+
+class SnapshotCacheTestCase(unittest.TestCase):
+    def test_slow_rebuild_only_blocks_its_own_key(self):
+        """Test that a slow builder does not hold up misses on other keys, and same-key callers share it"""
+        cache = SnapshotCache(MemoryStore())
+        started, release, calls = threading.Event(), threading.Event(), []
+
+        def slow():
+            calls.append('slow')
+            started.set()
+            release.wait(5)
+            return b'slow'
+        threads = [threading.Thread(target=cache.get, args=('readiness', slow)) for _ in range(3)]
+        threads[0].start()
+        started.wait(5)
+        for t in threads[1:]:
+            t.start()
+        start = time.perf_counter()
+        self.assertEqual(cache.get('dashboard', lambda: b'fast').body, b'fast')
+        self.assertLess(time.perf_counter() - start, 1.0)
+        release.set()
+        for t in threads:
+            t.join(5)
+        self.assertEqual(calls, ['slow'])
+
+    def test_file_store_round_trips_json(self):
+        """Test that FileStore keeps snapshots and generations without pickle"""
+        store = FileStore(tempfile.mkdtemp(prefix='lifeguard-test-'))
+        cache = SnapshotCache(store)
+        cache.invalidate()
+        snapshot = cache.get('dashboard', lambda: b'{"v": 1}\n\x00')
+        self.assertEqual(SnapshotCache(store).get('dashboard', lambda: b'rebuilt'), snapshot)
+        with open(store._path('dashboard@' + cache.generation), 'rb') as f:
+            self.assertEqual(json.loads(f.readline())['etag'], snapshot.etag)
+        with open(store._path('bad'), 'wb') as f:
+            f.write(b'\x80\x04garbage')
+        self.assertIsNone(store.get('bad'))
+
+class RecipientTargetingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ctx = app.app_context()
+        self.ctx.push()
+        db.create_all()
+        db.session.add_all([
+            User(user_id=f'd{i}', phone_number=str(i), region='Mumbai', blood_type='O+' if i % 2 else 'A+',
+                 language_preference='hi', latitude=20.3, longitude=78.3)
+            for i in range(10)
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_weekly_cap_enforced(self):
+        """Test that users over the weekly cap are skipped across campaigns"""
+        def run():
+            return [r for chunk in select_recipients(region='Mumbai', blood_types=['O+'], cap=2, chunk_size=2)
+                    for r in chunk]
+
+        first = run()
+        self.assertEqual([r['user_id'] for r in first], ['d1', 'd3', 'd5', 'd7', 'd9'])
+        self.assertEqual(first[0]['language'], 'hi')
+        self.assertEqual(len(run()), 5)
+        self.assertEqual(run(), [])
+        self.assertEqual(db.session.query(func.max(User.notification_count_this_week)).scalar(), 2)
+
+    def test_counters_roll_over_weekly(self):
+        """Test that last week's count does not block this week's alerts"""
+        User.query.update({'notification_week': week_number() - 1, 'notification_count_this_week': 5})
+        db.session.commit()
+
+        recipients = [r for chunk in select_recipients(region='Mumbai', cap=2) for r in chunk]
+        self.assertEqual(len(recipients), 10)
+        user = User.query.filter_by(user_id='d0').one()
+        self.assertEqual((user.notification_week, user.notification_count_this_week), (week_number(), 1))
+
+    def test_zone_targeting(self):
+        """Test risk-zone polygon targeting"""
+        db.session.add(User(user_id='outside', phone_number='x', region='Mumbai', latitude=20.8, longitude=78.8))
+        db.session.add(RiskZone(zone_id='Z1', coordinates_json=json.dumps([[20, 78], [21, 78], [20, 79]])))
+        db.session.commit()
+
+        recipients = [r for chunk in select_recipients(zone_id='Z1', chunk_size=3) for r in chunk]
+        self.assertEqual(len(recipients), 10)
+        self.assertNotIn('outside', {r['user_id'] for r in recipients})
+
+class BloodForecastTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ctx = app.app_context()
+        self.ctx.push()
+        db.create_all()
+        db.session.add_all([
+            Resource(resource_type='blood_units', total_quantity=1000, available_quantity=500),
+            Hospital(name='H1', region='Kerala', total_beds=900, available_beds=500, total_icu=10, available_icu=5),
+            Hospital(name='H2', region='Gujarat', total_beds=100, available_beds=50, total_icu=10, available_icu=5),
+            Prediction(prediction_id='K1', region='Kerala', disaster_type='flood', severity=3,
+                       confidence=1.0, affected_population=100000),
+            Prediction(prediction_id='G1', region='Gujarat', disaster_type='earthquake', severity=5,
+                       confidence=1.0, affected_population=1000000),
+            Prediction(prediction_id='G2', region='Gujarat', disaster_type='flood', severity=2,
+                       confidence=1.0, affected_population=1000),
+            Prediction(prediction_id='LOW', region='Delhi', disaster_type='flood', severity=1,
+                       confidence=1.0, affected_population=1000000)
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_forecast_per_region(self):
+        """Test demand by blood type, driving prediction and shortage flags"""
+        self.assertEqual(refresh_blood_forecasts(), {'updated': 2, 'removed': 0, 'unchanged': 0})
+        forecasts = {f.region: f for f in BloodForecast.query.all()}
+        self.assertEqual(set(forecasts), {'Kerala', 'Gujarat'})
+
+        kerala = forecasts['Kerala'].blood_demands
+        self.assertEqual(set(kerala), {'A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-'})
+        self.assertGreater(kerala['O+'], kerala['O-'])
+        self.assertFalse(forecasts['Kerala'].shortage_detected)
+
+        # Gujarat is capped by its 55 free beds and holds 10% of the supply
+        self.assertEqual(forecasts['Gujarat'].prediction_id, 'G1')
+        self.assertTrue(forecasts['Gujarat'].shortage_detected)
+        self.assertAlmostEqual(sum(forecasts['Gujarat'].blood_demands.values()), 55 * 3 * 2.5, delta=8)
+
+    def test_incremental_refresh(self):
+        """Test that only regions with changed inputs are recomputed"""
+        refresh_blood_forecasts()
+        kerala_id = BloodForecast.query.filter_by(region='Kerala').one().forecast_id
+        self.assertEqual(refresh_blood_forecasts(), {'updated': 0, 'removed': 0, 'unchanged': 2})
+
+        Prediction.query.filter_by(prediction_id='G2').one().severity = 4
+        db.session.commit()
+        self.assertEqual(refresh_blood_forecasts(), {'updated': 1, 'removed': 0, 'unchanged': 1})
+        self.assertEqual(BloodForecast.query.filter_by(region='Kerala').one().forecast_id, kerala_id)
+
+        Prediction.query.filter_by(prediction_id='K1').one().severity = 1
+        db.session.commit()
+        self.assertEqual(refresh_blood_forecasts(), {'updated': 0, 'removed': 1, 'unchanged': 1})
+
+    def test_swapped_inputs_and_far_onsets(self):
+        """Test that swapping values between predictions triggers a recompute and far-future onsets are ignored"""
+        db.session.add_all([
+            Prediction(prediction_id='K2', region='Kerala', disaster_type='earthquake', severity=2,
+                       confidence=1.0, affected_population=50000),
+            Prediction(prediction_id='K3', region='Kerala', disaster_type='flood', severity=5,
+                       confidence=1.0, affected_population=50000),
+            Prediction(prediction_id='FAR', region='Assam', disaster_type='flood', severity=5, confidence=1.0,
+                       affected_population=100000, predicted_onset=datetime.utcnow() + timedelta(days=30))
+        ])
+        db.session.commit()
+        refresh_blood_forecasts()
+        self.assertEqual({f.region for f in BloodForecast.query.all()}, {'Kerala', 'Gujarat'})
+        before = BloodForecast.query.filter_by(region='Kerala').one().blood_demands
+
+        # Every per-region sum of the two rows is unchanged by the swap
+        Prediction.query.filter_by(prediction_id='K2').one().severity = 5
+        Prediction.query.filter_by(prediction_id='K3').one().severity = 2
+        db.session.commit()
+        self.assertEqual(refresh_blood_forecasts(), {'updated': 1, 'removed': 0, 'unchanged': 1})
+        self.assertGreater(sum(BloodForecast.query.filter_by(region='Kerala').one().blood_demands.values()),
+                           sum(before.values()))
+
+    def test_regions_without_hospitals_are_not_short(self):
+        """Test that a region holding no blood stock is forecast but not reported short"""
+        db.session.add(Prediction(prediction_id='A1', region='Assam', disaster_type='flood', severity=5,
+                                  confidence=1.0, affected_population=100000))
+        db.session.commit()
+        self.assertEqual(refresh_blood_forecasts()['updated'], 3)
+        assam = BloodForecast.query.filter_by(region='Assam').one()
+        self.assertAlmostEqual(sum(assam.blood_demands.values()), 100000 * 0.002 * 2.5, delta=8)
+        self.assertFalse(assam.shortage_detected)
+        self.assertEqual([s['region'] for s in get_blood_shortages()], ['Gujarat'])
+
+    def test_shortages_api_does_not_refresh(self):
+        """Test that the shortages endpoint only reads forecasts"""
+        self.assertEqual(app.test_client().get('/api/blood/shortages').get_json(), [])
+        self.assertEqual(app.test_cli_runner().invoke(args=['refresh-forecasts']).exit_code, 0)
+        self.assertEqual([s['region'] for s in app.test_client().get('/api/blood/shortages').get_json()], ['Gujarat'])
+
+    def test_compute_demands_matches_scalar_model(self):
+        """Test the vectorized model against a hand-computed region"""
+        names, demands, confidence, shortage, top = compute_demands(
+            ['A', 'B', 'A'], [5, 3, 4], [10000, 10000, 20000], [0.5, 1.0, 1.0],
+            ['flood', 'heatwave', 'cyclone'], {}, 10**6, 0)
+        self.assertEqual(list(names), ['A', 'B'])
+        casualties_a = 10000 * 0.002 * 0.5 + 20000 * 0.0008 * 1.2
+        self.assertAlmostEqual(demands[0].sum(), casualties_a * 2.5, delta=8)
+        self.assertEqual(list(top), [2, 1])
+        self.assertFalse(shortage.any())
+
+class PredictionIngestTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ctx = app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.client = app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_ndjson_upsert_is_idempotent(self):
+        """Test that re-loading a batch updates rows in place and rejects bad records"""
+        lines = [
+            {'prediction_id': 'P1', 'disaster_type': 'flood', 'latitude': 20.3, 'longitude': 78.3, 'severity': 3,
+             'predicted_onset': '2026-01-01T06:00:00Z', 'affected_population': 1000},
+            {'prediction_id': 'P2', 'disaster_type': 'cyclone', 'latitude': 13.0, 'longitude': 80.2, 'severity': 9},
+            {'prediction_id': 'P3', 'disaster_type': 'heatwave', 'latitude': 26.9, 'longitude': 75.8, 'severity': 2}
+        ]
+        body = '\n'.join(json.dumps(line) for line in lines) + '\n{not json\n'
+        stats = ingest_predictions(io.StringIO(body), 'ndjson')
+        self.assertEqual((stats['received'], stats['upserted'], stats['rejected']), (4, 2, 2))
+        self.assertEqual([e['line'] for e in stats['errors']], [2, 4])
+
+        first = Prediction.query.filter_by(prediction_id='P1').one()
+        self.assertEqual(first.predicted_onset, datetime(2026, 1, 1, 6, 0))
+        self.assertIsNotNone(first.geo_cell)
+        created = first.timestamp
+
+        lines[0]['severity'] = 5
+        ingest_predictions(io.StringIO('\n'.join(json.dumps(line) for line in lines)), 'ndjson')
+        db.session.expire_all()
+        self.assertEqual(Prediction.query.count(), 2)
+        updated = Prediction.query.filter_by(prediction_id='P1').one()
+        self.assertEqual((updated.severity, updated.timestamp), (5, created))
+
+    def test_csv_endpoint(self):
+        """Test streaming a CSV batch to the ingest endpoint"""
+        body = ("prediction_id,disaster_type,latitude,longitude,severity,confidence\n"
+                "C1,flood,19.0,72.8,4,0.9\n"
+                "C2,flood,19.1,72.9,4,1.5\n")
+        response = self.client.post('/api/predictions/ingest', data=body, content_type='text/csv')
+        stats = json.loads(response.data)
+        self.assertEqual((stats['upserted'], stats['rejected']), (1, 1))
+        self.assertIn('confidence', stats['errors'][0]['error'])
+        self.assertEqual(self.client.post('/api/predictions/ingest?format=xml', data='').status_code, 400)
+
+    def test_rejects_non_finite_and_oversized_values(self):
+        """Test that NaN, infinities and implausible radii are rejected"""
+        base = {'disaster_type': 'flood', 'latitude': 20.3, 'longitude': 78.3, 'severity': 3}
+        bad = [{'latitude': float('nan')}, {'confidence': float('nan')}, {'affected_population': float('inf')},
+               {'radius_km': float('inf')}, {'radius_km': 1e12}]
+        body = '\n'.join(json.dumps({**base, 'prediction_id': f'B{i}', **fields}) for i, fields in enumerate(bad))
+        body += '\n' + json.dumps({**base, 'prediction_id': 'OK', 'radius_km': 250})
+        stats = ingest_predictions(io.StringIO(body), 'ndjson')
+        self.assertEqual((stats['upserted'], stats['rejected']), (1, len(bad)))
+        self.assertEqual(Prediction.query.one().prediction_id, 'OK')
+
+        body = "prediction_id,disaster_type,latitude,longitude,severity\nC1,flood,nan,72.8,4\n"
+        self.assertEqual(ingest_predictions(io.StringIO(body), 'csv')['rejected'], 1)
+
+    def test_rejects_out_of_range_dates(self):
+        """Test that epochs and offsets beyond datetime's range are rejected, not raised"""
+        base = {'disaster_type': 'flood', 'latitude': 20.3, 'longitude': 78.3, 'severity': 3}
+        bad = [{'predicted_onset': 1e20}, {'timestamp': -1e15}, {'predicted_onset': '9999-12-31T23:59:59-05:00'}]
+        body = '\n'.join(json.dumps({**base, 'prediction_id': f'B{i}', **fields}) for i, fields in enumerate(bad))
+        body += '\n' + json.dumps({**base, 'prediction_id': 'OK', 'predicted_onset': 1.8e9})
+        stats = ingest_predictions(io.StringIO(body), 'ndjson')
+        self.assertEqual((stats['upserted'], stats['rejected']), (1, len(bad)))
+
+        response = self.client.post('/api/predictions/ingest?format=ndjson', data=json.dumps({**base, **bad[0],
+                                    'prediction_id': 'API'}), content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['rejected'], 1)
+
+class RiskSnapshotTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ctx = app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.client = app.test_client()
+        self.path = os.path.join(tempfile.mkdtemp(prefix='lifeguard-test-'), 'snapshot.bin')
+        db.session.add_all([
+            Prediction(prediction_id='P1', disaster_type='flood', severity=4, confidence=0.9, latitude=19.0,
+                       longitude=72.8, affected_population=5000, predicted_onset=datetime(2026, 1, 1, 6, 0)),
+            Prediction(prediction_id='P2', disaster_type='cyclone', severity=2, latitude=13.0, longitude=80.2),
+            RiskZone(zone_id='Z1', region='Gujarat', coordinates_json=json.dumps([[20, 78], [21, 78], [20, 79]])),
+            Hospital(name='Hôpital Sud', region='Kerala', total_beds=100, available_beds=50,
+                     total_icu=10, available_icu=5)
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_roundtrip_and_versioning(self):
+        """Test mmap reads, stable versions for unchanged data and staleness detection"""
+        version = write_snapshot(self.path)
+        reader = SnapshotReader(self.path)
+        self.assertEqual(reader.version, version)
+        self.assertFalse(reader.predictions.flags.writeable)
+        self.assertEqual(reader.prediction_dicts(0, 1), [Prediction.query.filter_by(prediction_id='P1').one().to_dict()])
+        self.assertIsNone(reader.prediction_dicts()[1]['confidence'])
+        self.assertEqual(reader.zone_polygon(0).tolist(), [[20, 78], [21, 78], [20, 79]])
+        self.assertEqual(reader.regions[reader.zones[0]['region']], 'Gujarat')
+        self.assertEqual(reader.hospital_name(0), 'Hôpital Sud')
+        self.assertAlmostEqual(float(reader.hospitals[0]['readiness']), 50.0, places=4)
+
+        self.assertEqual(write_snapshot(self.path), version)
+        self.assertFalse(reader.is_stale())
+
+        Prediction.query.filter_by(prediction_id='P2').one().severity = 5
+        db.session.commit()
+        self.assertNotEqual(write_snapshot(self.path), version)
+        self.assertTrue(reader.is_stale())
+        self.assertEqual(int(reader.predictions[1]['severity']), 2)
+        reader.close()
+
+    def test_snapshot_endpoint(self):
+        """Test serving the snapshot with version-based revalidation"""
+        response = self.client.get('/api/snapshot')
+        version = response.headers['X-Snapshot-Version']
+        self.assertEqual(response.data[:8], b'LGSNAP01')
+        self.assertEqual(self.client.get('/api/snapshot', headers={'If-None-Match': f'"{version}"'}).status_code, 304)
+
+class RiskZoneBuilderTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ctx = app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.client = app.test_client()
+        db.session.add_all([
+            Prediction(prediction_id='A1', latitude=20.0, longitude=78.0, radius_km=50, severity=2,
+                       affected_population=100, region='Maharashtra'),
+            Prediction(prediction_id='A2', latitude=20.5, longitude=78.3, radius_km=50, severity=4,
+                       affected_population=200, region='Maharashtra'),
+            Prediction(prediction_id='B1', latitude=13.0, longitude=80.2, radius_km=25, severity=3,
+                       affected_population=50, region='Tamil Nadu'),
+            RiskZone(zone_id='MANUAL', coordinates_json=json.dumps([[20, 78], [21, 78], [20, 79]]))
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_cluster_and_outline(self):
+        """Test overlap clustering and the merged outline geometry"""
+        labels = cluster_circles([20.0, 20.5, 25.0, 20.9], [78.0, 78.3, 80.0, 78.6], [50, 50, 30, 40])
+        self.assertEqual(labels.tolist(), [0, 0, 2, 0])
+
+        variants = union_outline([20.0], [78.0], [50])
+        ring = np.array(variants[0])
+        y = ring[:, 0] * 111.32
+        x = ring[:, 1] * 111.32 * np.cos(np.radians(20.0))
+        area = abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2
+        self.assertAlmostEqual(area / (np.pi * 50 ** 2), 1.0, delta=0.05)
+        self.assertLess(len(variants[2]), len(variants[1]))
+        self.assertLessEqual(len(variants[1]), len(variants[0]))
+
+    def test_oversized_circle_keeps_comparisons_bounded(self):
+        """Test that one huge circle joins what it covers without an N x N distance matrix"""
+        rng = np.random.default_rng(3)
+        lat = np.r_[rng.uniform(10, 30, 3000), 20.0, 35.0]
+        lng = np.r_[rng.uniform(70, 90, 3000), 80.0, 95.0]
+        radius = np.r_[np.full(3000, 1.0), 600.0, 1.0]
+        sizes = []
+        hypot = np.hypot
+        with mock.patch('zones.PAIR_BLOCK', 1 << 14), \
+                mock.patch('numpy.hypot', side_effect=lambda a, b: sizes.append(a.size) or hypot(a, b)):
+            labels = cluster_circles(lat, lng, radius)
+        self.assertLessEqual(max(sizes), 1 << 14)
+        covered = (abs(lat[:3000] - 20.0) < 1) & (abs(lng[:3000] - 80.0) < 1)
+        self.assertTrue(covered.any())
+        self.assertTrue((labels[:3000][covered] == labels[3000]).all())
+        self.assertEqual(labels[3001], 3001)
+
+    def test_incremental_rebuild(self):
+        """Test that only zones whose predictions changed are rebuilt"""
+        self.assertEqual(rebuild_risk_zones(), {'built': 2, 'kept': 0, 'removed': 0})
+        merged = RiskZone.query.filter_by(region='Maharashtra').one()
+        self.assertEqual((merged.severity, merged.affected_population, merged.prediction_count), (4, 300, 2))
+        self.assertEqual(list(users_in_zone(merged.zone_id)), [])
+        self.assertEqual(rebuild_risk_zones(), {'built': 0, 'kept': 2, 'removed': 0})
+
+        Prediction.query.filter_by(prediction_id='B1').one().severity = 5
+        db.session.commit()
+        self.assertEqual(rebuild_risk_zones(), {'built': 1, 'kept': 1, 'removed': 1})
+        self.assertEqual(RiskZone.query.filter_by(region='Maharashtra').one().zone_id, merged.zone_id)
+        self.assertIsNotNone(RiskZone.query.filter_by(zone_id='MANUAL').first())
+
+        zones = json.loads(self.client.get('/api/risk-zones?lod=2').data)
+        self.assertEqual([z['severity'] for z in zones[:2]], [5, 4])
+        self.assertEqual(self.client.get('/api/risk-zones?lod=7').status_code, 400)
+
+    def test_endpoint_serves_stored_zones_and_lost_races_are_skipped(self):
+        """Test that GET never rebuilds and a second rebuild of the same inputs does not fail"""
+        map_cache.invalidate()
+        self.assertEqual([z['id'] for z in self.client.get('/api/risk-zones').get_json()], ['MANUAL'])
+        rebuild_risk_zones()
+        self.assertEqual(len(self.client.get('/api/risk-zones').get_json()), 3)
+
+        # Another process inserted the same zones after this one read the stored digests
+        with mock.patch('zones._stored_digests', return_value=set()):
+            self.assertEqual(rebuild_risk_zones()['built'], 2)
+        self.assertEqual(RiskZone.query.count(), 3)
+
+class TileClusterTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ctx = app.app_context()
+        self.ctx.push()
+        db.create_all()
+        map_cache.invalidate()
+        self.client = app.test_client()
+        db.session.add_all([
+            Prediction(prediction_id='T1', disaster_type='flood', latitude=19.07, longitude=72.87,
+                       severity=2, affected_population=100),
+            Prediction(prediction_id='T2', disaster_type='flood', latitude=19.08, longitude=72.88,
+                       severity=4, affected_population=300),
+            Prediction(prediction_id='T3', disaster_type='cyclone', latitude=13.08, longitude=80.27,
+                       severity=3, affected_population=50)
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_tile_geometry(self):
+        """Test tile bounds and range checks"""
+        min_lat, min_lng, max_lat, max_lng = tile_bounds(0, 0, 0)
+        self.assertAlmostEqual(max_lat, 85.0511, places=3)
+        self.assertEqual((min_lng, max_lng), (-180.0, 180.0))
+        self.assertTrue(valid_tile(5, 31, 0))
+        self.assertFalse(valid_tile(5, 32, 0))
+        self.assertFalse(valid_tile(19, 0, 0))
+
+    def test_clusters_aggregate(self):
+        """Test that nearby predictions merge into one cluster per bin"""
+        clusters = sorted(build_tile(4, 11, 7), key=lambda c: -c['count'])
+        self.assertEqual([c['count'] for c in clusters], [2, 1])
+        self.assertEqual((clusters[0]['max_severity'], clusters[0]['affected_population']), (4, 400))
+        self.assertNotIn('id', clusters[0])
+        self.assertEqual((clusters[1]['id'], clusters[1]['disaster_type']), ('T3', 'cyclone'))
+        self.assertEqual(build_tile(4, 0, 0), [])
+
+    def test_tile_endpoint_cache(self):
+        """Test the tile endpoint and its invalidation on prediction writes"""
+        response = self.client.get('/api/tiles/4/11/7')
+        self.assertEqual(sum(c['count'] for c in json.loads(response.data)), 3)
+        self.assertEqual(self.client.get('/api/tiles/4/16/0').status_code, 404)
+
+        db.session.add(Prediction(prediction_id='T4', disaster_type='flood', latitude=19.2, longitude=72.9,
+                                  severity=5, affected_population=10))
+        db.session.commit()
+        clusters = json.loads(self.client.get('/api/tiles/4/11/7').data)
+        self.assertEqual(sum(c['count'] for c in clusters), 4)
+        self.assertEqual(max(c['max_severity'] for c in clusters), 5)
+
+class MetricsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ctx = app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.client = app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_request_metrics_exposed(self):
+        """Test that route latency and query counts reach /metrics"""
+        before = REQUEST_LATENCY.count('GET', '/api/blood/shortages', '200')
+        queries = REQUEST_QUERIES.count('/api/blood/shortages')
+        self.client.get('/api/blood/shortages')
+        self.assertEqual(REQUEST_LATENCY.count('GET', '/api/blood/shortages', '200'), before + 1)
+        self.assertEqual(REQUEST_QUERIES.count('/api/blood/shortages'), queries + 1)
+
+        body = self.client.get('/metrics').data.decode()
+        self.assertIn('# TYPE lifeguard_http_request_duration_seconds histogram', body)
+        self.assertIn('lifeguard_http_request_duration_seconds_bucket{method="GET",'
+                      'route="/api/blood/shortages",status="200",le="+Inf"}', body)
+        self.assertEqual(self.client.get('/metrics/profiles').status_code, 404)
+
+    def test_n_plus_one_detected(self):
+        """Test that repeating one statement within a request is flagged"""
+        before = N_PLUS_ONE.value('/api/dashboard')
+        with app.test_request_context('/api/dashboard'):
+            app.preprocess_request()
+            for i in range(12):
+                db.session.get(Prediction, i + 1)
+        self.assertEqual(N_PLUS_ONE.value('/api/dashboard'), before + 1)
+
+    def test_sms_outcomes_counted(self):
+        """Test SMS success and failure counters"""
+        sent, failed = SMS_MESSAGES.value('sent'), SMS_MESSAGES.value('failed')
+        SMSService(client=FakeTwilioClient(), backoff_seconds=0).send_sms('9800000001', 'ok')
+        SMSService(client=FakeTwilioClient(failure_rate=1.0), backoff_seconds=0).send_sms('9800000001', 'x')
+        self.assertEqual((SMS_MESSAGES.value('sent'), SMS_MESSAGES.value('failed')), (sent + 1, failed + 1))
+
+    def test_stack_sampler(self):
+        """Test that the sampler records the stack of a busy thread"""
+        sampler = StackSampler(interval=0.001)
+        sampler.start(threading.get_ident())
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            pass
+        tally = sampler.stop(threading.get_ident())
+        self.assertTrue(any('test_stack_sampler' in stack for stack in tally))
+
+class DatabaseEngineTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ctx = app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.tmpdir = tempfile.mkdtemp(prefix='lifeguard-test-')
+
+    def tearDown(self):
+        db.engines.pop(REPLICA_BIND, None)
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_sqlite_pragmas(self):
+        """Test that file databases get WAL and the configured pragmas"""
+        engine = create_engine(f"sqlite:///{os.path.join(self.tmpdir, 'wal.db')}")
+        configure_sqlite(engine, app.config['SQLITE_PRAGMAS'])
+        with engine.connect() as conn:
+            self.assertEqual(conn.exec_driver_sql('PRAGMA journal_mode').scalar(), 'wal')
+            self.assertEqual(conn.exec_driver_sql('PRAGMA busy_timeout').scalar(), 5000)
+            self.assertEqual(conn.exec_driver_sql('PRAGMA synchronous').scalar(), 1)
+        engine.dispose()
+
+    def test_reads_routed_to_replica(self):
+        """Test that replica_reads() SELECTs use the replica unless the session wrote"""
+        replica = create_engine(f"sqlite:///{os.path.join(self.tmpdir, 'replica.db')}")
+        db.metadata.create_all(replica)
+        db.engines[REPLICA_BIND] = replica
+        db.session.add(Prediction(prediction_id='P1', latitude=20.0, longitude=78.0, severity=3))
+        db.session.commit()
+
+        self.assertEqual(Prediction.query.count(), 1)
+        with replica_reads():
+            self.assertEqual(Prediction.query.count(), 0)
+            db.session.add(Prediction(prediction_id='P2', latitude=20.0, longitude=78.0, severity=3))
+            self.assertEqual(Prediction.query.count(), 2)
+            db.session.commit()
+            self.assertEqual(Prediction.query.count(), 0)
+        replica.dispose()
+
+class ArchiveTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ctx = app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.client = app.test_client()
+        now = datetime.utcnow()
+        self.old = now - timedelta(days=40)
+        db.session.add_all([
+            Prediction(prediction_id='OLD1', region='Kerala', disaster_type='flood', severity=4,
+                       affected_population=100, latitude=10.0, longitude=76.0, predicted_onset=self.old),
+            Prediction(prediction_id='OLD2', region='Kerala', disaster_type='flood', severity=2,
+                       affected_population=50, latitude=10.1, longitude=76.1, predicted_onset=self.old),
+            Prediction(prediction_id='ALERTED', region='Kerala', disaster_type='flood', severity=3,
+                       affected_population=10, latitude=10.2, longitude=76.2, predicted_onset=self.old),
+            Prediction(prediction_id='LIVE', region='Kerala', disaster_type='flood', severity=5,
+                       affected_population=7, latitude=10.3, longitude=76.3, predicted_onset=now + timedelta(days=1)),
+            Alert(alert_id='SENT1', prediction_id='OLD1', status='SENT', alert_type='DISASTER',
+                  timestamp=now - timedelta(days=10)),
+            Alert(alert_id='WAIT1', prediction_id='ALERTED', status='PENDING', alert_type='DISASTER',
+                  timestamp=now - timedelta(days=10)),
+            Deployment(deployment_id='DEP-OLD', resource_type='ambulances', quantity=3, target_region='Kerala',
+                       status='deployed', timestamp=now - timedelta(days=60)),
+            Deployment(deployment_id='DEP-NEW', resource_type='ambulances', quantity=2, target_region='Kerala',
+                       status='dispatched', timestamp=now - timedelta(days=60))
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        archive_metadata.drop_all(db.engine)
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_archive_moves_expired_rows(self):
+        """Test that only expired, unreferenced rows leave the hot tables"""
+        self.assertEqual(archive_expired(), {'alert': 1, 'prediction': 2, 'deployment': 1})
+        self.assertEqual(sorted(p.prediction_id for p in Prediction.query), ['ALERTED', 'LIVE'])
+        self.assertEqual([a.alert_id for a in Alert.query], ['WAIT1'])
+        self.assertEqual([d.deployment_id for d in Deployment.query], ['DEP-NEW'])
+
+        archived = db.session.execute(db.text(
+            f"SELECT prediction_id, severity FROM predictions_archive_{self.old:%Y%m} ORDER BY prediction_id"
+        )).all()
+        self.assertEqual([tuple(r) for r in archived], [('OLD1', 4), ('OLD2', 2)])
+        self.assertEqual(archive_expired(), {'alert': 0, 'prediction': 0, 'deployment': 0})
+
+    def test_rollups_cover_full_history(self):
+        """Test that daily summaries add archived rollups to live rows"""
+        before = daily_summary('prediction', region='Kerala')
+        archive_expired()
+        rollup = DailyRollup.query.filter_by(kind='prediction').one()
+        self.assertEqual((rollup.count, rollup.total, rollup.max_severity), (2, 150, 4))
+        self.assertEqual(daily_summary('prediction', region='Kerala'), before)
+        self.assertEqual(before[0], {'day': self.old.date().isoformat(), 'region': 'Kerala', 'category': 'flood',
+                                     'count': 3, 'total': 160, 'max_severity': 4})
+
+        alerts = json.loads(self.client.get('/api/analytics/daily?kind=alert').data)
+        self.assertEqual([(a['count'], a['total']) for a in alerts], [(2, 1)])
+        since = (datetime.utcnow() + timedelta(days=1)).date().isoformat()
+        live = json.loads(self.client.get(f'/api/analytics/daily?since={since}').data)
+        self.assertEqual([p['count'] for p in live], [1])
+        self.assertEqual(self.client.get('/api/analytics/daily?kind=users').status_code, 400)
+        self.assertEqual(self.client.get('/api/analytics/daily?since=yesterday').status_code, 400)
+
+class InferenceTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model_dir = tempfile.mkdtemp(prefix='lifeguard-models-')
+        train_baseline_models(cls.model_dir, '1.2', samples=4000)
+        train_baseline_models(cls.model_dir, '1.10', samples=4000, seed=1)
+
+    def setUp(self):
+        self.ctx = app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.cache = ModelCache(self.model_dir, capacity=1)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_model_cache(self):
+        """Test newest-version selection, LRU hits and eviction"""
+        self.assertEqual(self.cache.versions('disaster'), ['1.2', '1.10'])
+        model, version = self.cache.get('disaster')
+        self.assertEqual(version, '1.10')
+        self.assertIs(self.cache.get('disaster')[0], model)
+        self.cache.get('severity')
+        self.assertIsNot(self.cache.get('disaster')[0], model)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 3))
+        with self.assertRaises(LookupError):
+            self.cache.get('missing')
+
+    def test_grid_inference_upserts_flagged_cells(self):
+        """Test that flagged cells become versioned predictions and clear on re-run"""
+        db.session.add(Hospital(name='H', region='Kerala', latitude=10.0, longitude=76.2))
+        db.session.commit()
+        lat, lng = national_grid(1.0)
+        self.assertEqual(len(lat), 900)
+        rain = np.where((lat < 12) & (lng > 75) & (lng < 78), 400.0, 0.0)
+        when = datetime(2026, 7, 1)
+
+        stats = run_inference(self.cache, when=when, lat=lat, lng=lng, weather={'rainfall_mm': rain})
+        self.assertEqual(stats['cells'], 900)
+        self.assertGreater(stats['flagged'], 0)
+        predictions = Prediction.query.all()
+        self.assertEqual(len(predictions), stats['flagged'])
+        self.assertTrue(all(p.disaster_type == 'flood' and p.model_version == '1.10' for p in predictions))
+        self.assertIn('Kerala', {p.region for p in predictions})
+        self.assertIn('rainfall_mm', predictions[0].explanation)
+
+        again = run_inference(self.cache, when=when, lat=lat, lng=lng, weather={'rainfall_mm': rain})
+        self.assertEqual((again['flagged'], Prediction.query.count()), (stats['flagged'], stats['flagged']))
+        cleared = run_inference(self.cache, when=when, lat=lat, lng=lng)
+        self.assertEqual((cleared['removed'], Prediction.query.count()), (stats['flagged'], 0))
+
+    def test_mixed_versions_are_stamped_in_full(self):
+        """Test that differing disaster and severity versions are stored without truncation"""
+        model_dir = tempfile.mkdtemp(prefix='lifeguard-models-')
+        for name, version in (('disaster', '2026.10.17'), ('severity', '2026.10.16')):
+            with open(os.path.join(self.model_dir, f'{name}-1.10.joblib'), 'rb') as src, \
+                    open(os.path.join(model_dir, f'{name}-{version}.joblib'), 'wb') as dst:
+                dst.write(src.read())
+        lat, lng = national_grid(1.0)
+        rain = np.where((lat < 12) & (lng > 75) & (lng < 78), 400.0, 0.0)
+        stats = run_inference(ModelCache(model_dir), when=datetime(2026, 7, 1), lat=lat, lng=lng,
+                              weather={'rainfall_mm': rain})
+        self.assertEqual(stats['model_version'], '2026.10.17/2026.10.16')
+        self.assertEqual({p.model_version for p in Prediction.query.all()}, {'2026.10.17/2026.10.16'})
+
+class WeatherFetcherTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeWeatherServer().__enter__()
+        self.fetcher = WeatherFetcher(self.server.url, 'test-key', workers=4)
+
+    def tearDown(self):
+        self.fetcher.close()
+        self.server.__exit__(None, None, None)
+
+    def test_parse_conditions(self):
+        """Test unit conversion and NaN for missing fields"""
+        rain, temp, wind, pressure = parse_conditions({'main': {'temp': 30.0}, 'wind': {'speed': 10.0},
+                                                       'rain': {'3h': 4.0}})
+        self.assertEqual((rain, temp, wind), (4.0, 30.0, 36.0))
+        self.assertTrue(np.isnan(pressure))
+
+    def test_neighbouring_points_share_requests_and_cache(self):
+        """Test that points in one cell share a request and repeat lookups hit the cache"""
+        lat = np.array([12.01, 12.04, 12.02, 20.0])
+        lng = np.array([77.01, 77.03, 77.04, 80.0])
+        weather = self.fetcher.fetch_grid(lat, lng)
+        self.assertEqual(self.server.requests, 2)
+        self.assertEqual(weather['rainfall_mm'][0], weather['rainfall_mm'][2])
+        self.assertEqual(weather['temperature_c'][3], 25.2)  # looked up at the cell centre, 20.25
+
+        self.fetcher.fetch_grid(lat, lng)
+        self.assertEqual(self.server.requests, 2)
+        stats = self.fetcher.stats()
+        self.assertEqual((stats['cells'], stats['hits'], stats['fetched']), (4, 2, 2))
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+        X = feature_matrix(lat, lng, datetime(2026, 7, 1), weather)
+        self.assertEqual(X.shape, (4, len(FEATURES)))
+        self.assertFalse(np.isnan(X).any())
+
+    def test_default_cells_merge_neighbouring_grid_points(self):
+        """Test that with default settings a block of inference grid cells shares one request"""
+        config = get_config()
+        fetcher = WeatherFetcher(self.server.url, 'test-key', workers=4,
+                                 cell_degrees=config.WEATHER_CACHE_CELL_DEGREES)
+        lat, lng = national_grid(config.INFERENCE_GRID_RESOLUTION)
+        block = (lat > 20.0) & (lat < 22.0) & (lng > 78.0) & (lng < 80.0)
+        fetcher.fetch_grid(lat[block], lng[block])
+        self.assertEqual(block.sum(), 64)
+        self.assertEqual(self.server.requests, 16)
+
+    def test_expired_entries_revalidate(self):
+        """Test that expired entries are revalidated with their ETag"""
+        first = self.fetcher.fetch_grid([12.0], [77.0])
+        self.fetcher.expire()
+        second = self.fetcher.fetch_grid([12.0], [77.0])
+        self.assertEqual(self.server.not_modified, 1)
+        self.assertEqual(self.fetcher.stats()['revalidated'], 1)
+        self.assertEqual(first['temperature_c'][0], second['temperature_c'][0])
+
+    def test_old_entries_are_evicted_and_threads_reused(self):
+        """Test that long-expired cells leave the cache and batches share one thread pool"""
+        self.fetcher.fetch_grid([12.0, 20.0], [77.0, 80.0])
+        pool = self.fetcher._pool
+        for entry in self.fetcher._cache.values():
+            entry.expires -= (STALE_TTLS + 1) * self.fetcher.ttl
+        self.fetcher.fetch_grid([30.0], [70.0])
+        self.assertEqual(len(self.fetcher._cache), 1)
+        self.assertIs(self.fetcher._pool, pool)
+
+    def test_failed_lookups_are_nan(self):
+        """Test that failed lookups come back as NaN and fall back to climatology"""
+        fetcher = WeatherFetcher(self.server.url, 'wrong-key', workers=2)
+        weather = fetcher.fetch_grid([12.0, 20.0], [77.0, 80.0])
+        self.assertTrue(np.isnan(weather['rainfall_mm']).all())
+        self.assertEqual(fetcher.stats()['errors'], 2)
+        X = feature_matrix([12.0, 20.0], [77.0, 80.0], datetime(2026, 7, 1), weather)
+        self.assertFalse(np.isnan(X).any())
+
+class ShortfallSimulationTestCase(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+        self.ctx = app.app_context()
+        self.ctx.push()
+        db.create_all()
+        now = datetime.utcnow()
+        db.session.add_all([
+            Resource(resource_type='ambulances', total_quantity=10, available_quantity=5),
+            Resource(resource_type='medical_teams', total_quantity=100, available_quantity=100),
+            Resource(resource_type='oxygen_cylinders', total_quantity=100, available_quantity=100),
+            Resource(resource_type='relief_kits', total_quantity=10, available_quantity=0),
+            # Served first: needs 4 of everything critical
+            Prediction(prediction_id='P1', region='Kerala', severity=5, confidence=1.0, severity_confidence=1.0,
+                       affected_population=3000, predicted_onset=now + timedelta(hours=6)),
+            # Needs 2 more ambulances than are left
+            Prediction(prediction_id='P2', region='Assam', severity=4, confidence=1.0, severity_confidence=1.0,
+                       affected_population=1500, predicted_onset=now + timedelta(hours=12)),
+            Prediction(prediction_id='P3', region='Bihar', severity=2, confidence=1.0, severity_confidence=1.0,
+                       affected_population=0, predicted_onset=now + timedelta(hours=12)),
+            # Beyond the horizon
+            Prediction(prediction_id='P4', region='Goa', severity=5, confidence=1.0, severity_confidence=1.0,
+                       affected_population=900000, predicted_onset=now + timedelta(days=30))
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_deterministic_scenarios_follow_allocation_policy(self):
+        """Test that certain predictions reproduce allocate_resources_batch() shortfalls"""
+        inputs, regions, stock = load_inputs(horizon_hours=72, onset_sigma_hours=0)
+        self.assertEqual(regions, ['Assam', 'Bihar', 'Kerala'])
+        result = ShortfallSimulator(workers=1, batch_size=40).run(inputs, regions, stock, scenarios=100,
+                                                                  horizon_hours=72, onset_sigma_hours=0)
+        ambulances = result['resources']['ambulances']
+        self.assertEqual((ambulances['shortfall_probability'], ambulances['expected_unmet']), (1.0, 1.0))
+        self.assertEqual(ambulances['demand_p95'], 6.0)
+        self.assertEqual(result['resources']['medical_teams']['shortfall_probability'], 0.0)
+        self.assertEqual(result['resources']['relief_kits']['shortfall_probability'], 1.0)
+        self.assertEqual(result['regions']['Kerala']['ambulances'], 0.0)
+        self.assertEqual(result['regions']['Assam']['ambulances'], 1.0)
+        self.assertEqual(result['regions']['Bihar'], {'ambulances': 0.0, 'medical_teams': 0.0,
+                                                       'oxygen_cylinders': 0.0, 'relief_kits': 1.0})
+
+    def test_process_pool_matches_in_process(self):
+        """Test that a seed gives the same result however many workers run it"""
+        Prediction.query.update({'confidence': 0.5, 'severity_confidence': 0.7})
+        db.session.commit()
+        inputs, regions, stock = load_inputs()
+        inline = ShortfallSimulator(workers=1, batch_size=250).run(inputs, regions, stock, 1000, seed=7)
+        pooled_simulator = ShortfallSimulator(workers=2, batch_size=250)
+        try:
+            pooled = pooled_simulator.run(inputs, regions, stock, 1000, seed=7)
+        finally:
+            pooled_simulator.shutdown()
+        inline.pop('seconds'), pooled.pop('seconds')
+        self.assertEqual(inline, pooled)
+        self.assertGreater(pooled['resources']['ambulances']['shortfall_probability'], 0)
+        self.assertLess(pooled['resources']['ambulances']['shortfall_probability'], 1)
+
+    def test_simulation_api(self):
+        """Test that the simulation endpoint starts a background job and validates its parameters"""
+        response = self.client.post('/api/simulation/shortfall?scenarios=200&seed=1')
+        self.assertEqual(response.status_code, 202)
+        job_id = response.get_json()['job_id']
+        self.assertEqual(response.headers['Location'], f'/api/simulation/shortfall/{job_id}')
+        deadline = time.monotonic() + 10
+        while True:
+            job = self.client.get(response.headers['Location']).get_json()
+            if job['status'] in ('done', 'failed') or time.monotonic() > deadline:
+                break
+            time.sleep(0.01)
+        self.assertEqual(job['status'], 'done')
+        data = job['result']
+        self.assertEqual((data['scenarios'], data['predictions']), (200, 3))
+        self.assertIn('Kerala', data['regions'])
+        self.assertEqual(self.client.get('/api/simulation/shortfall/unknown').status_code, 404)
+        self.assertEqual(self.client.post('/api/simulation/shortfall?scenarios=0').status_code, 400)
+        self.assertEqual(self.client.post('/api/simulation/shortfall?seed=x').status_code, 400)
+        too_many = get_config().SIMULATION_MAX_SCENARIOS + 1
+        self.assertEqual(self.client.post(f'/api/simulation/shortfall?scenarios={too_many}').status_code, 400)
+
+    def test_jobs_run_off_the_calling_thread(self):
+        """Test that submit() returns while the simulation runs and a failure is recorded"""
+        started, release = threading.Event(), threading.Event()
+        simulator = mock.Mock()
+        simulator.run.side_effect = lambda *args: (started.set(), release.wait(5), {'scenarios': args[3]})[-1]
+        jobs = SimulationJobs(simulator, FileStore(tempfile.mkdtemp()))
+        try:
+            job_id = jobs.submit([], [], [], 50)
+            self.assertTrue(started.wait(5))
+            self.assertEqual(jobs.get(job_id)['status'], 'running')
+            release.set()
+            simulator.run.side_effect = RuntimeError('pool died')
+            failed = jobs.submit([], [], [], 50)
+        finally:
+            jobs.shutdown()
+        self.assertEqual(jobs.get(job_id), {'job_id': job_id, 'status': 'done', 'result': {'scenarios': 50}})
+        self.assertEqual(jobs.get(failed), {'job_id': failed, 'status': 'failed', 'error': 'pool died'})
+
+    def test_batches_fit_the_memory_budget(self):
+        """Test that batches shrink as predictions grow so one batch stays within memory_mb"""
+        simulator = ShortfallSimulator(workers=1, memory_mb=64)
+        self.assertEqual(simulator.batch_size_for(2000), 466)
+        self.assertEqual(simulator.batch_size_for(200000), 4)
+        self.assertEqual(simulator.batch_size_for(10 ** 9), 1)
+        self.assertEqual(ShortfallSimulator(workers=1, batch_size=40).batch_size_for(200000), 40)
+
+        inputs, regions, stock = load_inputs()
+        tiny = ShortfallSimulator(workers=1, memory_mb=1)
+        with mock.patch('simulation.BYTES_PER_CELL', 1024 * 1024):
+            result = tiny.run(inputs, regions, stock, 5, seed=3)
+        self.assertEqual(result['scenarios'], 5)
+
+class DeploymentSchedulerTestCase(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+        self.ctx = app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.t0 = datetime(2026, 1, 1, 12, 0)
+        db.session.add_all([
+            Resource(resource_type='ambulances', total_quantity=20, available_quantity=10),
+            Deployment(deployment_id='D1', resource_type='ambulances', quantity=3, target_region='Kerala',
+                       status='dispatched', eta_hours=2, priority='critical', timestamp=self.t0),
+            Deployment(deployment_id='D2', resource_type='ambulances', quantity=2, target_region='Assam',
+                       status='dispatched', eta_hours=5, priority='high', timestamp=self.t0),
+            Deployment(deployment_id='OLD', resource_type='ambulances', quantity=7, target_region='Kerala',
+                       status='deployed', eta_hours=1, priority='high', timestamp=self.t0 - timedelta(days=9))
+        ])
+        db.session.commit()
+        self.scheduler = DeploymentScheduler(app)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def status(self, deployment_id):
+        return db.session.execute(
+            select(Deployment.status).where(Deployment.deployment_id == deployment_id)).scalar()
+
+    def available(self):
+        return db.session.execute(
+            select(Resource.available_quantity).where(Resource.resource_type == 'ambulances')).scalar()
+
+    def test_ticks_advance_deployments_and_return_stock(self):
+        """Test status transitions, stock returns and in-flight counters"""
+        self.assertEqual(self.scheduler.sync(), 2)
+        self.assertEqual(self.scheduler.in_flight(), {'Kerala': {'ambulances': 3}, 'Assam': {'ambulances': 2}})
+
+        self.assertEqual(self.scheduler.tick(self.t0 + timedelta(minutes=5))['advanced'], 0)
+        self.assertEqual(self.scheduler.tick(self.t0 + timedelta(minutes=20))['advanced'], 2)
+        self.assertEqual((self.status('D1'), self.status('D2')), ('in_transit', 'in_transit'))
+        self.scheduler.tick(self.t0 + timedelta(hours=2, minutes=1))
+        self.assertEqual(self.status('D1'), 'arrived')
+
+        tick = self.scheduler.tick(self.t0 + timedelta(hours=4, minutes=1))
+        self.assertEqual((tick['completed'], tick['returned']), (1, {'ambulances': 3}))
+        self.assertEqual((self.status('D1'), self.available()), ('deployed', 13))
+        self.assertEqual(self.scheduler.in_flight(), {'Assam': {'ambulances': 2}})
+
+        # Overdue deployments skip straight to their current status
+        tick = self.scheduler.tick(self.t0 + timedelta(hours=10))
+        self.assertEqual((tick['advanced'], tick['completed']), (1, 1))
+        self.assertEqual((self.status('D2'), self.available()), ('deployed', 15))
+        self.assertEqual(self.scheduler.in_flight(), {})
+        self.assertEqual(self.scheduler.stats()['active'], 0)
+
+    def test_picks_up_new_rows_and_external_changes(self):
+        """Test that new deployments are tracked and rows changed elsewhere are not returned twice"""
+        self.scheduler.sync()
+        db.session.add(Prediction(prediction_id='P1', region='Odisha', severity=5, affected_population=1500))
+        db.session.commit()
+        allocate_resources_batch(['P1'])
+        self.assertEqual(self.available(), 8)
+        db.session.execute(update(Deployment).where(Deployment.deployment_id == 'D2').values(status='deployed'))
+        db.session.commit()
+
+        tick = self.scheduler.tick(datetime.utcnow() + timedelta(days=1))
+        self.assertEqual(tick['returned'], {'ambulances': 5})
+        self.assertEqual(self.available(), 13)
+        self.assertEqual(self.scheduler.stats()['active'], 0)
+
+    def test_in_flight_api(self):
+        """Test the in-flight endpoint and its region filter"""
+        self.scheduler.tick(self.t0)
+        data = self.client.get('/api/deployments/in-flight').get_json()
+        self.assertEqual(data['regions']['Kerala'], {'ambulances': 3})
+        self.assertEqual(data['by_status']['dispatched'], 2)
+        data = self.client.get('/api/deployments/in-flight?region=Assam').get_json()
+        self.assertEqual(data['regions'], {'Assam': {'ambulances': 2}})
+
+    def test_ticks_publish_counters_for_other_processes(self):
+        """Test that the endpoint serves the counters the last tick committed, without aggregating deployments"""
+        self.scheduler.tick(self.t0 + timedelta(minutes=20))
+        self.assertEqual(db.session.execute(select(func.count()).select_from(DeploymentInFlight)).scalar(), 2)
+        self.scheduler.tick(self.t0 + timedelta(hours=4, minutes=1))
+
+        statements = []
+        listen = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listen)
+        try:
+            data = self.client.get('/api/deployments/in-flight').get_json()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listen)
+        self.assertEqual(data['regions'], {'Assam': {'ambulances': 2}})
+        self.assertEqual(data['by_status'], {'dispatched': 0, 'in_transit': 1, 'arrived': 0})
+        self.assertFalse([s for s in statements if 'FROM deployments ' in s or 'GROUP BY' in s])
+        data = self.client.get('/api/deployments/in-flight?region=Kerala').get_json()
+        self.assertEqual(data['regions'], {'Kerala': {}})
+
+        # A failed tick rolls the counters back with the table and reloads them next time
+        with mock.patch.object(self.scheduler, '_publish', side_effect=RuntimeError('lost connection')):
+            with self.assertRaises(RuntimeError):
+                self.scheduler.tick(self.t0 + timedelta(hours=10))
+        self.assertEqual(self.status('D2'), 'in_transit')
+        self.assertEqual(self.client.get('/api/deployments/in-flight').get_json()['regions'],
+                         {'Assam': {'ambulances': 2}})
+        tick = self.scheduler.tick(self.t0 + timedelta(hours=10))
+        self.assertEqual((tick['completed'], self.available()), (1, 15))
+        self.assertEqual(self.client.get('/api/deployments/in-flight').get_json()['regions'], {})
+
+class StartupTestCase(unittest.TestCase):
+    def test_import_leaves_heavy_dependencies_unloaded(self):
+        """Test that importing the app in a fresh interpreter loads none of LAZY_MODULES"""
+        from benchmarks.bench_startup import measure_startup
+        self.assertEqual(measure_startup(1)['eager_lazy_modules'], [])
+
 if __name__ == '__main__':
     unittest.main()
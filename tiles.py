@@ -0,0 +1,95 @@
+"""
+LifeGuard AI - Prediction Cluster Tiles
+Pre-aggregates predictions per Web Mercator tile (z/x/y) into a fixed grid of
+bins, so the map draws a bounded number of cluster markers at any zoom.
+"""
+
+import math
+from sqlalchemy import select
+from models import db, Prediction
+from geo import bbox_filter
+
+MAX_ZOOM = 18
+# Bins per tile side; a 256px tile gets one cluster per 32px square at most
+TILE_BINS = 8
+MAX_LATITUDE = 85.05112878
+
+
+def tile_bounds(z, x, y):
+    """(min_lat, min_lng, max_lat, max_lng) of a tile"""
+    n = 2 ** z
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+    return lat(y + 1), x / n * 360.0 - 180.0, lat(y), (x + 1) / n * 360.0 - 180.0
+
+
+def _tile_position(lat, lng, z):
+    """Fractional tile coordinates of points at zoom z"""
+    import numpy as np
+    n = 2 ** z
+    lat = np.radians(np.clip(lat, -MAX_LATITUDE, MAX_LATITUDE))
+    tx = (lng + 180.0) / 360.0 * n
+    ty = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / math.pi) / 2.0 * n
+    return tx, ty
+
+
+def valid_tile(z, x, y):
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def build_tile(z, x, y):
+    """
+    Clusters for one tile: per occupied bin the member count, max severity,
+    total affected population and centroid. Single-member clusters carry the
+    prediction id and type so the map can show them individually.
+    """
+    import numpy as np
+    min_lat, min_lng, max_lat, max_lng = tile_bounds(z, x, y)
+    rows = db.session.execute(
+        select(Prediction.prediction_id, Prediction.disaster_type, Prediction.latitude, Prediction.longitude,
+               Prediction.severity, Prediction.affected_population)
+        .where(bbox_filter(Prediction, min_lat, min_lng, max_lat, max_lng))
+    ).all()
+    if not rows:
+        return []
+
+    lats = np.fromiter((r.latitude for r in rows), dtype=float, count=len(rows))
+    lngs = np.fromiter((r.longitude for r in rows), dtype=float, count=len(rows))
+    severity = np.fromiter((r.severity or 0 for r in rows), dtype=np.int64, count=len(rows))
+    population = np.fromiter((r.affected_population or 0 for r in rows), dtype=float, count=len(rows))
+
+    tx, ty = _tile_position(lats, lngs, z)
+    # Points on the tile's right/bottom edge belong to the neighbour tile
+    inside = (tx >= x) & (tx < x + 1) & (ty >= y) & (ty < y + 1)
+    index = np.flatnonzero(inside)
+    if not len(index):
+        return []
+    bx = np.minimum(((tx[index] - x) * TILE_BINS).astype(np.int64), TILE_BINS - 1)
+    by = np.minimum(((ty[index] - y) * TILE_BINS).astype(np.int64), TILE_BINS - 1)
+    bins, codes = np.unique(by * TILE_BINS + bx, return_inverse=True)
+
+    count = np.bincount(codes, minlength=len(bins))
+    max_severity = np.zeros(len(bins), dtype=np.int64)
+    np.maximum.at(max_severity, codes, severity[index])
+    total_population = np.bincount(codes, weights=population[index], minlength=len(bins))
+    mean_lat = np.bincount(codes, weights=lats[index], minlength=len(bins)) / count
+    mean_lng = np.bincount(codes, weights=lngs[index], minlength=len(bins)) / count
+    first = np.full(len(bins), len(index))
+    np.minimum.at(first, codes, np.arange(len(index)))
+
+    clusters = []
+    for b in range(len(bins)):
+        cluster = {
+            'lat': round(float(mean_lat[b]), 5),
+            'lng': round(float(mean_lng[b]), 5),
+            'count': int(count[b]),
+            'max_severity': int(max_severity[b]),
+            'affected_population': int(total_population[b])
+        }
+        if count[b] == 1:
+            row = rows[index[first[b]]]
+            cluster['id'] = row.prediction_id
+            cluster['disaster_type'] = row.disaster_type
+        clusters.append(cluster)
+    return clusters
@@ -3,6 +3,8 @@ LifeGuard AI - Multilingual Support
 Templates for 10 Indian languages
 """
 
+from functools import lru_cache
+
 SMS_TEMPLATES = {
     'en': {
         'cyclone': "EMERGENCY: Cyclone warning for {region}. Severity: {severity}/5. Please evacuate to nearest shelter.",
@@ -29,10 +31,27 @@ SMS_TEMPLATES = {
     # Add other languages as needed...
 }
 
+# GSM 03.38 basic character set; extension characters cost two septets
+GSM7_BASIC = set(
+    "@£$¥èéùìòÇ\nØø\rÅåΔ_ΦΓΛΩΠΨΣΘΞÆæßÉ !\"#¤%&'()*+,-./0123456789:;<=>?"
+    "¡ABCDEFGHIJKLMNOPQRSTUVWXYZÄÖÑÜ§¿abcdefghijklmnopqrstuvwxyzäöñüà"
+)
+GSM7_EXTENSION = set("^{}\\[~]|€\f")
+
 def get_sms_template(disaster_type, language='en', **kwargs):
     """
     Get formatted SMS template for a language
     """
+    try:
+        return _render_template(disaster_type, language, tuple(sorted(kwargs.items())))
+    except TypeError:  # unhashable argument, skip the cache
+        return _format_template(disaster_type, language, kwargs)
+
+@lru_cache(maxsize=4096)
+def _render_template(disaster_type, language, items):
+    return _format_template(disaster_type, language, dict(items))
+
+def _format_template(disaster_type, language, kwargs):
     templates = SMS_TEMPLATES.get(language, SMS_TEMPLATES['en'])
     template = templates.get(disaster_type, templates.get('cyclone')) # default to cyclone if type not found
 
@@ -40,3 +59,61 @@ def get_sms_template(disaster_type, language='en', **kwargs):
         return template.format(**kwargs)
     except KeyError:
         return template # Return unformatted if keys missing
+
+def sms_encoding(message):
+    """
+    GSM-7 if every character fits the GSM alphabet, otherwise UCS-2
+    """
+    return 'GSM-7' if all(c in GSM7_BASIC or c in GSM7_EXTENSION for c in message) else 'UCS-2'
+
+def sms_segments(message, encoding=None):
+    """
+    Number of SMS segments needed to deliver a message
+    """
+    encoding = encoding or sms_encoding(message)
+    if encoding == 'GSM-7':
+        units = sum(2 if c in GSM7_EXTENSION else 1 for c in message)
+        single, multi = 160, 153
+    else:
+        units = len(message.encode('utf-16-le')) // 2
+        single, multi = 70, 67
+    if units <= single:
+        return 1
+    return -(-units // multi)
+
+def render_bulk(disaster_type, recipients, default_language='en', **kwargs):
+    """
+    Group (phone_number, language) recipients by language and render each
+    message variant once. Returns a list of variants:
+    {'language', 'message', 'encoding', 'segments', 'recipients'}
+    """
+    groups = {}
+    for phone_number, language in recipients:
+        groups.setdefault(language or default_language, []).append(phone_number)
+
+    variants = []
+    for language, numbers in groups.items():
+        message = get_sms_template(disaster_type, language=language, **kwargs)
+        encoding = sms_encoding(message)
+        variants.append({
+            'language': language,
+            'message': message,
+            'encoding': encoding,
+            'segments': sms_segments(message, encoding),
+            'recipients': numbers
+        })
+    return variants
+
+def estimate_dispatch(variants):
+    """
+    Message and segment totals for a set of rendered variants
+    """
+    return {
+        'messages': sum(len(v['recipients']) for v in variants),
+        'segments': sum(len(v['recipients']) * v['segments'] for v in variants),
+        'by_language': {
+            v['language']: {'encoding': v['encoding'], 'segments_per_message': v['segments'],
+                            'recipients': len(v['recipients'])}
+            for v in variants
+        }
+    }
@@ -0,0 +1,209 @@
+"""
+LifeGuard AI - Weather Fetcher
+Current conditions for many grid points from WEATHER_API_URL (an
+OpenWeatherMap-compatible /weather endpoint), returned as NumPy arrays
+keyed by the inference weather features.
+
+Points are snapped to the centre of a WEATHER_CACHE_CELL_DEGREES cell,
+coarser than the inference grid, so neighbouring grid points share one
+request and one cache entry. Missing points are fetched concurrently over
+one pooled keep-alive session. Expired entries are revalidated with
+If-None-Match / If-Modified-Since when the server sent validators, and
+dropped once they are STALE_TTLS lifetimes old.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from inference import WEATHER_FEATURES
+from metrics import registry
+import logging
+
+logger = logging.getLogger(__name__)
+
+WEATHER_REQUESTS = registry.counter(
+    'lifeguard_weather_requests_total', 'Weather lookups by outcome', ('result',))
+# Expired entries are kept this many TTLs for revalidation and as a fallback
+STALE_TTLS = 3
+
+
+def parse_conditions(payload):
+    """OpenWeatherMap /weather JSON -> values in WEATHER_FEATURES order"""
+    main = payload.get('main') or {}
+    wind = payload.get('wind') or {}
+    rain = payload.get('rain') or {}
+    rainfall = rain.get('1h', rain.get('3h', 0.0))
+    speed = wind.get('speed')
+    values = {
+        'rainfall_mm': rainfall,
+        'temperature_c': main.get('temp'),
+        'wind_kph': speed * 3.6 if speed is not None else None,
+        'pressure_hpa': main.get('pressure')
+    }
+    return tuple(float('nan') if values[f] is None else float(values[f]) for f in WEATHER_FEATURES)
+
+
+class _Entry:
+    __slots__ = ('values', 'expires', 'etag', 'last_modified')
+
+    def __init__(self, values, expires, etag=None, last_modified=None):
+        self.values = values
+        self.expires = expires
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+class WeatherFetcher:
+    """Pooled, concurrent and cached client for the weather API"""
+
+    def __init__(self, base_url, api_key, workers=16, ttl=600, cell_degrees=0.5, timeout=10.0):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.workers = workers
+        self.ttl = ttl
+        self.cell_degrees = cell_degrees
+        self.timeout = timeout
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._pool = None
+        self._stats = {'points': 0, 'cells': 0, 'hits': 0, 'fetched': 0, 'revalidated': 0, 'errors': 0, 'seconds': 0.0}
+
+        self.session = requests.Session()
+        retry = Retry(total=2, backoff_factor=0.2, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=('GET',))
+        # One connection per worker, all kept alive between batches
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    @property
+    def enabled(self):
+        return bool(self.base_url and self.api_key)
+
+    def fetch_grid(self, lat, lng):
+        """
+        Conditions for every point: {feature: float array}, NaN where a
+        lookup failed (feature_matrix() fills those from climatology)
+        """
+        import numpy as np
+        start = time.perf_counter()
+        lat = self._snap(lat)
+        lng = self._snap(lng)
+        keys, inverse = np.unique(np.column_stack([lat, lng]), axis=0, return_inverse=True)
+        keys = [tuple(k) for k in keys.tolist()]
+
+        now = time.monotonic()
+        values = [None] * len(keys)
+        stale = []
+        with self._lock:
+            self._evict(now)
+            for i, key in enumerate(keys):
+                entry = self._cache.get(key)
+                if entry is not None and entry.expires > now:
+                    values[i] = entry.values
+                else:
+                    stale.append((i, key, entry))
+
+        if stale:
+            for (i, _, _), result in zip(stale, self._executor().map(lambda s: self._fetch(s[1], s[2]), stale)):
+                values[i] = result
+
+        missing = (float('nan'),) * len(WEATHER_FEATURES)
+        table = np.array([v if v is not None else missing for v in values], dtype=float).reshape(-1, len(WEATHER_FEATURES))
+        rows = table[inverse.ravel()]
+
+        hits = len(keys) - len(stale)
+        WEATHER_REQUESTS.inc('hit', amount=hits)
+        with self._lock:
+            self._stats['points'] += len(lat)
+            self._stats['cells'] += len(keys)
+            self._stats['hits'] += hits
+            self._stats['seconds'] += time.perf_counter() - start
+        return {feature: rows[:, j] for j, feature in enumerate(WEATHER_FEATURES)}
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='weather')
+            return self._pool
+
+    def _evict(self, now):
+        # Caller holds self._lock; bounds the cache to recently requested cells
+        cutoff = now - STALE_TTLS * self.ttl
+        for key in [k for k, entry in self._cache.items() if entry.expires < cutoff]:
+            del self._cache[key]
+
+    def _snap(self, values):
+        import numpy as np
+        cell = self.cell_degrees
+        # Cells start at multiples of cell_degrees, as national_grid's 0.25 deg cells
+        # do, so each weather cell covers whole inference cells
+        return np.round((np.floor(np.asarray(values, dtype=float) / cell + 1e-9) + 0.5) * cell, 6)
+
+    def _fetch(self, key, entry):
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        params = {'lat': key[0], 'lon': key[1], 'appid': self.api_key, 'units': 'metric'}
+        try:
+            response = self.session.get(f"{self.base_url}/weather", params=params, headers=headers,
+                                        timeout=self.timeout)
+            if response.status_code == 304 and entry is not None:
+                result = 'revalidated'
+                entry = _Entry(entry.values, time.monotonic() + self.ttl, entry.etag, entry.last_modified)
+            else:
+                response.raise_for_status()
+                result = 'fetched'
+                entry = _Entry(parse_conditions(response.json()), time.monotonic() + self.ttl,
+                               response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        except (requests.RequestException, ValueError) as e:
+            WEATHER_REQUESTS.inc('error')
+            with self._lock:
+                self._stats['errors'] += 1
+            logger.warning(f"Weather lookup failed for {key}: {e}")
+            # A stale value beats climatology
+            return entry.values if entry is not None else None
+
+        WEATHER_REQUESTS.inc(result)
+        with self._lock:
+            self._cache[key] = entry
+            self._stats[result] += 1
+        return entry.values
+
+    def stats(self):
+        """
+        Counts so far, the share of grid cells served from cache, requests
+        per input point and points per second
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        requests_made = stats['fetched'] + stats['revalidated'] + stats['errors']
+        stats['hit_rate'] = round(stats['hits'] / stats['cells'], 4) if stats['cells'] else 0.0
+        stats['requests_per_point'] = round(requests_made / stats['points'], 4) if stats['points'] else 0.0
+        stats['points_per_second'] = round(stats['points'] / stats['seconds']) if stats['seconds'] else 0
+        return stats
+
+    def expire(self):
+        """Mark every entry stale; the next lookup revalidates rather than refetches"""
+        now = time.monotonic()
+        with self._lock:
+            for entry in self._cache.values():
+                entry.expires = now
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def close(self):
+        """Stop the lookup threads and close the session's connections"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+        self.session.close()
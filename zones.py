@@ -0,0 +1,368 @@
+"""
+LifeGuard AI - Risk Zone Builder
+Clusters overlapping prediction circles and stores each cluster's merged
+outline as a RiskZone, with simplified level-of-detail variants.
+
+Pipeline per cluster: rasterize the member circles on a local km grid
+(NumPy), trace the outline with marching squares, then simplify it with
+Douglas-Peucker at each LOD tolerance. A zone's id is derived from its
+members, so a rebuild only recomputes clusters whose predictions changed.
+"""
+
+import hashlib
+import json
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import delete, insert, select
+from models import db, Prediction, RiskZone
+from geo import KM_PER_DEGREE_LAT
+from database import upsert_insert
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RADIUS_KM = 50.0
+# Level of detail -> simplification tolerance in km; LOD 0 is the full outline
+LOD_TOLERANCES_KM = {0: 0.0, 1: 5.0, 2: 20.0}
+MAX_RASTER_CELLS = 1024    # per side
+PIXELS_PER_RADIUS = 8      # raster resolution relative to the smallest circle
+# Grid cells for overlap tests are sized from this percentile of the
+# diameters; larger circles are tested against every circle instead
+CELL_PERCENTILE = 95
+PAIR_BLOCK = 1 << 20       # circle pairs compared per NumPy step
+SEVERITY_COLORS = {5: '#b91c1c', 4: '#ff4d4d', 3: '#ffd700', 2: '#00e5ff', 1: '#00e5ff'}
+
+
+def _to_km(lat, lng, lat0):
+    """Local equirectangular projection around latitude `lat0`"""
+    import numpy as np
+    return (np.asarray(lng, dtype=float) * KM_PER_DEGREE_LAT * np.cos(np.radians(lat0)),
+            np.asarray(lat, dtype=float) * KM_PER_DEGREE_LAT)
+
+
+def _to_latlng(x, y, lat0):
+    import numpy as np
+    return y / KM_PER_DEGREE_LAT, x / (KM_PER_DEGREE_LAT * np.cos(np.radians(lat0)))
+
+
+def _overlapping_pairs(x, y, radius, rows, cols):
+    """Index arrays (i, j) of overlapping circles from `rows` x `cols`, compared in bounded chunks"""
+    import numpy as np
+    step = max(1, PAIR_BLOCK // len(cols))
+    first, second = [], []
+    for k in range(0, len(rows), step):
+        chunk = rows[k:k + step]
+        d = np.hypot(x[chunk, None] - x[None, cols], y[chunk, None] - y[None, cols])
+        i, j = np.nonzero(d < radius[chunk, None] + radius[None, cols])
+        first.append(chunk[i])
+        second.append(cols[j])
+    return first, second
+
+
+def cluster_circles(lat, lng, radius_km):
+    """
+    Connected components of overlapping circles; returns a label per circle.
+
+    Circles are bucketed into grid cells as wide as a high percentile of the
+    diameters, so only neighbouring cells are compared; the few circles
+    wider than a cell are compared with every circle. Labels are propagated
+    over the overlapping pairs with pointer jumping until they settle.
+    """
+    import numpy as np
+    lat = np.asarray(lat, dtype=float)
+    lng = np.asarray(lng, dtype=float)
+    radius = np.asarray(radius_km, dtype=float)
+    n = len(lat)
+    labels = np.arange(n)
+    if n < 2:
+        return labels
+
+    # Sinusoidal projection (x scaled by each circle's own latitude): close
+    # enough to true distance at the few-hundred-km scale circles span
+    x, y = _to_km(lat, lng, 0.0)
+    x *= np.cos(np.radians(lat))
+    cell = max(float(np.percentile(2.0 * radius, CELL_PERCENTILE)), 1.0)
+    oversized = 2.0 * radius > cell
+    regular = np.flatnonzero(~oversized)
+    cx = np.floor(x[regular] / cell).astype(np.int64)
+    cy = np.floor(y[regular] / cell).astype(np.int64)
+    buckets = {}
+    for i, key in zip(regular.tolist(), zip(cx.tolist(), cy.tolist())):
+        buckets.setdefault(key, []).append(i)
+    buckets = {k: np.array(v) for k, v in buckets.items()}
+
+    first, second = [], []
+    for (bx, by), rows in buckets.items():
+        for dx, dy in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+            cols = buckets.get((bx + dx, by + dy))
+            if cols is not None:
+                a, b = _overlapping_pairs(x, y, radius, rows, cols)
+                first += a
+                second += b
+    if oversized.any():
+        a, b = _overlapping_pairs(x, y, radius, np.flatnonzero(oversized), np.arange(n))
+        first += a
+        second += b
+    first = np.concatenate(first) if first else np.array([], dtype=np.int64)
+    second = np.concatenate(second) if second else np.array([], dtype=np.int64)
+
+    while True:
+        before = labels.copy()
+        np.minimum.at(labels, first, labels[second])
+        np.minimum.at(labels, second, labels[first])
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+        if np.array_equal(labels, before):
+            return labels
+
+
+# Marching squares: case (tl*8 + tr*4 + br*2 + bl) -> segments between cell edges
+_SEGMENTS = {
+    1: [('left', 'bottom')], 2: [('bottom', 'right')], 3: [('left', 'right')],
+    4: [('top', 'right')], 5: [('left', 'bottom'), ('top', 'right')], 6: [('top', 'bottom')],
+    7: [('top', 'left')], 8: [('top', 'left')], 9: [('top', 'bottom')],
+    10: [('top', 'left'), ('bottom', 'right')], 11: [('top', 'right')], 12: [('left', 'right')],
+    13: [('bottom', 'right')], 14: [('left', 'bottom')]
+}
+
+
+def _edge_ids(side, i, j, width):
+    """Unique id per grid edge; horizontal edges even, vertical odd"""
+    if side == 'top':
+        return (i * width + j) * 2
+    if side == 'bottom':
+        return ((i + 1) * width + j) * 2
+    if side == 'left':
+        return (i * width + j) * 2 + 1
+    return (i * width + j + 1) * 2 + 1
+
+
+def _edge_points(ids, width):
+    import numpy as np
+    cell, vertical = np.divmod(ids, 2)
+    i, j = np.divmod(cell, width)
+    return np.where(vertical == 1, j, j + 0.5), np.where(vertical == 1, i + 0.5, i)
+
+
+def trace_outline(mask):
+    """
+    Outer boundary of a boolean raster as (x, y) pixel coordinates; when the
+    raster has several loops the one enclosing the largest area wins
+    """
+    import numpy as np
+    grid = np.pad(mask, 1).astype(np.uint8)
+    cases = grid[:-1, :-1] * 8 + grid[:-1, 1:] * 4 + grid[1:, 1:] * 2 + grid[1:, :-1]
+    width = grid.shape[1]
+    neighbours = {}
+    for case, segments in _SEGMENTS.items():
+        ii, jj = np.nonzero(cases == case)
+        for a, b in segments:
+            for p, q in zip(_edge_ids(a, ii, jj, width).tolist(), _edge_ids(b, ii, jj, width).tolist()):
+                neighbours.setdefault(p, []).append(q)
+                neighbours.setdefault(q, []).append(p)
+
+    best, best_area = None, 0.0
+    visited = set()
+    for start in neighbours:
+        if start in visited:
+            continue
+        loop, previous, current = [start], None, start
+        visited.add(start)
+        while True:
+            a, b = neighbours[current]
+            following = b if a == previous else a
+            if following == start:
+                break
+            loop.append(following)
+            visited.add(following)
+            previous, current = current, following
+        x, y = _edge_points(np.array(loop), width)
+        area = abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2.0
+        if area > best_area:
+            best, best_area = np.column_stack((x - 1.0, y - 1.0)), area
+    return best if best is not None else np.zeros((0, 2))
+
+
+def simplify_ring(points, tolerance):
+    """Douglas-Peucker simplification of a closed ring (no repeated end point)"""
+    import numpy as np
+    if tolerance <= 0 or len(points) <= 4:
+        return points
+    # Split the ring at the vertex farthest from the first one
+    far = int(np.argmax(np.hypot(*(points - points[0]).T)))
+    keep = np.zeros(len(points), dtype=bool)
+    keep[[0, far]] = True
+    stack = [(0, far), (far, len(points))]
+    closed = np.vstack((points, points[:1]))
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        a, b = closed[start], closed[end]
+        inner = closed[start + 1:end]
+        ab = b - a
+        length = np.hypot(*ab)
+        if length == 0:
+            dist = np.hypot(*(inner - a).T)
+        else:
+            dist = np.abs(ab[0] * (inner[:, 1] - a[1]) - ab[1] * (inner[:, 0] - a[0])) / length
+        k = int(np.argmax(dist))
+        if dist[k] > tolerance:
+            mid = start + 1 + k
+            keep[mid] = True
+            stack.append((start, mid))
+            stack.append((mid, end))
+    simplified = points[keep]
+    return simplified if len(simplified) >= 3 else points
+
+
+def union_outline(lat, lng, radius_km):
+    """
+    Merged outline of a set of circles as {lod: [[lat, lng], ...]}
+    """
+    import numpy as np
+    lat = np.asarray(lat, dtype=float)
+    lng = np.asarray(lng, dtype=float)
+    radius = np.asarray(radius_km, dtype=float)
+    lat0 = float(lat.mean())
+    x, y = _to_km(lat, lng, lat0)
+
+    min_x, max_x = (x - radius).min(), (x + radius).max()
+    min_y, max_y = (y - radius).min(), (y + radius).max()
+    extent = max(max_x - min_x, max_y - min_y)
+    pixel = max(radius.min() / PIXELS_PER_RADIUS, extent / MAX_RASTER_CELLS)
+    cols = int(np.ceil((max_x - min_x) / pixel)) + 1
+    rows = int(np.ceil((max_y - min_y) / pixel)) + 1
+
+    # Rasterize each circle inside its own window of pixel centres
+    mask = np.zeros((rows, cols), dtype=bool)
+    for cx, cy, r in zip(x, y, radius):
+        j0, j1 = int((cx - r - min_x) // pixel), int((cx + r - min_x) // pixel) + 1
+        i0, i1 = int((cy - r - min_y) // pixel), int((cy + r - min_y) // pixel) + 1
+        px = min_x + (np.arange(j0, j1) + 0.5) * pixel
+        py = min_y + (np.arange(i0, i1) + 0.5) * pixel
+        mask[i0:i1, j0:j1] |= (px[None, :] - cx) ** 2 + (py[:, None] - cy) ** 2 <= r * r
+
+    outline = trace_outline(mask)
+    ring_km = np.column_stack((min_x + (outline[:, 0] + 0.5) * pixel, min_y + (outline[:, 1] + 0.5) * pixel))
+    variants = {}
+    for lod, tolerance in LOD_TOLERANCES_KM.items():
+        # LOD 0 still drops the staircase vertices a raster outline is made of
+        ring = simplify_ring(ring_km, max(tolerance, pixel / 2))
+        rlat, rlng = _to_latlng(ring[:, 0], ring[:, 1], lat0)
+        variants[lod] = np.column_stack((np.round(rlat, 4), np.round(rlng, 4))).tolist()
+    return variants
+
+
+def _digest(member_rows):
+    key = repr(sorted((r.prediction_id, r.latitude, r.longitude, r.radius_km, r.severity,
+                       r.affected_population, r.region) for r in member_rows))
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def _stored_digests():
+    return set(db.session.execute(
+        select(RiskZone.inputs_digest).where(RiskZone.inputs_digest.isnot(None))
+    ).scalars())
+
+
+def rebuild_risk_zones():
+    """
+    Recluster all located predictions and rebuild the RiskZone rows whose
+    membership or members changed. Zones created by hand (no inputs_digest)
+    are left alone. Returns counts of built, kept and removed zones.
+
+    Every located prediction is reloaded, since one moved circle can merge
+    or split any cluster; only changed clusters are re-rasterized. Processes
+    racing over the same inputs insert the same digests, and the loser's
+    rows are skipped rather than failing on the unique constraint.
+    """
+    import numpy as np
+    rows = db.session.execute(
+        select(Prediction.prediction_id, Prediction.latitude, Prediction.longitude, Prediction.radius_km,
+               Prediction.severity, Prediction.affected_population, Prediction.region)
+        .where(Prediction.latitude.isnot(None), Prediction.longitude.isnot(None))
+        .order_by(Prediction.id)
+    ).all()
+    existing = _stored_digests()
+
+    clusters = {}
+    if rows:
+        radius = np.array([r.radius_km or DEFAULT_RADIUS_KM for r in rows], dtype=float)
+        labels = cluster_circles([r.latitude for r in rows], [r.longitude for r in rows], radius)
+        for index, label in enumerate(labels.tolist()):
+            clusters.setdefault(label, []).append(index)
+
+    now = datetime.utcnow()
+    current, zones = set(), []
+    for members in clusters.values():
+        member_rows = [rows[i] for i in members]
+        digest = _digest(member_rows)
+        current.add(digest)
+        if digest in existing:
+            continue
+        lat = np.array([r.latitude for r in member_rows])
+        lng = np.array([r.longitude for r in member_rows])
+        variants = union_outline(lat, lng, radius[members])
+        polygon = variants.pop(0)
+        lats, lngs = [p[0] for p in polygon], [p[1] for p in polygon]
+        severity = max(r.severity or 0 for r in member_rows)
+        regions = Counter(r.region for r in member_rows if r.region)
+        zones.append({
+            'zone_id': f"ZONE-{digest[:20]}",
+            'region': regions.most_common(1)[0][0] if regions else None,
+            'coordinates_json': json.dumps(polygon),
+            'lod_json': json.dumps(variants),
+            # Core inserts skip the geo.py bounds hook
+            'min_lat': min(lats), 'max_lat': max(lats), 'min_lng': min(lngs), 'max_lng': max(lngs),
+            'severity': severity,
+            'affected_population': sum(r.affected_population or 0 for r in member_rows),
+            'prediction_count': len(member_rows),
+            'last_updated': now,
+            'color_code': SEVERITY_COLORS.get(severity, '#00e5ff'),
+            'inputs_digest': digest
+        })
+
+    stale = sorted(existing - current)
+    try:
+        for i in range(0, len(stale), 500):
+            db.session.execute(delete(RiskZone).where(RiskZone.inputs_digest.in_(stale[i:i + 500])))
+        if zones:
+            stmt = upsert_insert(RiskZone.__table__, db.session.get_bind().dialect.name)
+            db.session.execute(insert(RiskZone) if stmt is None else stmt.on_conflict_do_nothing(), zones)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    if zones or stale:
+        logger.info(f"Risk zones rebuilt: {len(zones)} built, {len(stale)} removed")
+    return {'built': len(zones), 'kept': len(current) - len(zones), 'removed': len(stale)}
+
+
+def zone_polygons(lod=0):
+    """
+    All risk zones with the polygon for one level of detail, most severe first
+    """
+    zones = db.session.execute(
+        select(RiskZone.zone_id, RiskZone.region, RiskZone.severity, RiskZone.affected_population,
+               RiskZone.prediction_count, RiskZone.color_code, RiskZone.coordinates_json, RiskZone.lod_json)
+        .where(RiskZone.coordinates_json.isnot(None))
+        .order_by(RiskZone.severity.desc(), RiskZone.zone_id)
+    ).all()
+    results = []
+    for z in zones:
+        variants = json.loads(z.lod_json) if z.lod_json else {}
+        polygon = variants.get(str(lod)) if lod else None
+        results.append({
+            'id': z.zone_id,
+            'region': z.region,
+            'severity': z.severity,
+            'affected_population': z.affected_population,
+            'prediction_count': z.prediction_count,
+            'color': z.color_code,
+            'polygon': polygon or json.loads(z.coordinates_json)
+        })
+    return results